@@ -0,0 +1,487 @@
+# app/cli.py
+# Comandos de operación. Uso: python -m app.cli <comando> [opciones]
+import argparse
+import asyncio
+import logging
+import os
+import signal
+from datetime import datetime
+
+
+def _migrar(args):
+    from app.core.database import engine
+    from app.core.migraciones import migrar, version_actual, version_esperada
+
+    async def correr():
+        if args.estado:
+            async with engine.connect() as conn:
+                actual = await version_actual(conn)
+            print(f"Versión de la base: {actual} (código: {version_esperada()})")
+        else:
+            aplicadas = await migrar(engine, args.hasta)
+            for m in aplicadas:
+                print(f"Aplicada {m.nombre}: {m.descripcion}")
+            if not aplicadas:
+                print("El esquema ya estaba al día")
+        await engine.dispose()
+
+    asyncio.run(correr())
+
+
+def _worker(args):
+    from app.servicios import tareas  # noqa: F401  (registra los manejadores)
+    from app.servicios.cola_trabajos import Worker
+
+    worker = Worker(concurrencia=args.concurrencia, tipos=args.tipos or None)
+
+    async def correr():
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, worker.detener)
+        await worker.correr()
+
+    asyncio.run(correr())
+
+
+def _ocr(args):
+    from app.servicios.pipeline_ocr import PipelineOCR
+
+    pipeline = PipelineOCR(motor=args.motor, procesos=args.procesos)
+
+    async def correr():
+        detenido = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, detenido.set)
+        await pipeline.iniciar()
+        try:
+            await detenido.wait()
+        finally:
+            await pipeline.detener()
+
+    asyncio.run(correr())
+
+
+def _refrescar_horarias(args):
+    from app.core.database import SessionLocal
+    from app.servicios.agregados_observaciones import refrescar_horarias
+
+    async def correr():
+        async with SessionLocal() as db:
+            filas = await refrescar_horarias(db, args.desde, completo=args.completo)
+            await db.commit()
+        print(f"Horas recalculadas: {filas}")
+
+    asyncio.run(correr())
+
+
+def _reconstruir_ultimas(args):
+    from app.core.database import SessionLocal
+    from app.servicios.ultimas_observaciones import reconstruir_ultimas
+
+    async def correr():
+        async with SessionLocal() as db:
+            filas = await reconstruir_ultimas(db)
+            await db.commit()
+        print(f"Pares (paciente, tipo) reconstruidos: {filas}")
+
+    asyncio.run(correr())
+
+
+def _particiones(args):
+    from app.core.config import settings
+    from app.core.database import SessionLocal
+    from app.servicios import particiones_observaciones as particiones
+
+    async def correr():
+        async with SessionLocal() as db:
+            if args.accion == "asegurar":
+                creadas = await particiones.asegurar_particiones(db, args.desde)
+                print(f"Particiones creadas: {', '.join(creadas) or 'ninguna'}")
+            elif args.accion == "archivar":
+                retencion = args.retencion or settings.OBS_PARTICIONES_RETENCION_MESES
+                archivadas = await particiones.archivar_particiones(db, retencion, args.eliminar)
+                print(f"Particiones {'eliminadas' if args.eliminar else 'archivadas'}: "
+                      f"{', '.join(archivadas) or 'ninguna'}")
+            await db.commit()
+
+            for p in await particiones.listar_particiones(db):
+                print(f"{p['nombre']:<28} {p['filas_estimadas']:>12} filas  "
+                      f"{p['bytes'] / 2**20:>10.1f} MiB  {p['limites']}")
+
+    asyncio.run(correr())
+
+
+def _exportar(args):
+    import json
+    import os
+    from uuid import UUID
+    from app.servicios.exportacion_columnar import exportar
+    from app.servicios.filtros_observaciones import FiltrosObservaciones
+
+    desde = args.desde
+    if args.marca_agua and os.path.exists(args.marca_agua):
+        with open(args.marca_agua) as f:
+            desde = datetime.fromisoformat(json.load(f)["marca_agua"])
+
+    condiciones = None
+    if args.tabla == "observaciones":
+        condiciones = FiltrosObservaciones(
+            id_paciente=UUID(args.id_paciente) if args.id_paciente else None,
+            id_tipo_obs=UUID(args.id_tipo_obs) if args.id_tipo_obs else None,
+            fecha_hora_inicio=args.fecha_desde,
+            fecha_hora_fin=args.fecha_hasta
+        ).condiciones()
+
+    async def correr():
+        info = await exportar(args.tabla, args.salida, args.formato, condiciones, desde)
+        print(f"{info['filas']} filas en {info['grupos']} grupos -> {info['ruta']}")
+        print(f"Marca de agua: {info['marca_agua'].isoformat()}")
+
+        # se guarda recién al terminar: si la exportación falla se repite igual
+        if args.marca_agua:
+            with open(args.marca_agua, "w") as f:
+                json.dump({"marca_agua": info["marca_agua"].isoformat()}, f)
+
+    asyncio.run(correr())
+
+
+def _entrenar(args):
+    from app.ml.datos_sinteticos import ESPECIALIDADES, generar_dataset
+    from app.ml.modelo import entrenar, guardar
+
+    X, y = generar_dataset(args.n_por_clase, args.semilla)
+    artefacto = entrenar(
+        X, y, ESPECIALIDADES,
+        capas=tuple(args.capas), max_iter=args.max_iter, semilla=args.semilla
+    )
+    ruta = guardar(artefacto, args.salida)
+    print(f"Modelo v{artefacto.version} -> {ruta}")
+    print(f"Exactitud (holdout): {artefacto.metricas.get('exactitud', float('nan')):.4f}")
+
+
+def _benchmark_modelo(args):
+    from app.ml.modelo import cargar
+    from app.ml.motor_numpy import benchmark, verificar_paridad
+
+    artefacto = cargar(args.modelo)
+    diferencia = verificar_paridad(artefacto, tolerancia=args.tolerancia)
+    print(f"Modelo v{artefacto.version}: paridad con sklearn OK (máx. diferencia {diferencia:.2e})")
+
+    print(f"{'filas':>8} {'sklearn':>12} {'numpy':>12} {'x':>7} {'µs/fila numpy':>14}")
+    for r in benchmark(artefacto, args.tamanos, args.segundos):
+        print(f"{r['filas']:>8} {r['sklearn_s'] * 1e3:>10.3f}ms {r['numpy_s'] * 1e3:>10.3f}ms "
+              f"{r['aceleracion']:>7.1f} {r['numpy_s'] / r['filas'] * 1e6:>14.3f}")
+
+
+def _puntuar(args):
+    from app.core.database import SessionLocal
+    from app.ml.modelo import cargar
+    from app.servicios.puntuacion_admisiones import puntuar_admisiones
+
+    artefacto = cargar(args.modelo)
+
+    async def correr():
+        async with SessionLocal() as db:
+            r = await puntuar_admisiones(db, artefacto, forzar=args.forzar)
+            await db.commit()
+        print(f"Modelo v{r['version_modelo']}: {r['admisiones']} admisiones activas, "
+              f"{r['puntuadas']} puntuadas, {r['sin_cambios']} sin cambios")
+
+    asyncio.run(correr())
+
+
+def _fuente_entrenamiento(args):
+    from app.ml.datos_sinteticos import ESPECIALIDADES
+    from app.ml.entrenamiento_incremental import FuenteBD, FuenteNpy
+
+    clases = args.clases or ESPECIALIDADES
+    if args.npy:
+        return clases, FuenteNpy(args.npy[0], args.npy[1], len(clases), args.lote, args.prueba_cada)
+    return clases, FuenteBD(clases, args.lote, args.prueba_cada, args.ventana_horas)
+
+
+def _entrenar_incremental(args):
+    from app.core.database import engine
+    from app.ml.entrenamiento_incremental import entrenar_incremental
+    from app.ml.modelo import guardar
+
+    clases, fuente = _fuente_entrenamiento(args)
+
+    async def correr():
+        artefacto = await entrenar_incremental(
+            fuente, clases,
+            capas=tuple(args.capas), epocas=args.epocas, tasa=args.tasa, alpha=args.alpha,
+            semilla=args.semilla, checkpoint=args.checkpoint, reanudar=args.reanudar
+        )
+        await engine.dispose()
+        return artefacto
+
+    artefacto = asyncio.run(correr())
+    ruta = guardar(artefacto, args.salida)
+    print(f"Modelo v{artefacto.version} -> {ruta}")
+    print(f"Exactitud (holdout, {artefacto.metricas['filas_prueba']} filas): {artefacto.metricas['exactitud']}")
+
+
+def _snapshot_caracteristicas(args):
+    from app.core.database import engine
+    from app.ml.datos_sinteticos import ESPECIALIDADES
+    from app.ml.entrenamiento_incremental import FuenteBD, snapshot_npy
+
+    fuente = FuenteBD(args.clases or ESPECIALIDADES, args.lote, args.prueba_cada, args.ventana_horas)
+
+    async def correr():
+        filas = await snapshot_npy(fuente, args.salida_x, args.salida_y)
+        await engine.dispose()
+        print(f"{filas} filas -> {args.salida_x}, {args.salida_y}")
+
+    asyncio.run(correr())
+
+
+def _seleccionar_modelo(args):
+    import csv
+    import tempfile
+    import numpy as np
+    from app.ml.datos_sinteticos import ESPECIALIDADES, generar_dataset
+    from app.ml.modelo import guardar
+    from app.ml.seleccion_modelo import GRILLA, buscar, combinaciones, entrenar_mejor
+
+    clases = args.clases or ESPECIALIDADES
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.npy:
+            ruta_X, ruta_y = args.npy
+        else:
+            ruta_X, ruta_y = os.path.join(tmp, "X.npy"), os.path.join(tmp, "y.npy")
+            X, y = generar_dataset(args.n_por_clase, args.semilla)
+            np.save(ruta_X, X)
+            np.save(ruta_y, y)
+
+        grilla = {
+            "capas": [tuple(int(n) for n in c.split(",")) for c in args.capas] if args.capas else GRILLA["capas"],
+            "tasa": args.tasas or GRILLA["tasa"],
+            "alpha": args.alphas or GRILLA["alpha"],
+        }
+        candidatas = combinaciones(grilla, args.muestras, args.semilla)
+        print(f"{len(candidatas)} combinaciones x {args.folds} folds")
+
+        tabla = buscar(
+            ruta_X, ruta_y, candidatas, k=args.folds, max_iter=args.max_iter,
+            semilla=args.semilla, procesos=args.procesos,
+            avance=lambda hechos, total: print(f"\r{hechos}/{total}", end="", flush=True)
+        )
+        print()
+
+        print(f"{'#':>3} {'capas':<14} {'tasa':>8} {'alpha':>8} {'exactitud':>10} {'±':>7} {'iter':>6} {'seg':>7}")
+        for r in tabla[:args.top]:
+            print(f"{r['puesto']:>3} {str(r['capas']):<14} {r['tasa']:>8.0e} {r['alpha']:>8.0e} "
+                  f"{r['exactitud_media']:>10.4f} {r['exactitud_desvio']:>7.4f} "
+                  f"{r['iteraciones_media']:>6.0f} {r['segundos']:>7.1f}")
+
+        if args.tabla:
+            with open(args.tabla, "w", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=list(tabla[0]))
+                writer.writeheader()
+                writer.writerows(tabla)
+
+        X, y = np.load(ruta_X, mmap_mode="r"), np.load(ruta_y)
+        artefacto = entrenar_mejor(X, y, clases, tabla, args.folds, args.max_iter, args.semilla)
+
+    ruta = guardar(artefacto, args.salida)
+    print(f"Mejor combinación -> modelo v{artefacto.version} ({ruta})")
+
+
+def _generar_datos(args):
+    from sqlalchemy.engine import make_url
+    from app.core.config import settings
+    from app.core.database import SessionLocal, engine
+    from app.ml.generador_clinico import ConfigGenerador, asegurar_tipos, generar
+
+    config = ConfigGenerador(
+        semilla=args.semilla,
+        pacientes=args.pacientes,
+        pacientes_por_bloque=args.bloque,
+        admisiones_por_paciente=args.admisiones_por_paciente,
+        observaciones_por_admision=args.observaciones_por_admision,
+        diagnosticos_por_admision=args.diagnosticos_por_admision,
+        desde=args.desde or ConfigGenerador().desde,
+        dias=args.dias,
+    )
+
+    tipos = None
+    destino = args.salida
+    if args.formato == "postgres":
+        from sqlalchemy import func, select
+        from app.servicios.particiones_observaciones import asegurar_particiones
+
+        async def preparar():
+            # `inicio` acota el refresco del rollup a lo cargado ahora
+            async with SessionLocal() as db:
+                inicio = await db.scalar(select(func.now()))
+                t = await asegurar_tipos(db)
+                await asegurar_particiones(db, desde=config.desde, hasta=config.hasta)
+                await db.commit()
+            await engine.dispose()
+            return inicio, t
+
+        inicio, tipos = asyncio.run(preparar())
+        destino = make_url(settings.DATABASE_URL).set(drivername="postgresql").render_as_string(hide_password=False)
+    elif not destino:
+        raise SystemExit("--salida es obligatorio para npy / parquet")
+
+    totales = generar(
+        config, args.formato, destino, tipos, args.procesos,
+        avance=lambda hechos, total, t: print(
+            f"\rbloque {hechos}/{total}: " + ", ".join(f"{k} {v}" for k, v in t.items()), end="", flush=True
+        )
+    )
+    print()
+
+    if args.formato == "postgres" and not args.sin_derivadas:
+        from app.servicios.agregados_observaciones import refrescar_horarias
+        from app.servicios.ultimas_observaciones import reconstruir_ultimas
+
+        async def derivadas():
+            async with SessionLocal() as db:
+                await reconstruir_ultimas(db)
+                await refrescar_horarias(db, inicio)
+                await db.commit()
+            await engine.dispose()
+
+        asyncio.run(derivadas())
+        print("observaciones_ultimas y observaciones_horarias actualizadas")
+    print(totales)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p = sub.add_parser("migrar", help="Aplica las migraciones de esquema pendientes")
+    p.add_argument("--hasta", type=int, help="Aplica solo hasta esta versión")
+    p.add_argument("--estado", action="store_true", help="Muestra la versión sin migrar")
+    p.set_defaults(func=_migrar)
+
+    p = sub.add_parser("worker", help="Procesa la cola de trabajos")
+    p.add_argument("--concurrencia", type=int, default=4)
+    p.add_argument("--tipos", nargs="*", help="Solo estos tipos de trabajo")
+    p.set_defaults(func=_worker)
+
+    p = sub.add_parser("ocr", help="Corre el pipeline de OCR (trabajos_ocr)")
+    p.add_argument("--motor", help="tesseract / stub (por defecto OCR_MOTOR)")
+    p.add_argument("--procesos", type=int, help="Procesos de reconocimiento (por defecto OCR_PROCESOS)")
+    p.set_defaults(func=_ocr)
+
+    p = sub.add_parser("refrescar-horarias", help="Recalcula el rollup observaciones_horarias")
+    g = p.add_mutually_exclusive_group()
+    g.add_argument("--desde", type=datetime.fromisoformat, help="Observaciones creadas desde (ISO)")
+    g.add_argument("--completo", action="store_true", help="Reconstruye todo el rollup")
+    p.set_defaults(func=_refrescar_horarias)
+
+    p = sub.add_parser("reconstruir-ultimas", help="Reconstruye observaciones_ultimas desde cero")
+    p.set_defaults(func=_reconstruir_ultimas)
+
+    p = sub.add_parser("particiones", help="Lista, crea o archiva particiones de observaciones")
+    p.add_argument("accion", nargs="?", default="listar", choices=["listar", "asegurar", "archivar"])
+    p.add_argument("--desde", type=datetime.fromisoformat, help="asegurar: primer mes a crear (ISO)")
+    p.add_argument("--retencion", type=int, help="archivar: meses a conservar")
+    p.add_argument("--eliminar", action="store_true", help="archivar: borra en lugar de mover al esquema de archivo")
+    p.set_defaults(func=_particiones)
+
+    p = sub.add_parser("exportar", help="Exporta una tabla a Parquet / Arrow IPC")
+    p.add_argument("tabla", choices=["observaciones", "admisiones", "diagnosticos_secundarios"])
+    p.add_argument("--salida", required=True, help="Archivo destino")
+    p.add_argument("--formato", choices=["parquet", "arrow"], default="parquet")
+    g = p.add_mutually_exclusive_group()
+    g.add_argument("--desde", type=datetime.fromisoformat, help="Solo filas con creado_en posterior (ISO)")
+    g.add_argument("--marca-agua", help="JSON con la marca de agua: se lee como --desde y se actualiza al terminar")
+    p.add_argument("--id-paciente", help="observaciones: filtrar por paciente")
+    p.add_argument("--id-tipo-obs", help="observaciones: filtrar por tipo")
+    p.add_argument("--fecha-desde", type=datetime.fromisoformat, help="observaciones: fecha_hora inicial (ISO)")
+    p.add_argument("--fecha-hasta", type=datetime.fromisoformat, help="observaciones: fecha_hora final (ISO)")
+    p.set_defaults(func=_exportar)
+
+    p = sub.add_parser("entrenar", help="Entrena el clasificador de especialidad y guarda una versión nueva")
+    p.add_argument("--n-por-clase", type=int, default=200, help="Pacientes simulados por especialidad")
+    p.add_argument("--semilla", type=int, default=42)
+    p.add_argument("--capas", type=int, nargs="+", default=[16, 8], help="Neuronas por capa oculta")
+    p.add_argument("--max-iter", type=int, default=1500)
+    p.add_argument("--salida", help="Directorio de modelos (por defecto ML_DIR)")
+    p.set_defaults(func=_entrenar)
+
+    p = sub.add_parser("benchmark-modelo", help="Compara el motor NumPy con sklearn (paridad y latencia)")
+    p.add_argument("--modelo", help="Artefacto (por defecto el que carga la API)")
+    p.add_argument("--tamanos", type=int, nargs="+", default=[1, 10, 100, 1_000, 10_000, 100_000])
+    p.add_argument("--segundos", type=float, default=0.5, help="Tiempo mínimo medido por tamaño")
+    p.add_argument("--tolerancia", type=float, default=1e-4)
+    p.set_defaults(func=_benchmark_modelo)
+
+    p = sub.add_parser("puntuar", help="Puntúa las admisiones activas y guarda las predicciones")
+    p.add_argument("--modelo", help="Artefacto (por defecto el que carga la API)")
+    p.add_argument("--forzar", action="store_true", help="Reescribe aunque las características no cambiaron")
+    p.set_defaults(func=_puntuar)
+
+    p = sub.add_parser("entrenar-incremental", help="Entrena con partial_fit desde la base o un snapshot .npy")
+    p.add_argument("--npy", nargs=2, metavar=("X", "Y"), help="Snapshot X.npy / y.npy (por defecto lee la base; con varias épocas conviene el snapshot)")
+    p.add_argument("--clases", nargs="+", help="Nombres de clase (por defecto las especialidades del prototipo)")
+    p.add_argument("--lote", type=int, default=50_000, help="Filas por lote")
+    p.add_argument("--prueba-cada", type=int, default=5, help="1 de cada N filas por clase va al holdout")
+    p.add_argument("--ventana-horas", type=int, help="Ventana de características (por defecto ML_VENTANA_HORAS)")
+    p.add_argument("--epocas", type=int, default=10)
+    p.add_argument("--capas", type=int, nargs="+", default=[16, 8])
+    p.add_argument("--tasa", type=float, default=1e-3, help="learning_rate_init")
+    p.add_argument("--alpha", type=float, default=1e-4, help="Regularización L2")
+    p.add_argument("--semilla", type=int, default=42)
+    p.add_argument("--checkpoint", help="Archivo de checkpoint (se escribe al final de cada época)")
+    p.add_argument("--reanudar", action="store_true", help="Continúa desde --checkpoint si existe")
+    p.add_argument("--salida", help="Directorio de modelos (por defecto ML_DIR)")
+    p.set_defaults(func=_entrenar_incremental)
+
+    p = sub.add_parser("snapshot-caracteristicas", help="Vuelca las admisiones etiquetadas a X.npy / y.npy")
+    p.add_argument("--salida-x", required=True)
+    p.add_argument("--salida-y", required=True)
+    p.add_argument("--clases", nargs="+")
+    p.add_argument("--lote", type=int, default=50_000)
+    p.add_argument("--prueba-cada", type=int, default=5)
+    p.add_argument("--ventana-horas", type=int)
+    p.set_defaults(func=_snapshot_caracteristicas)
+
+    p = sub.add_parser("seleccionar-modelo", help="Búsqueda de hiperparámetros con k-fold en paralelo")
+    p.add_argument("--npy", nargs=2, metavar=("X", "Y"), help="Datos .npy (por defecto, datos simulados)")
+    p.add_argument("--n-por-clase", type=int, default=200, help="Datos simulados: pacientes por especialidad")
+    p.add_argument("--clases", nargs="+")
+    p.add_argument("--capas", nargs="+", help="Arquitecturas a probar, p. ej. 16,8 32,16")
+    p.add_argument("--tasas", type=float, nargs="+", help="learning_rate_init a probar")
+    p.add_argument("--alphas", type=float, nargs="+", help="Regularización L2 a probar")
+    p.add_argument("--muestras", type=int, help="Búsqueda aleatoria: cantidad de combinaciones de la grilla")
+    p.add_argument("--folds", type=int, default=5)
+    p.add_argument("--max-iter", type=int, default=500)
+    p.add_argument("--procesos", type=int, help="Procesos del pool (por defecto uno por núcleo)")
+    p.add_argument("--semilla", type=int, default=42)
+    p.add_argument("--top", type=int, default=20, help="Filas de la tabla a mostrar")
+    p.add_argument("--tabla", help="Guarda la tabla completa en CSV")
+    p.add_argument("--salida", help="Directorio de modelos (por defecto ML_DIR)")
+    p.set_defaults(func=_seleccionar_modelo)
+
+    p = sub.add_parser("generar-datos", help="Genera pacientes, admisiones y observaciones simulados")
+    p.add_argument("formato", choices=["npy", "parquet", "postgres"])
+    p.add_argument("--salida", help="npy / parquet: directorio destino")
+    p.add_argument("--pacientes", type=int, default=100_000)
+    p.add_argument("--bloque", type=int, default=2_000, help="Pacientes por bloque")
+    p.add_argument("--admisiones-por-paciente", type=float, default=1.5)
+    p.add_argument("--observaciones-por-admision", type=float, default=40.0)
+    p.add_argument("--diagnosticos-por-admision", type=float, default=0.8)
+    p.add_argument("--desde", type=datetime.fromisoformat, help="Inicio del período simulado (ISO)")
+    p.add_argument("--dias", type=int, default=365)
+    p.add_argument("--semilla", type=int, default=42)
+    p.add_argument("--procesos", type=int, help="Procesos del pool (por defecto uno por núcleo)")
+    p.add_argument("--sin-derivadas", action="store_true",
+                   help="postgres: no reconstruye observaciones_ultimas / observaciones_horarias")
+    p.set_defaults(func=_generar_datos)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
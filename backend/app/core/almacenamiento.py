@@ -0,0 +1,335 @@
+# app/core/almacenamiento.py
+import hashlib
+import os
+import uuid
+
+from fastapi import HTTPException, Request
+from fastapi.routing import APIRoute
+from sqlalchemy import select, update, delete, event, exists
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.models.archivos import Archivo
+from app.models.contenidos_archivo import ContenidoArchivo
+
+# uploads/objetos/ab/cd/abcd...  -> 65536 carpetas, ninguna con millones de entradas
+DIR_OBJETOS = os.path.join(settings.UPLOAD_DIR, "objetos")
+DIR_TEMPORAL = os.path.join(settings.UPLOAD_DIR, "tmp")
+
+EXTENSIONES_PERMITIDAS = ("pdf", "jpg", "png")
+
+# encabezados multipart, nombre del archivo y campos sueltos
+MARGEN_MULTIPART = 64 * 1024
+
+# clave de Session.info con los blobs escritos en la transacción en curso
+BLOBS_NUEVOS = "blobs_nuevos"
+
+
+def extension_permitida(nombre: str) -> str:
+    """Normaliza la extensión de `nombre` o responde 400 si no se acepta."""
+    ext = nombre.split(".")[-1].lower()
+    if ext == "jpeg":
+        ext = "jpg"
+    if ext not in EXTENSIONES_PERMITIDAS:
+        raise HTTPException(400, "Tipo de archivo no permitido (solo pdf,jpg,png)")
+    return ext
+
+
+def ruta_contenido(sha256: str) -> str:
+    return os.path.join(DIR_OBJETOS, sha256[:2], sha256[2:4], sha256)
+
+
+def ruta_temporal(sufijo: str = ".tmp") -> str:
+    os.makedirs(DIR_TEMPORAL, exist_ok=True)
+    return os.path.join(DIR_TEMPORAL, f"{uuid.uuid4()}{sufijo}")
+
+
+def eliminar_silencioso(ruta: str):
+    try:
+        os.remove(ruta)
+    except FileNotFoundError:
+        pass
+
+
+def _excede(max_bytes: int) -> HTTPException:
+    return HTTPException(413, f"El archivo supera el máximo permitido ({max_bytes} bytes)")
+
+
+# ---------------------------
+#   LÍMITE DEL CUERPO ANTES DEL PARSEO
+#   FastAPI parsea el multipart (y Starlette lo vuelca a su temporal)
+#   antes de llamar al endpoint, así que el límite se aplica en la ruta:
+#   413 de entrada si Content-Length ya lo supera, o apenas el stream lo
+#   cruza (cuerpos chunked).
+# ---------------------------
+def limitar_cuerpo(max_bytes: int):
+    """Marca el endpoint con el máximo del archivo subido; lo aplica
+    RutaCuerpoLimitado (con MARGEN_MULTIPART de tolerancia)."""
+    def decorador(endpoint):
+        endpoint.max_cuerpo_bytes = max_bytes
+        return endpoint
+    return decorador
+
+
+class RutaCuerpoLimitado(APIRoute):
+    def get_route_handler(self):
+        manejador = super().get_route_handler()
+        max_bytes = getattr(self.endpoint, "max_cuerpo_bytes", None)
+        if max_bytes is None:
+            return manejador
+        tope = max_bytes + MARGEN_MULTIPART
+
+        async def manejador_limitado(request: Request):
+            largo = request.headers.get("content-length")
+            if largo and largo.isdigit() and int(largo) > tope:
+                raise _excede(max_bytes)
+
+            recibir = request.receive
+            recibidos = 0
+
+            async def recibir_limitado():
+                nonlocal recibidos
+                mensaje = await recibir()
+                if mensaje["type"] == "http.request":
+                    recibidos += len(mensaje.get("body", b""))
+                    if recibidos > tope:
+                        raise _excede(max_bytes)
+                return mensaje
+
+            return await manejador(Request(request.scope, recibir_limitado))
+
+        return manejador_limitado
+
+
+# ---------------------------
+#   LECTURA / ESCRITURA POR BLOQUES
+#   Funciones síncronas pensadas para correr enteras en el threadpool:
+#   el archivo nunca se carga completo en memoria ni bloquea el event loop.
+# ---------------------------
+def hashear_archivo(f, max_bytes: int | None = None) -> tuple[int, str]:
+    """Lee `f` de a UPLOAD_CHUNK_BYTES y devuelve (tamaño_bytes, sha256 hex).
+
+    Aborta con 413 apenas se supera `max_bytes`. Deja `f` rebobinado.
+    """
+    max_bytes = max_bytes or settings.UPLOAD_MAX_BYTES
+    hasher = hashlib.sha256()
+    tamaño = 0
+
+    f.seek(0)
+    while True:
+        bloque = f.read(settings.UPLOAD_CHUNK_BYTES)
+        if not bloque:
+            break
+
+        tamaño += len(bloque)
+        if tamaño > max_bytes:
+            raise _excede(max_bytes)
+
+        hasher.update(bloque)
+
+    f.seek(0)
+    return tamaño, hasher.hexdigest()
+
+
+def copiar_archivo(f, destino: str):
+    """Copia `f` a `destino` por bloques, vía `destino.part` + rename atómico."""
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    parcial = f"{destino}.{uuid.uuid4().hex}.part"
+
+    f.seek(0)
+    try:
+        with open(parcial, "wb") as out:
+            while True:
+                bloque = f.read(settings.UPLOAD_CHUNK_BYTES)
+                if not bloque:
+                    break
+                out.write(bloque)
+        os.replace(parcial, destino)
+    except BaseException:
+        eliminar_silencioso(parcial)
+        raise
+
+
+def copiar_y_hashear(f, destino: str, max_bytes: int | None = None) -> tuple[int, str]:
+    """Copia un stream no rebobinable (p. ej. un miembro de ZIP) a `destino`
+    hasheando en la misma pasada. Devuelve (tamaño_bytes, sha256 hex)."""
+    max_bytes = max_bytes or settings.UPLOAD_MAX_BYTES
+    hasher = hashlib.sha256()
+    tamaño = 0
+
+    try:
+        with open(destino, "wb") as out:
+            while True:
+                bloque = f.read(settings.UPLOAD_CHUNK_BYTES)
+                if not bloque:
+                    break
+
+                tamaño += len(bloque)
+                if tamaño > max_bytes:
+                    raise _excede(max_bytes)
+
+                hasher.update(bloque)
+                out.write(bloque)
+    except BaseException:
+        eliminar_silencioso(destino)
+        raise
+
+    return tamaño, hasher.hexdigest()
+
+
+def mover_archivo(origen: str, destino: str):
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    os.replace(origen, destino)
+
+
+# ---------------------------
+#   STORE DIRECCIONADO POR CONTENIDO
+#   contenidos_archivo lleva el conteo de referencias. Las funciones dejan
+#   la transacción abierta: el commit lo hace el router junto con el
+#   alta/baja del Archivo. Un blob escrito en una transacción que no llega
+#   a confirmarse se borra al terminarla; los blobs que quedan sin
+#   referencias los borra barrer_contenidos (tarea periódica), nunca la
+#   baja misma: si su commit fallara el archivo ya no estaría.
+# ---------------------------
+def _registrar_blob(db: AsyncSession, destino: str):
+    # con el inodo: si otra carga reemplazó el blob mientras tanto, no se toca
+    db.info.setdefault(BLOBS_NUEVOS, []).append((destino, os.stat(destino).st_ino))
+
+
+@event.listens_for(Session, "after_commit")
+def _confirmar_blobs(session):
+    session.info.pop(BLOBS_NUEVOS, None)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _descartar_blobs(session, transaccion):
+    # rollback, close sin commit o commit fallido
+    if transaccion.parent is not None:
+        return
+    for ruta, inodo in session.info.pop(BLOBS_NUEVOS, ()):
+        try:
+            if os.stat(ruta).st_ino == inodo:
+                os.remove(ruta)
+        except FileNotFoundError:
+            pass
+
+
+async def escribir_contenido(db: AsyncSession, destino: str, f=None, mover_desde: str | None = None):
+    """Escribe el blob (renombrando `mover_desde` o copiando `f`) y lo
+    registra para borrarlo si la transacción no se confirma."""
+    def escribir():
+        if mover_desde:
+            mover_archivo(mover_desde, destino)
+        else:
+            copiar_archivo(f, destino)
+        _registrar_blob(db, destino)
+
+    await run_in_threadpool(escribir)
+
+
+async def sumar_referencias(
+    db: AsyncSession,
+    conteos: dict[str, tuple[int, int]]
+) -> dict[str, bool]:
+    """Suma referencias a varios blobs en un solo upsert multi-fila.
+
+    `conteos` es {sha256: (tamaño_bytes, referencias_nuevas)}. Devuelve
+    {sha256: hay_que_escribirlo}, True si el blob no existía antes (o
+    estaba sin referencias, a la espera del barrido).
+    """
+    if not conteos:
+        return {}
+
+    valores = [
+        {
+            "hash_sha256": sha256,
+            "ruta_almacenamiento": ruta_contenido(sha256),
+            "tamaño_bytes": tamaño,
+            "referencias": n
+        }
+        # orden fijo de locks: dos lotes concurrentes no se bloquean en cruz
+        for sha256, (tamaño, n) in sorted(conteos.items())
+    ]
+    stmt = pg_insert(ContenidoArchivo).values(valores)
+    stmt = (
+        stmt.on_conflict_do_update(
+            index_elements=[ContenidoArchivo.hash_sha256],
+            set_={"referencias": ContenidoArchivo.referencias + stmt.excluded.referencias}
+        )
+        .returning(ContenidoArchivo.hash_sha256, ContenidoArchivo.referencias)
+    )
+    filas = (await db.execute(stmt)).all()
+
+    return {sha256: referencias == conteos[sha256][1] for sha256, referencias in filas}
+
+
+async def almacenar_contenido(
+    db: AsyncSession,
+    f,
+    tamaño: int,
+    sha256: str,
+    mover_desde: str | None = None
+) -> str:
+    """Suma una referencia al blob `sha256`; solo escribe a disco si es nuevo.
+
+    Con `mover_desde` (un temporal propio en el mismo disco) el blob nuevo se
+    renombra en lugar de copiarse. El upsert toma el lock de la fila antes de
+    tocar el disco, así que el barrido no puede borrar el archivo recién
+    copiado.
+    """
+    destino = ruta_contenido(sha256)
+    es_nuevo = (await sumar_referencias(db, {sha256: (tamaño, 1)}))[sha256]
+
+    # duplicado: el blob ya está en disco, no se escribe nada
+    if es_nuevo or not await run_in_threadpool(os.path.exists, destino):
+        await escribir_contenido(db, destino, f, mover_desde)
+
+    return destino
+
+
+async def liberar_contenido(db: AsyncSession, sha256: str) -> bool:
+    """Resta una referencia; el blob sin referencias lo borra barrer_contenidos.
+
+    Devuelve False si el hash no está en el store (archivos previos al store).
+    """
+    stmt = (
+        update(ContenidoArchivo)
+        .where(ContenidoArchivo.hash_sha256 == sha256)
+        .values(referencias=ContenidoArchivo.referencias - 1)
+        .returning(ContenidoArchivo.referencias)
+    )
+    return (await db.execute(stmt)).scalar_one_or_none() is not None
+
+
+async def barrer_contenidos(db: AsyncSession, limite: int = 1000) -> int:
+    """Borra filas y blobs sin referencias. No hace commit.
+
+    Los archivos se borran con los locks de las filas tomados: una carga
+    concurrente del mismo hash espera al commit y vuelve a escribir el blob.
+    Si el commit fallara, las filas vuelven con cero referencias y la
+    próxima carga las trata como nuevas.
+    """
+    candidatos = (
+        select(ContenidoArchivo.hash_sha256)
+        .where(
+            ContenidoArchivo.referencias <= 0,
+            ~exists().where(Archivo.hash_sha256 == ContenidoArchivo.hash_sha256)
+        )
+        .limit(limite)
+        .with_for_update(skip_locked=True)
+    )
+    borrados = list(await db.scalars(
+        delete(ContenidoArchivo)
+        .where(ContenidoArchivo.hash_sha256.in_(candidatos.scalar_subquery()))
+        .returning(ContenidoArchivo.hash_sha256)
+    ))
+
+    def eliminar():
+        for sha256 in borrados:
+            eliminar_silencioso(ruta_contenido(sha256))
+
+    await run_in_threadpool(eliminar)
+    return len(borrados)
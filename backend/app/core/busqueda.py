@@ -0,0 +1,63 @@
+# app/core/busqueda.py
+# Búsqueda por subcadena sobre índices trigram (pg_trgm).
+#
+# Un `ILIKE '%x%'` puede usar un índice GIN gin_trgm_ops siempre que el
+# patrón tenga al menos un trigrama fijo; por eso la entrada del usuario
+# se escapa (un "%" o "_" suelto convertiría el filtro en comodín).
+from sqlalchemy import DDL, Index, event, func, literal, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import Base
+
+# la extensión tiene que existir antes que los índices que la usan
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+)
+
+ESCAPE = "\\"
+
+
+def escapar_like(valor: str) -> str:
+    """Escapa los comodines de LIKE para buscar `valor` literalmente."""
+    return (
+        valor.replace(ESCAPE, ESCAPE * 2)
+        .replace("%", ESCAPE + "%")
+        .replace("_", ESCAPE + "_")
+    )
+
+
+def filtro_contiene(columna, valor: str):
+    """`columna ILIKE '%valor%'` sin comodines inyectados por el usuario."""
+    return columna.ilike(f"%{escapar_like(valor)}%", escape=ESCAPE)
+
+
+def indice_trigram(nombre: str, expresion: str) -> Index:
+    """Índice GIN gin_trgm_ops sobre una columna o expresión SQL.
+
+    `expresion` es SQL crudo ("nombre", "(nombre || ' ' || apellido)")
+    para poder declararlo en __table_args__ antes de que exista la clase.
+    """
+    return Index(nombre, text(f"{expresion} gin_trgm_ops"), postgresql_using="gin")
+
+
+# ---------------------------
+#   SIMILITUD (ranking difuso)
+#   `valor <% expr` es el operador de word_similarity: lo resuelve el
+#   índice GIN y tolera errores de tipeo ("gonzales" ~ "González").
+# ---------------------------
+async def fijar_umbral_similitud(db: AsyncSession, umbral: float):
+    # solo para la transacción en curso
+    await db.execute(
+        func.set_config("pg_trgm.word_similarity_threshold", str(umbral), True).select()
+    )
+
+
+def coincide_similar(expresion, valor: str):
+    # en Postgres <% y || tienen la misma precedencia: se agrupa la expresión
+    return literal(valor).op("<%")(expresion.self_group())
+
+
+def similitud(expresion, valor: str):
+    return func.word_similarity(valor, expresion)
@@ -6,6 +6,98 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
 
+    # Archivos subidos
+    UPLOAD_DIR: str = "uploads"
+    UPLOAD_MAX_BYTES: int = 250 * 1024 * 1024
+    UPLOAD_CHUNK_BYTES: int = 1024 * 1024
+    UPLOAD_SESION_TTL_MINUTOS: int = 24 * 60
+    UPLOAD_BARRIDO_SEGUNDOS: int = 600
+    UPLOAD_LOTE_MAX_ARCHIVOS: int = 500
+    UPLOAD_LOTE_CONCURRENCIA: int = 4
+
+    # Migraciones (python -m app.cli migrar). En True la API migra al
+    # arrancar; en producción conviene correrlas como paso del despliegue
+    MIGRAR_AL_INICIAR: bool = False
+
+    # OCR en segundo plano (proceso aparte: python -m app.cli ocr)
+    OCR_MOTOR: str = "tesseract"        # tesseract / stub
+    OCR_IDIOMA: str = "spa"
+    OCR_DPI: int = 300
+    OCR_PROCESOS: int = 0               # 0 = un proceso por núcleo
+    OCR_DOCUMENTOS_EN_VUELO: int = 2
+    OCR_COLA_MAX: int = 8
+    OCR_INTERVALO_SEGUNDOS: int = 5
+    OCR_TIMEOUT_MINUTOS: int = 5        # sin latido durante este tiempo -> se vuelve a reclamar
+    OCR_LATIDO_SEGUNDOS: int = 60
+    OCR_MAX_INTENTOS: int = 3
+
+    # Cola de trabajos (workers: python -m app.cli worker)
+    COLA_VISIBILIDAD_SEGUNDOS: int = 300
+    COLA_MAX_INTENTOS: int = 5
+    COLA_BACKOFF_BASE_SEGUNDOS: int = 10
+    COLA_BACKOFF_MAX_SEGUNDOS: int = 3600
+    COLA_SONDEO_SEGUNDOS: float = 1.0
+    COLA_RETENCION_DIAS: int = 7
+
+    # Carga masiva de observaciones (POST /observaciones/lote)
+    OBS_LOTE_TAMANO: int = 5000          # filas validadas y copiadas por tanda
+    OBS_LOTE_MAX_FILAS: int = 1_000_000
+
+    # Series agregadas (GET /observaciones/agregados)
+    OBS_AGREGADOS_PUNTOS: int = 300          # puntos objetivo si no se pide ancho
+    OBS_AGREGADOS_MAX_PUNTOS: int = 5000
+    OBS_AGREGADOS_DIAS_ROLLUP: int = 2       # desde este rango se usa el rollup horario
+    OBS_HORARIAS_REFRESCO_MINUTOS: int = 5
+    OBS_HORARIAS_REPASO_MINUTOS: int = 30
+
+    # Particiones mensuales de observaciones (python -m app.cli particiones)
+    OBS_PARTICIONES_MESES_ADELANTE: int = 3
+    OBS_PARTICIONES_RETENCION_MESES: int = 0     # 0 = no se archiva nada
+    OBS_PARTICIONES_ESQUEMA_ARCHIVO: str = "archivo"
+    OBS_PARTICIONES_REVISION_HORAS: int = 6
+
+    # Códigos de tipos_observacion que se muestran como signos vitales
+    OBS_CODIGOS_VITALES: list[str] = [
+        "pulso",
+        "presion_sistolica",
+        "presion_diastolica",
+        "oxigeno",
+        "temperatura",
+        "creatinina",
+        "glucosa",
+    ]
+
+    # Características del clasificador (app/ml/caracteristicas.py)
+    ML_VENTANA_HORAS: int = 24               # se toma el último valor dentro de la ventana
+
+    # Clasificador (python -m app.cli entrenar). Sin ML_MODELO_RUTA se usa
+    # la última versión de ML_DIR
+    ML_HABILITADO: bool = True
+    ML_DIR: str = "modelos"
+    ML_MODELO_RUTA: str = ""
+    ML_MOTOR: str = "numpy"                  # numpy (app/ml/motor_numpy.py) / sklearn
+    ML_LOTE_MAX: int = 512                   # filas por llamada a predict_proba
+    ML_LOTE_ESPERA_MS: float = 2.0           # espera para juntar peticiones concurrentes
+    ML_PUNTUAR_MINUTOS: int = 15             # puntuación de admisiones activas (0 = solo a pedido)
+    ML_PUNTUAR_LOTE: int = 20_000            # admisiones por consulta de características
+    ML_DERIVA_VOLCADO_SEGUNDOS: int = 60     # cada cuánto la API guarda los estadísticos de deriva
+    ML_DERIVA_HORAS: int = 24                # ventana por defecto del informe de deriva
+
+    # Listados (paginación por cursor)
+    PAGINA_TAMANO_DEFECTO: int = 50
+    PAGINA_TAMANO_MAX: int = 500
+
+    # Exportación en streaming (?formato=ndjson|csv en los listados)
+    EXPORTAR_FILAS_POR_TANDA: int = 2000
+
+    # Exportación columnar (Parquet / Arrow, requiere pyarrow)
+    EXPORTAR_FILAS_POR_GRUPO: int = 100_000     # filas por row group
+    EXPORTAR_PARQUET_COMPRESION: str = "zstd"
+    EXPORTAR_MARGEN_SEGUNDOS: int = 60          # atraso de la marca de agua
+
+    # Búsqueda difusa (pg_trgm): 0-1, más alto = más estricto
+    BUSQUEDA_SIMILITUD_MINIMA: float = 0.3
+
     model_config = {
         "env_file": ".env",
         "extra": "ignore"
@@ -0,0 +1,192 @@
+# app/core/descargas.py
+import mimetypes
+import os
+from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from urllib.parse import quote
+
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import Response
+
+CHUNK_DESCARGA = 256 * 1024
+
+MEDIA_TYPES = {
+    "pdf": "application/pdf",
+    "jpg": "image/jpeg",
+    "jpeg": "image/jpeg",
+    "png": "image/png",
+}
+
+
+def media_type_de(tipo_archivo: str | None, nombre: str | None = None) -> str:
+    if tipo_archivo and tipo_archivo.lower() in MEDIA_TYPES:
+        return MEDIA_TYPES[tipo_archivo.lower()]
+    adivinado, _ = mimetypes.guess_type(nombre or "")
+    return adivinado or "application/octet-stream"
+
+
+def content_disposition(nombre: str, disposicion: str = "attachment") -> str:
+    citado = quote(nombre)
+    if citado != nombre:
+        return f"{disposicion}; filename*=utf-8''{citado}"
+    return f'{disposicion}; filename="{nombre}"'
+
+
+def http_date(fecha: datetime) -> str:
+    return format_datetime(fecha.replace(microsecond=0), usegmt=True)
+
+
+# ---------------------------
+#   VALIDADORES (ETag / fechas)
+# ---------------------------
+def _etags(header: str) -> list[str]:
+    return [e.strip() for e in header.split(",") if e.strip()]
+
+
+def _sin_weak(etag: str) -> str:
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def no_modificado(headers, etag: str | None, ultima_modificacion: datetime | None) -> bool:
+    """True si la petición condicional permite responder 304."""
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match manda sobre If-Modified-Since (RFC 9110 13.2.2)
+        if etag is None:
+            return False
+        candidatos = _etags(if_none_match)
+        return "*" in candidatos or _sin_weak(etag) in {_sin_weak(c) for c in candidatos}
+
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since and ultima_modificacion is not None:
+        try:
+            fecha = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return ultima_modificacion.replace(microsecond=0) <= fecha
+
+    return False
+
+
+def rango_aplicable(headers, etag: str | None, ultima_modificacion: datetime | None) -> bool:
+    """Evalúa If-Range: el rango solo vale si el recurso no cambió."""
+    if_range = headers.get("if-range")
+    if if_range is None:
+        return True
+    if if_range.startswith('"') or if_range.startswith("W/"):
+        # If-Range exige comparación fuerte
+        return etag is not None and not etag.startswith("W/") and if_range == etag
+    if ultima_modificacion is None:
+        return False
+    try:
+        return parsedate_to_datetime(if_range) == ultima_modificacion.replace(microsecond=0)
+    except (TypeError, ValueError):
+        return False
+
+
+def parsear_rango(header: str | None, tamaño: int) -> tuple[int, int] | None:
+    """Devuelve (inicio, fin) inclusivo para un único rango `bytes=`.
+
+    Rangos múltiples o mal formados se ignoran (se sirve el archivo entero);
+    un rango fuera del archivo responde 416.
+    """
+    if not header or not header.startswith("bytes="):
+        return None
+
+    especificacion = header[len("bytes="):].strip()
+    if "," in especificacion or "-" not in especificacion:
+        return None
+
+    inicio_txt, fin_txt = (p.strip() for p in especificacion.split("-", 1))
+    try:
+        if inicio_txt == "":
+            # sufijo: los últimos N bytes
+            largo = int(fin_txt)
+            if largo <= 0:
+                raise ValueError
+            inicio, fin = max(tamaño - largo, 0), tamaño - 1
+        else:
+            inicio = int(inicio_txt)
+            fin = int(fin_txt) if fin_txt else tamaño - 1
+            fin = min(fin, tamaño - 1)
+    except ValueError:
+        return None
+
+    if inicio < 0 or inicio > fin or inicio >= tamaño:
+        raise HTTPException(
+            status_code=416,
+            detail="Rango no satisfacible",
+            headers={"Content-Range": f"bytes */{tamaño}"}
+        )
+
+    return inicio, fin
+
+
+# ---------------------------
+#   RESPUESTA
+#   Usa la extensión ASGI zerocopysend (sendfile del kernel) cuando el
+#   servidor la ofrece; si no, lee por bloques en el threadpool.
+# ---------------------------
+class RespuestaArchivo(Response):
+    def __init__(
+        self,
+        ruta: str,
+        tamaño: int,
+        status_code: int = 200,
+        headers: dict | None = None,
+        media_type: str | None = None,
+        rango: tuple[int, int] | None = None
+    ):
+        self.ruta = ruta
+        self.status_code = status_code
+        self.media_type = media_type
+        self.background = None
+        self.inicio, self.fin = rango if rango else (0, tamaño - 1)
+        self.largo = max(self.fin - self.inicio + 1, 0)
+
+        self.init_headers(headers)
+        self.headers["content-length"] = str(self.largo)
+
+    async def __call__(self, scope, receive, send):
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers,
+        })
+
+        if scope.get("method") == "HEAD" or self.largo == 0:
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        extensiones = scope.get("extensions") or {}
+        f = await run_in_threadpool(open, self.ruta, "rb")
+        try:
+            if "http.response.zerocopysend" in extensiones:
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": f,
+                    "offset": self.inicio,
+                    "count": self.largo,
+                })
+                return
+
+            posicion = self.inicio
+            restante = self.largo
+            while restante > 0:
+                bloque = await run_in_threadpool(
+                    os.pread, f.fileno(), min(CHUNK_DESCARGA, restante), posicion
+                )
+                if not bloque:
+                    break
+                posicion += len(bloque)
+                restante -= len(bloque)
+                await send({
+                    "type": "http.response.body",
+                    "body": bloque,
+                    "more_body": restante > 0,
+                })
+            if restante > 0:
+                await send({"type": "http.response.body", "body": b""})
+        finally:
+            await run_in_threadpool(f.close)
@@ -0,0 +1,129 @@
+# app/core/exportacion.py
+# Exportación en streaming de los listados. Con `?formato=ndjson|csv` (o
+# Accept: application/x-ndjson / text/csv) un listado deja de paginar y
+# devuelve el resultado completo fila por fila: la consulta corre con un
+# cursor del servidor y cada tanda de EXPORTAR_FILAS_POR_TANDA filas se
+# serializa y se manda antes de pedir la siguiente. La memoria queda
+# acotada a una tanda sin importar el tamaño del resultado.
+import csv
+import io
+import json
+from typing import Any, AsyncIterator, Callable
+
+from fastapi import HTTPException, Query, Request
+from pydantic import BaseModel
+from starlette.responses import StreamingResponse
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.descargas import content_disposition
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+ACCEPT = {
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "text/csv": "csv",
+}
+
+# para documentar los formatos extra en OpenAPI: @router.get(..., responses=RESPUESTAS_EXPORTACION)
+RESPUESTAS_EXPORTACION = {
+    200: {"content": {"application/x-ndjson": {}, "text/csv": {}}}
+}
+
+
+def formato_respuesta(
+    request: Request,
+    formato: str | None = Query(
+        None,
+        description="json (paginado, por defecto) / ndjson / csv (todo el resultado en streaming)"
+    )
+) -> str:
+    """Dependencia común: `formato: str = Depends(formato_respuesta)`."""
+    if formato:
+        formato = formato.lower()
+        if formato != "json" and formato not in MEDIA_TYPES:
+            raise HTTPException(400, "Formato no soportado (json, ndjson o csv)")
+        return formato
+
+    for tipo in request.headers.get("accept", "").split(","):
+        elegido = ACCEPT.get(tipo.split(";")[0].strip().lower())
+        if elegido:
+            return elegido
+    return "json"
+
+
+async def _tandas(stmt, escalares: bool) -> AsyncIterator[list]:
+    # sesión propia: la de get_db se cierra al salir del endpoint, antes
+    # de que termine el streaming
+    async with SessionLocal() as db:
+        result = await db.stream(stmt.execution_options(yield_per=settings.EXPORTAR_FILAS_POR_TANDA))
+        if escalares:
+            result = result.scalars()
+        async for tanda in result.partitions():
+            yield tanda
+
+
+def _celda(valor):
+    if valor is None:
+        return ""
+    if isinstance(valor, (dict, list)):
+        return json.dumps(valor, ensure_ascii=False)
+    return valor
+
+
+async def _ndjson(tandas, esquema: type[BaseModel], convertir):
+    async for tanda in tandas:
+        yield "".join(
+            esquema.model_validate(convertir(fila)).model_dump_json() + "\n"
+            for fila in tanda
+        ).encode()
+
+
+async def _csv(tandas, esquema: type[BaseModel], convertir):
+    columnas = list(esquema.model_fields)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(columnas)
+    async for tanda in tandas:
+        for fila in tanda:
+            datos = esquema.model_validate(convertir(fila)).model_dump(mode="json")
+            writer.writerow([_celda(datos[c]) for c in columnas])
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def respuesta_streaming(
+    stmt,
+    esquema: type[BaseModel],
+    formato: str,
+    nombre: str,
+    *orden,
+    convertir: Callable[[Any], Any] | None = None
+) -> StreamingResponse:
+    """Exporta `stmt` completo como NDJSON o CSV, validando cada fila con `esquema`.
+
+    `orden` son las mismas columnas del cursor del listado. Sin `convertir`
+    se exporta la primera entidad de cada fila; con `convertir(fila)` se
+    arma el objeto a validar a partir de la fila completa.
+    """
+    if orden:
+        stmt = stmt.order_by(*(c.desc() for c in orden))
+
+    tandas = _tandas(stmt, escalares=convertir is None)
+    convertir = convertir or (lambda obj: obj)
+    cuerpo = _ndjson if formato == "ndjson" else _csv
+
+    return StreamingResponse(
+        cuerpo(tandas, esquema, convertir),
+        media_type=MEDIA_TYPES[formato],
+        headers={"Content-Disposition": content_disposition(f"{nombre}.{formato}")}
+    )
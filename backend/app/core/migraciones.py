@@ -0,0 +1,181 @@
+# app/core/migraciones.py
+# Migraciones versionadas del esquema. Cada módulo
+# app/migraciones/vNNNN_<nombre>.py define DESCRIPCION y
+# `async def aplicar(conn)`; con TRANSACCIONAL = False corre en autocommit
+# (CREATE INDEX CONCURRENTLY no admite transacción).
+#
+# Se aplican con `python -m app.cli migrar`, bajo un advisory lock para que
+# dos despliegues simultáneos no migren a la vez. La API al arrancar solo
+# verifica la versión. En una base vacía v0001 crea el esquema completo de
+# los modelos actuales, así que las migraciones siguientes tienen que ser
+# idempotentes (IF NOT EXISTS).
+import importlib
+import logging
+import pkgutil
+import re
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+import app.migraciones
+import app.models
+
+logger = logging.getLogger("uvicorn.error")
+
+# clave fija de pg_advisory_lock ("INAA")
+CLAVE_LOCK = 0x494E4141
+
+CREAR_TABLA_VERSION = text("""
+    CREATE TABLE IF NOT EXISTS esquema_version (
+        version INTEGER PRIMARY KEY,
+        descripcion TEXT NOT NULL,
+        aplicada_en TIMESTAMPTZ NOT NULL DEFAULT now()
+    )
+""")
+
+
+class EsquemaDesactualizado(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class Migracion:
+    version: int
+    nombre: str
+    descripcion: str
+    transaccional: bool
+    aplicar: Callable[[AsyncConnection], Awaitable[None]]
+
+
+def cargar_modelos():
+    """Importa todos los modelos para que queden registrados en Base.metadata."""
+    for modulo in pkgutil.iter_modules(app.models.__path__):
+        importlib.import_module(f"app.models.{modulo.name}")
+
+
+def cargar_migraciones() -> list[Migracion]:
+    migraciones = []
+    for modulo in pkgutil.iter_modules(app.migraciones.__path__):
+        coincidencia = re.match(r"v(\d+)_", modulo.name)
+        if not coincidencia:
+            continue
+
+        m = importlib.import_module(f"app.migraciones.{modulo.name}")
+        migraciones.append(Migracion(
+            version=int(coincidencia.group(1)),
+            nombre=modulo.name,
+            descripcion=m.DESCRIPCION,
+            transaccional=getattr(m, "TRANSACCIONAL", True),
+            aplicar=m.aplicar
+        ))
+
+    migraciones.sort(key=lambda m: m.version)
+    versiones = [m.version for m in migraciones]
+    if len(set(versiones)) != len(versiones):
+        raise RuntimeError(f"Versiones de migración repetidas: {versiones}")
+    return migraciones
+
+
+def version_esperada() -> int:
+    migraciones = cargar_migraciones()
+    return migraciones[-1].version if migraciones else 0
+
+
+async def version_actual(conn: AsyncConnection) -> int:
+    if await conn.scalar(text("SELECT to_regclass('esquema_version')")) is None:
+        return 0
+    return await conn.scalar(text("SELECT coalesce(max(version), 0) FROM esquema_version"))
+
+
+# ---------------------------
+#   AYUDAS PARA MIGRACIONES
+# ---------------------------
+async def crear_indice_concurrente(conn: AsyncConnection, nombre: str, definicion: str):
+    """CREATE INDEX CONCURRENTLY `nombre` `definicion` si no existe.
+
+    Un CONCURRENTLY interrumpido deja el índice marcado inválido y un
+    IF NOT EXISTS lo daría por hecho: se borra y se vuelve a crear. Si ya
+    existe válido no se manda nada (Postgres rechaza CONCURRENTLY sobre
+    tablas particionadas aunque el índice exista).
+    """
+    valido = await conn.scalar(
+        text("""
+            SELECT i.indisvalid
+            FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE c.relname = :nombre
+        """),
+        {"nombre": nombre}
+    )
+    if valido:
+        return
+    if valido is False:
+        logger.warning("Índice %s inválido (build interrumpido): se recrea", nombre)
+        await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {nombre}"))
+
+    await conn.execute(text(f"CREATE INDEX CONCURRENTLY {nombre} {definicion}"))
+
+
+# ---------------------------
+#   APLICAR / VERIFICAR
+# ---------------------------
+async def _registrar(conn: AsyncConnection, m: Migracion):
+    await conn.execute(
+        text("INSERT INTO esquema_version (version, descripcion) VALUES (:v, :d)"),
+        {"v": m.version, "d": m.descripcion}
+    )
+
+
+async def migrar(engine: AsyncEngine, hasta: int | None = None) -> list[Migracion]:
+    """Aplica en orden las migraciones pendientes (hasta `hasta` inclusive)."""
+    cargar_modelos()
+    migraciones = cargar_migraciones()
+    aplicadas = []
+
+    async with engine.connect() as lock:
+        # lock de sesión: sobrevive a los commits y se suelta al final
+        await lock.execute(text("SELECT pg_advisory_lock(:k)"), {"k": CLAVE_LOCK})
+        await lock.commit()
+        try:
+            async with engine.begin() as conn:
+                await conn.execute(CREAR_TABLA_VERSION)
+                hechas = set((await conn.execute(text("SELECT version FROM esquema_version"))).scalars())
+
+            for m in migraciones:
+                if m.version in hechas or (hasta is not None and m.version > hasta):
+                    continue
+
+                logger.info("Migración %s: %s", m.nombre, m.descripcion)
+                if m.transaccional:
+                    async with engine.begin() as conn:
+                        await m.aplicar(conn)
+                        await _registrar(conn, m)
+                else:
+                    async with engine.connect() as conn:
+                        await conn.execution_options(isolation_level="AUTOCOMMIT")
+                        await m.aplicar(conn)
+                        await _registrar(conn, m)
+                aplicadas.append(m)
+        finally:
+            await lock.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": CLAVE_LOCK})
+            await lock.commit()
+
+    return aplicadas
+
+
+async def verificar_esquema(engine: AsyncEngine) -> int:
+    """Devuelve la versión de la base o lanza EsquemaDesactualizado."""
+    esperada = version_esperada()
+    async with engine.connect() as conn:
+        actual = await version_actual(conn)
+
+    if actual < esperada:
+        raise EsquemaDesactualizado(
+            f"La base está en la versión {actual} y el código espera la {esperada}: "
+            "ejecute `python -m app.cli migrar`"
+        )
+    if actual > esperada:
+        logger.warning("La base (v%s) es más nueva que el código (v%s)", actual, esperada)
+
+    return actual
@@ -0,0 +1,95 @@
+# app/core/paginacion.py
+# Paginación por cursor (keyset). En lugar de OFFSET, cada página pide
+# "lo que viene después de (marca de tiempo, id)" del último item, así que
+# la página 1000 cuesta lo mismo que la primera si hay un índice sobre
+# esas columnas. El cursor es opaco para el cliente: base64 de los valores.
+import base64
+import json
+from datetime import datetime
+from uuid import UUID
+
+from fastapi import HTTPException, Query
+from sqlalchemy import literal, tuple_
+
+from app.core.config import settings
+
+
+class ParametrosPagina:
+    """Dependencia común: `pag: ParametrosPagina = Depends()`."""
+
+    def __init__(
+        self,
+        cursor: str | None = Query(None, description="next_cursor de la página anterior"),
+        limite: int = Query(
+            settings.PAGINA_TAMANO_DEFECTO, ge=1, le=settings.PAGINA_TAMANO_MAX
+        )
+    ):
+        self.cursor = cursor
+        self.limite = limite
+
+
+def _a_json(valor):
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+    if isinstance(valor, UUID):
+        return str(valor)
+    return valor
+
+
+def _desde_json(valor, tipo: type):
+    if valor is None:
+        return None
+    if tipo is datetime:
+        return datetime.fromisoformat(valor)
+    return tipo(valor)
+
+
+def codificar_cursor(valores: tuple) -> str:
+    crudo = json.dumps([_a_json(v) for v in valores]).encode()
+    return base64.urlsafe_b64encode(crudo).decode()
+
+
+def decodificar_cursor(cursor: str, columnas: list) -> list:
+    try:
+        valores = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if len(valores) != len(columnas):
+            raise ValueError
+        return [_desde_json(v, c.type.python_type) for v, c in zip(valores, columnas)]
+    except Exception:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+
+def paginar(stmt, pag: ParametrosPagina, *columnas):
+    """Ordena `stmt` por `columnas` (más reciente primero), aplica el cursor
+    y pide un item de más para saber si hay página siguiente.
+
+    La última columna tiene que desempatar (normalmente la PK).
+    """
+    if pag.cursor:
+        valores = decodificar_cursor(pag.cursor, columnas)
+        stmt = stmt.where(
+            tuple_(*columnas) < tuple_(*(literal(v, c.type) for v, c in zip(valores, columnas)))
+        )
+        # redundante, pero el planner no poda particiones ni acota índices
+        # a partir de la comparación de tuplas
+        if len(columnas) > 1:
+            stmt = stmt.where(columnas[0] <= literal(valores[0], columnas[0].type))
+    return stmt.order_by(*(c.desc() for c in columnas)).limit(pag.limite + 1)
+
+
+def armar_pagina(items: list, pag: ParametrosPagina, *columnas, clave=None) -> dict:
+    """Recorta el item extra y arma {items, next_cursor}.
+
+    Por defecto los valores del cursor se leen de los atributos de cada
+    item con el nombre de `columnas`; `clave(item) -> tuple` lo reemplaza.
+    """
+    items = list(items)
+    next_cursor = None
+
+    if len(items) > pag.limite:
+        items = items[:pag.limite]
+        ultimo = items[-1]
+        valores = clave(ultimo) if clave else tuple(getattr(ultimo, c.key) for c in columnas)
+        next_cursor = codificar_cursor(valores)
+
+    return {"items": items, "next_cursor": next_cursor}
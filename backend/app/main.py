@@ -1,17 +1,25 @@
 import logging
 from fastapi import FastAPI
-from app.core.database import engine, Base
+from app.core.config import settings
+from app.core.database import engine
+from app.core.migraciones import migrar, verificar_esquema, EsquemaDesactualizado
+from app.ml.inferencia import Predictor
+from app.ml.modelo import cargar as cargar_modelo, ModeloNoDisponible
 from app.routers.usuarios import router as usuarios_router
 from app.routers.pacientes import router as pacientes_router
 from app.routers.roles import router as roles_router
 from app.routers.usuarios_roles import router as usuarios_roles_router
 from app.routers.archivos import router as archivos_router
+from app.routers.cargas_archivos import router as cargas_archivos_router
 from app.routers.tipos_observacion import router as tipos_observacion_router
 from app.routers.admisiones import router as admisiones_router
 from app.routers.diagnosticos_secundarios import router as diagnosticos_secundarios_router
 from app.routers.ocr_crudo import router as ocr_crudo_router
 from app.routers.observaciones import router as observaciones_router
 from app.routers.revision_observaciones import router as revision_observaciones_router
+from app.routers.trabajos import router as trabajos_router
+from app.routers.exportaciones import router as exportaciones_router
+from app.routers.predicciones import router as predicciones_router
 from app.routers.auth import router as auth_router
 
 logger = logging.getLogger("uvicorn.error")
@@ -19,24 +27,54 @@ app = FastAPI()
 
 @app.on_event("startup")
 async def startup():
+    # el esquema lo crea/actualiza `python -m app.cli migrar`; acá solo se
+    # verifica (salvo MIGRAR_AL_INICIAR, pensado para desarrollo)
     try:
-        async with engine.begin() as conn:
-            await conn.run_sync(Base.metadata.create_all)
-        logger.info("Tablas creadas / conexión OK")
+        if settings.MIGRAR_AL_INICIAR:
+            await migrar(engine)
+        version = await verificar_esquema(engine)
+        logger.info("Esquema en versión %s / conexión OK", version)
+    except EsquemaDesactualizado:
+        raise
     except Exception as e:
-        logger.error("No se pudo crear tablas en startup: %s", e)
+        logger.error("No se pudo verificar el esquema en startup: %s", e)
+
+    # el barrido de cargas expiradas es una tarea periódica de la cola
+    # (python -m app.cli worker), no un bucle por worker de uvicorn
+
+    # el OCR corre en su propio proceso (python -m app.cli ocr): su pool
+    # ocupa todos los núcleos y no se multiplica por worker de uvicorn
+
+    # el modelo se carga una sola vez; sin modelo /predicciones responde 503
+    app.state.predictor = None
+    if settings.ML_HABILITADO:
+        try:
+            app.state.predictor = Predictor(cargar_modelo())
+            await app.state.predictor.iniciar()
+        except ModeloNoDisponible as e:
+            logger.warning("Predicciones deshabilitadas: %s", e)
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    if app.state.predictor:
+        await app.state.predictor.detener()
 
 app.include_router(usuarios_router)
 app.include_router(pacientes_router)
 app.include_router(roles_router)
 app.include_router(usuarios_roles_router)
 app.include_router(archivos_router)
+app.include_router(cargas_archivos_router)
 app.include_router(tipos_observacion_router)
 app.include_router(admisiones_router)
 app.include_router(diagnosticos_secundarios_router)
 app.include_router(ocr_crudo_router)
 app.include_router(observaciones_router)
 app.include_router(revision_observaciones_router)
+app.include_router(trabajos_router)
+app.include_router(exportaciones_router)
+app.include_router(predicciones_router)
 app.include_router(auth_router)
 
 @app.get("/")
@@ -0,0 +1 @@
+# package migraciones
\ No newline at end of file
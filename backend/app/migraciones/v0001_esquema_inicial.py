@@ -0,0 +1,12 @@
+# app/migraciones/v0001_esquema_inicial.py
+# Punto de partida: crea las tablas que falten a partir de los modelos
+# (lo mismo que hacía create_all al arrancar). En una base existente solo
+# agrega las tablas nuevas; columnas e índices de tablas viejas van en las
+# migraciones siguientes.
+from app.core.database import Base
+
+DESCRIPCION = "Esquema inicial (tablas de los modelos)"
+
+
+async def aplicar(conn):
+    await conn.run_sync(Base.metadata.create_all)
@@ -0,0 +1,26 @@
+# app/migraciones/v0002_columnas_agregadas.py
+# Columnas que se sumaron a tablas existentes mientras el esquema se creaba
+# con create_all (que nunca altera una tabla ya creada).
+from sqlalchemy import text
+
+DESCRIPCION = "Columnas hash_sha256 (archivos) y texto_busqueda (ocr_crudo)"
+
+SENTENCIAS = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """
+    ALTER TABLE archivos
+        ADD COLUMN IF NOT EXISTS hash_sha256 TEXT
+        REFERENCES contenidos_archivo (hash_sha256)
+    """,
+    # columna generada: reescribe ocr_crudo una vez
+    """
+    ALTER TABLE ocr_crudo
+        ADD COLUMN IF NOT EXISTS texto_busqueda TSVECTOR
+        GENERATED ALWAYS AS (to_tsvector('spanish'::regconfig, coalesce(texto, ''))) STORED
+    """,
+]
+
+
+async def aplicar(conn):
+    for sql in SENTENCIAS:
+        await conn.execute(text(sql))
@@ -0,0 +1,77 @@
+# app/migraciones/v0003_indices_rendimiento.py
+# Índices de claves foráneas, compuestos que siguen los filtros y el orden
+# de cursor de los routers, parciales sobre estado = 'activo', y los de
+# búsqueda (trigram / tsvector) que create_all no agregó a tablas que ya
+# existían. CONCURRENTLY para no bloquear escrituras en tablas grandes.
+from app.core.migraciones import crear_indice_concurrente
+
+DESCRIPCION = "Índices de FKs, compuestos, parciales y de búsqueda"
+TRANSACCIONAL = False
+
+INDICES = [
+    # observaciones
+    ("ix_observaciones_paciente_tipo_fecha", "ON observaciones (id_paciente, id_tipo_obs, fecha_hora)"),
+    ("ix_observaciones_admision_tipo_fecha", "ON observaciones (id_admision, id_tipo_obs, fecha_hora)"),
+    ("ix_observaciones_tipo_fecha", "ON observaciones (id_tipo_obs, fecha_hora)"),
+    ("ix_observaciones_fecha", "ON observaciones (fecha_hora, id_observacion)"),
+    ("ix_observaciones_creado_en", "ON observaciones (creado_en)"),
+    ("ix_observaciones_archivo", "ON observaciones (id_archivo) WHERE id_archivo IS NOT NULL"),
+    ("ix_observaciones_ocr", "ON observaciones (id_ocr) WHERE id_ocr IS NOT NULL"),
+    ("ix_observaciones_valor_texto_trgm", "ON observaciones USING gin (valor_texto gin_trgm_ops)"),
+    ("ix_observaciones_unidad_trgm", "ON observaciones USING gin (unidad gin_trgm_ops)"),
+
+    # admisiones
+    ("ix_admisiones_paciente_ingreso", "ON admisiones (id_paciente, fecha_ingreso)"),
+    ("ix_admisiones_creado_en", "ON admisiones (creado_en, id_admision)"),
+    (
+        "ix_admisiones_activas",
+        "ON admisiones (fecha_ingreso, id_admision) WHERE estado = 'activo' AND fecha_salida IS NULL"
+    ),
+    ("ix_admisiones_diagnostico_principal_trgm", "ON admisiones USING gin (diagnostico_principal gin_trgm_ops)"),
+
+    # pacientes
+    ("ix_pacientes_creado_en", "ON pacientes (creado_en, id_paciente)"),
+    ("ix_pacientes_activos_creado_en", "ON pacientes (creado_en, id_paciente) WHERE estado = 'activo'"),
+    ("ix_pacientes_id_externo", "ON pacientes (id_externo)"),
+    ("ix_pacientes_nombre_trgm", "ON pacientes USING gin (nombre gin_trgm_ops)"),
+    ("ix_pacientes_apellido_trgm", "ON pacientes USING gin (apellido gin_trgm_ops)"),
+    ("ix_pacientes_nombre_apellido_trgm", "ON pacientes USING gin ((nombre || ' ' || apellido) gin_trgm_ops)"),
+
+    # archivos
+    ("ix_archivos_subido_en", "ON archivos (subido_en, id_archivo)"),
+    ("ix_archivos_activos_subido_en", "ON archivos (subido_en) WHERE estado = 'activo'"),
+    ("ix_archivos_hash_sha256", "ON archivos (hash_sha256)"),
+    ("ix_archivos_subido_por", "ON archivos (subido_por)"),
+    ("ix_archivos_nombre_archivo_trgm", "ON archivos USING gin (nombre_archivo gin_trgm_ops)"),
+
+    # ocr_crudo
+    ("ix_ocr_crudo_archivo_pagina", "ON ocr_crudo (id_archivo, pagina)"),
+    ("ix_ocr_crudo_creado_en", "ON ocr_crudo (creado_en, id_ocr)"),
+    ("ix_ocr_crudo_texto_busqueda", "ON ocr_crudo USING gin (texto_busqueda)"),
+
+    # revision_observaciones
+    ("ix_revision_observaciones_observacion", "ON revision_observaciones (id_observacion)"),
+    ("ix_revision_observaciones_revisor", "ON revision_observaciones (id_usuario_revisor)"),
+    ("ix_revision_observaciones_comentarios_trgm", "ON revision_observaciones USING gin (comentarios gin_trgm_ops)"),
+
+    # resto
+    ("ix_diagnosticos_secundarios_admision", "ON diagnosticos_secundarios (id_admision)"),
+    (
+        "ix_diagnosticos_secundarios_diagnostico_trgm",
+        "ON diagnosticos_secundarios USING gin (diagnostico gin_trgm_ops)"
+    ),
+    ("ix_tipos_observacion_codigo", "ON tipos_observacion (codigo)"),
+    ("ix_usuarios_roles_rol", "ON usuarios_roles (id_rol)"),
+    ("ix_usuarios_nombre_completo_trgm", "ON usuarios USING gin (nombre_completo gin_trgm_ops)"),
+    ("ix_usuarios_correo_electronico_trgm", "ON usuarios USING gin (correo_electronico gin_trgm_ops)"),
+    ("ix_sesiones_carga_expira_en", "ON sesiones_carga (expira_en)"),
+    (
+        "ix_trabajos_ocr_pendientes",
+        "ON trabajos_ocr (creado_en) WHERE estado IN ('pendiente', 'procesando')"
+    ),
+]
+
+
+async def aplicar(conn):
+    for nombre, definicion in INDICES:
+        await crear_indice_concurrente(conn, nombre, definicion)
@@ -0,0 +1,58 @@
+# app/migraciones/v0004_particionar_observaciones.py
+# Pasa observaciones a particiones mensuales por fecha_hora.
+#
+# Una base creada con el modelo actual ya la tiene particionada (sin
+# particiones): solo se crean default y los meses. Una base anterior se
+# convierte: la tabla vieja se renombra, se crea la particionada con las
+# particiones que cubren sus datos, se copian las filas y los índices se
+# construyen al final (más rápido que mantenerlos fila a fila). Corre en
+# una sola transacción y bloquea observaciones mientras copia.
+from sqlalchemy import text
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from app.models.observaciones import Observacion
+from app.servicios.particiones_observaciones import asegurar_particiones
+
+DESCRIPCION = "Particionar observaciones por mes (fecha_hora)"
+
+VIEJA = "observaciones_sin_particion"
+
+
+async def aplicar(conn):
+    # la FK no puede apuntar a una tabla particionada; la valida el router
+    await conn.execute(text(
+        "ALTER TABLE revision_observaciones "
+        "DROP CONSTRAINT IF EXISTS revision_observaciones_id_observacion_fkey"
+    ))
+
+    particionada = await conn.scalar(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+        "WHERE partrelid = 'observaciones'::regclass)"
+    ))
+    if particionada:
+        await asegurar_particiones(conn)
+        return
+
+    tabla = Observacion.__table__
+    columnas = ", ".join(c.name for c in tabla.columns)
+
+    # los nombres de índices son globales: la tabla vieja libera los suyos
+    for indice in tabla.indexes:
+        await conn.execute(text(f"DROP INDEX IF EXISTS {indice.name}"))
+    await conn.execute(text(f"ALTER TABLE observaciones RENAME TO {VIEJA}"))
+    await conn.execute(text(f"ALTER TABLE {VIEJA} RENAME CONSTRAINT observaciones_pkey TO {VIEJA}_pkey"))
+
+    await conn.execute(CreateTable(tabla))
+
+    # del primer mes con datos hasta el último (o los meses por venir)
+    primera, ultima = (await conn.execute(text(f"SELECT min(fecha_hora), max(fecha_hora) FROM {VIEJA}"))).one()
+    await asegurar_particiones(conn, desde=primera)
+    if ultima is not None:
+        await asegurar_particiones(conn, desde=primera, hasta=ultima)
+
+    await conn.execute(text(f"INSERT INTO observaciones ({columnas}) SELECT {columnas} FROM {VIEJA}"))
+    await conn.execute(text(f"DROP TABLE {VIEJA}"))
+
+    for indice in tabla.indexes:
+        await conn.execute(CreateIndex(indice))
+    await conn.execute(text("ANALYZE observaciones"))
@@ -0,0 +1,20 @@
+# app/migraciones/v0005_diagnosticos_creado_en.py
+# diagnosticos_secundarios no tenía creado_en y las exportaciones
+# incrementales lo usan como marca de agua. Las filas existentes quedan con
+# la fecha de la migración (now() se evalúa una vez; no reescribe la tabla).
+from sqlalchemy import text
+
+from app.core.migraciones import crear_indice_concurrente
+
+DESCRIPCION = "Columna creado_en en diagnosticos_secundarios"
+TRANSACCIONAL = False
+
+
+async def aplicar(conn):
+    await conn.execute(text(
+        "ALTER TABLE diagnosticos_secundarios "
+        "ADD COLUMN IF NOT EXISTS creado_en TIMESTAMPTZ DEFAULT now()"
+    ))
+    await crear_indice_concurrente(
+        conn, "ix_diagnosticos_secundarios_creado_en", "ON diagnosticos_secundarios (creado_en)"
+    )
@@ -0,0 +1,10 @@
+# app/migraciones/v0006_predicciones_admision.py
+# Tabla de predicciones por admisión (ver app/models/predicciones_admision.py).
+# Una base creada desde cero ya la tiene (v0001 usa los modelos actuales).
+from app.models.predicciones_admision import PrediccionAdmision
+
+DESCRIPCION = "Tabla predicciones_admision"
+
+
+async def aplicar(conn):
+    await conn.run_sync(PrediccionAdmision.__table__.create, checkfirst=True)
@@ -0,0 +1,10 @@
+# app/migraciones/v0007_deriva_modelo.py
+# Tabla de estadísticos de deriva del clasificador (ver app/models/deriva_modelo.py).
+# Una base creada desde cero ya la tiene (v0001 usa los modelos actuales).
+from app.models.deriva_modelo import DerivaModelo
+
+DESCRIPCION = "Tabla deriva_modelo"
+
+
+async def aplicar(conn):
+    await conn.run_sync(DerivaModelo.__table__.create, checkfirst=True)
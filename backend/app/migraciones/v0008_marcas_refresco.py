@@ -0,0 +1,12 @@
+# app/migraciones/v0008_marcas_refresco.py
+# Marca de agua propia del refresco de observaciones_horarias (antes se
+# tomaba max(actualizado_en), que también mueven las ediciones puntuales).
+# No se siembra: el primer refresco después de migrar reconstruye el
+# rollup entero y deja la marca.
+from app.models.marcas_refresco import MarcaRefresco
+
+DESCRIPCION = "Tabla marcas_refresco"
+
+
+async def aplicar(conn):
+    await conn.run_sync(MarcaRefresco.__table__.create, checkfirst=True)
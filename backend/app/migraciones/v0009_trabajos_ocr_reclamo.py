@@ -0,0 +1,14 @@
+# app/migraciones/v0009_trabajos_ocr_reclamo.py
+# Token de reclamo y latido en trabajos_ocr: un trabajo se reclama de nuevo
+# solo si su worker dejó de latir, y completarlo exige el token vigente.
+from sqlalchemy import text
+
+DESCRIPCION = "Columnas token_reclamo y latido_en en trabajos_ocr"
+
+
+async def aplicar(conn):
+    await conn.execute(text(
+        "ALTER TABLE trabajos_ocr "
+        "ADD COLUMN IF NOT EXISTS token_reclamo UUID, "
+        "ADD COLUMN IF NOT EXISTS latido_en TIMESTAMPTZ"
+    ))
@@ -0,0 +1,33 @@
+# app/migraciones/v0010_revision_observaciones_fk.py
+# Vuelve la FK de revision_observaciones a observaciones (la quitó v0004 al
+# particionar). Una FK a una tabla particionada tiene que cubrir su PK
+# completa, así que se agrega fecha_hora y se completa desde observaciones.
+# Las revisiones cuya observación ya no existe quedan con fecha_hora NULL
+# (MATCH SIMPLE no las valida).
+from sqlalchemy import text
+
+DESCRIPCION = "FK (id_observacion, fecha_hora) de revision_observaciones a observaciones"
+
+
+async def aplicar(conn):
+    await conn.execute(text(
+        "ALTER TABLE revision_observaciones ADD COLUMN IF NOT EXISTS fecha_hora TIMESTAMPTZ"
+    ))
+    await conn.execute(text("""
+        UPDATE revision_observaciones r
+        SET fecha_hora = o.fecha_hora
+        FROM observaciones o
+        WHERE o.id_observacion = r.id_observacion AND r.fecha_hora IS NULL
+    """))
+    await conn.execute(text(
+        "ALTER TABLE revision_observaciones "
+        "DROP CONSTRAINT IF EXISTS revision_observaciones_observacion_fkey"
+    ))
+    await conn.execute(text("""
+        ALTER TABLE revision_observaciones
+        ADD CONSTRAINT revision_observaciones_observacion_fkey
+        FOREIGN KEY (id_observacion, fecha_hora)
+        REFERENCES observaciones (id_observacion, fecha_hora)
+        ON UPDATE CASCADE
+        DEFERRABLE INITIALLY IMMEDIATE
+    """))
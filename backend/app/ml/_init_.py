@@ -0,0 +1 @@
+# package ml
\ No newline at end of file
@@ -0,0 +1,148 @@
+# app/ml/caracteristicas.py
+# Matriz de características del clasificador de especialidad.
+#
+# Las columnas son las 7 del prototipo (prototipo/prototipoRedNeuronal.py),
+# en el mismo orden, y cada una sale de un tipos_observacion.codigo. Para N
+# admisiones la matriz sale de una sola consulta: por cada (admisión,
+# código) queda el último valor de la ventana (hasta - ventana, hasta]
+# (DISTINCT ON), a lo sumo N×7 filas. El pivoteo y la imputación son
+# operaciones NumPy: no hay bucles por paciente en Python.
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import select, func, cast, literal, literal_column, Float, Text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.types import TIMESTAMP
+
+from app.core.config import settings
+from app.models.admisiones import Admision
+from app.models.observaciones import Observacion
+from app.models.tipos_observacion import TipoObservacion
+
+# columna -> tipos_observacion.codigo (el orden es el de entrenamiento)
+CODIGOS = {
+    "pulso": "pulso",
+    "sistolica": "presion_sistolica",
+    "diastolica": "presion_diastolica",
+    "oxigeno": "oxigeno",
+    "temperatura": "temperatura",
+    "creatinina": "creatinina",
+    "glucosa": "glucosa",
+}
+CARACTERISTICAS = list(CODIGOS)
+
+# relleno cuando una admisión no tiene ningún valor en la ventana: valores
+# de referencia de un adulto; un modelo entrenado trae los suyos
+VALORES_REFERENCIA = np.array([75, 120, 80, 97, 36.8, 0.9, 95], dtype=np.float32)
+
+
+@dataclass
+class MatrizCaracteristicas:
+    ids_admision: list[UUID]
+    hasta: datetime
+    X: np.ndarray                 # (admisiones, características) float32, sin NaN
+    observado: np.ndarray         # (admisiones, características) bool, False = imputado
+
+
+# ---------------------------
+#   ADMISIONES
+# ---------------------------
+async def admisiones_activas(db: AsyncSession) -> list[UUID]:
+    """Admisiones en curso (usa ix_admisiones_activas)."""
+    result = await db.execute(
+        select(Admision.id_admision)
+        .where(Admision.estado == "activo", Admision.fecha_salida.is_(None))
+        .order_by(Admision.fecha_ingreso, Admision.id_admision)
+    )
+    return list(result.scalars())
+
+
+# ---------------------------
+#   CONSULTA
+# ---------------------------
+async def ultimos_por_admision(
+    db: AsyncSession,
+    ids_admision: list[UUID],
+    hastas: list[datetime],
+    ventana_horas: int | None = None
+) -> np.ndarray:
+    """Último valor de cada característica en (hasta - ventana, hasta] con un
+    `hasta` propio por admisión (p. ej. su fecha de salida). (n, k) con NaN."""
+    valores = np.full((len(ids_admision), len(CARACTERISTICAS)), np.nan, dtype=np.float32)
+    if not ids_admision:
+        return valores
+
+    horas = int(ventana_horas or settings.ML_VENTANA_HORAS)
+    codigos = [CODIGOS[c] for c in CARACTERISTICAS]
+    entrada = (
+        func.unnest(
+            literal(ids_admision, ARRAY(PG_UUID(as_uuid=True))),
+            literal(hastas, ARRAY(TIMESTAMP(timezone=True)))
+        )
+        .table_valued("id_admision", "hasta", with_ordinality="fila")
+        .render_derived()
+    )
+    result = await db.execute(
+        select(
+            entrada.c.fila,
+            func.array_position(literal(codigos, ARRAY(Text)), TipoObservacion.codigo),
+            cast(Observacion.valor_numerico, Float),
+        )
+        .select_from(entrada)
+        .join(Observacion, Observacion.id_admision == entrada.c.id_admision)
+        .join(TipoObservacion, TipoObservacion.id_tipo_obs == Observacion.id_tipo_obs)
+        .where(
+            TipoObservacion.codigo.in_(codigos),
+            Observacion.fecha_hora > entrada.c.hasta - literal_column(f"interval '{horas} hours'"),
+            Observacion.fecha_hora <= entrada.c.hasta,
+            Observacion.valor_numerico.is_not(None),
+        )
+        .distinct(entrada.c.fila, TipoObservacion.codigo)
+        .order_by(entrada.c.fila, TipoObservacion.codigo, Observacion.fecha_hora.desc())
+    )
+    filas = result.all()
+    if filas:
+        datos = np.array(filas, dtype=np.float64)
+        valores[datos[:, 0].astype(np.intp) - 1, datos[:, 1].astype(np.intp) - 1] = datos[:, 2]
+    return valores
+
+
+# ---------------------------
+#   FALTANTES
+# ---------------------------
+def imputar(X: np.ndarray, relleno: np.ndarray | None = None) -> tuple[np.ndarray, np.ndarray]:
+    """Reemplaza los NaN de cada columna por `relleno`; devuelve (X, observado)."""
+    relleno = VALORES_REFERENCIA if relleno is None else np.asarray(relleno, dtype=np.float32)
+    observado = ~np.isnan(X)
+    return np.where(observado, X, relleno).astype(np.float32, copy=False), observado
+
+
+# ---------------------------
+#   MATRIZ
+# ---------------------------
+async def matriz_caracteristicas(
+    db: AsyncSession,
+    ids_admision: list[UUID] | None = None,
+    hasta: datetime | None = None,
+    ventana_horas: int | None = None,
+    relleno: np.ndarray | None = None
+) -> MatrizCaracteristicas:
+    """Una fila por admisión con el último valor de cada característica en la ventana.
+
+    Sin `ids_admision` se arma para todas las admisiones activas. Lo que no
+    tiene ningún valor en la ventana se completa con `relleno` (por defecto
+    VALORES_REFERENCIA).
+    """
+    hasta = hasta or datetime.now(timezone.utc)
+    if hasta.tzinfo is None:
+        hasta = hasta.replace(tzinfo=timezone.utc)
+    if ids_admision is None:
+        ids_admision = await admisiones_activas(db)
+
+    ultimo = await ultimos_por_admision(db, ids_admision, [hasta] * len(ids_admision), ventana_horas)
+    X, observado = imputar(ultimo, relleno)
+
+    return MatrizCaracteristicas(ids_admision, hasta, np.ascontiguousarray(X), observado)
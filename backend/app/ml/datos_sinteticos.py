@@ -0,0 +1,35 @@
+# app/ml/datos_sinteticos.py
+# Datos simulados del prototipo (prototipo/prototipoRedNeuronal.py): cada
+# especialidad tiene una normal por característica, en el orden de
+# app/ml/caracteristicas.CARACTERISTICAS.
+import numpy as np
+
+ESPECIALIDADES = ["Cardiología", "Neumología", "Nefrología", "Endocrinología"]
+
+# (media, desvío) de pulso, sistólica, diastólica, oxígeno, temperatura, creatinina, glucosa
+PARAMETROS = np.array([
+    # Cardiología
+    [(100, 10), (145, 10), (90, 8), (96, 2), (37.2, 0.3), (1.0, 0.2), (95, 10)],
+    # Neumología
+    [(80, 8), (125, 10), (80, 8), (88, 4), (38.2, 0.4), (0.9, 0.2), (100, 10)],
+    # Nefrología
+    [(85, 10), (135, 10), (85, 8), (95, 2), (37.0, 0.3), (2.5, 0.5), (90, 10)],
+    # Endocrinología
+    [(90, 10), (130, 10), (82, 8), (97, 1.5), (37.0, 0.2), (1.0, 0.1), (160, 25)],
+])
+
+
+def generar_datos(n: int, categoria: int, rng: np.random.Generator | None = None):
+    """Genera `n` pacientes simulados de la especialidad `categoria`."""
+    rng = rng or np.random.default_rng()
+    medias, desvios = PARAMETROS[categoria, :, 0], PARAMETROS[categoria, :, 1]
+    X = rng.normal(medias, desvios, size=(n, len(medias)))
+    y = np.full(n, categoria)
+    return X, y
+
+
+def generar_dataset(n_por_clase: int = 200, semilla: int | None = 42):
+    """Las cuatro especialidades apiladas: (X, y)."""
+    rng = np.random.default_rng(semilla)
+    partes = [generar_datos(n_por_clase, c, rng) for c in range(len(ESPECIALIDADES))]
+    return np.vstack([X for X, _ in partes]), np.hstack([y for _, y in partes])
@@ -0,0 +1,324 @@
+# app/ml/deriva.py
+# Monitoreo de deriva de las entradas y de las predicciones del clasificador.
+#
+# Por cada característica se acumula, en streaming: conteo, media y M2 de
+# Welford (combinados por lote con la fórmula de Chan), faltantes y un
+# histograma de baldes fijos (RANGOS, más un balde por debajo y otro por
+# encima). Además se cuenta la especialidad predicha. Actualizar cuesta
+# O(características) por paciente puntuado, sin volver a leer
+# `observaciones`: se alimenta con las mismas filas que van al modelo.
+#
+# Cada proceso acumula en memoria (MonitorDeriva) y vuelca el delta a
+# deriva_modelo, una fila por (versión, origen, hora), combinándolo con lo
+# ya guardado bajo SELECT ... FOR UPDATE. El informe junta las horas
+# pedidas y las compara con la referencia del artefacto (estadísticos de
+# los datos de entrenamiento) usando PSI y un KS sobre los baldes.
+import math
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.ml.caracteristicas import CARACTERISTICAS
+from app.models.deriva_modelo import DerivaModelo
+
+# rango fisiológico cubierto por los baldes de cada característica
+RANGOS = {
+    "pulso": (20.0, 220.0),
+    "sistolica": (50.0, 250.0),
+    "diastolica": (20.0, 150.0),
+    "oxigeno": (50.0, 100.0),
+    "temperatura": (32.0, 43.0),
+    "creatinina": (0.0, 15.0),
+    "glucosa": (20.0, 620.0),
+}
+BALDES = 40
+
+_BAJO = np.array([RANGOS[c][0] for c in CARACTERISTICAS])
+_ANCHO = np.array([(RANGOS[c][1] - RANGOS[c][0]) / BALDES for c in CARACTERISTICAS])
+# índice plano en (k, BALDES + 2) del balde -1 de cada característica
+_DESPLAZAMIENTO = np.arange(len(CARACTERISTICAS)) * (BALDES + 2) + 1
+
+# umbrales habituales de PSI
+PSI_MODERADA = 0.1
+PSI_ALTA = 0.25
+EPSILON = 1e-4
+NIVELES = ["estable", "moderada", "alta"]
+
+
+@dataclass
+class Estadisticos:
+    n: np.ndarray               # (k,) valores observados
+    media: np.ndarray           # (k,)
+    m2: np.ndarray              # (k,) suma de cuadrados de desvíos (Welford)
+    faltantes: np.ndarray       # (k,)
+    histogramas: np.ndarray     # (k, BALDES + 2): [debajo, baldes..., encima]
+    clases: np.ndarray          # (c,) especialidad predicha (o etiqueta, en la referencia)
+
+    @classmethod
+    def vacio(cls, n_clases: int) -> "Estadisticos":
+        k = len(CARACTERISTICAS)
+        return cls(
+            n=np.zeros(k, dtype=np.int64),
+            media=np.zeros(k),
+            m2=np.zeros(k),
+            faltantes=np.zeros(k, dtype=np.int64),
+            histogramas=np.zeros((k, BALDES + 2), dtype=np.int64),
+            clases=np.zeros(n_clases, dtype=np.int64),
+        )
+
+    @property
+    def filas(self) -> int:
+        return int(self.clases.sum())
+
+    def agregar(self, X: np.ndarray, clases: np.ndarray) -> "Estadisticos":
+        """Suma las filas de X (NaN = faltante) y sus clases; vectorizado por lote."""
+        X = np.asarray(X, dtype=np.float64).reshape(-1, len(CARACTERISTICAS))
+        observado = ~np.isnan(X)
+        n_lote = observado.sum(axis=0)
+        if len(X):
+            # los faltantes valen 0 y se descartan con `observado`
+            X = np.where(observado, X, 0.0)
+            media_lote = X.sum(axis=0) / np.maximum(n_lote, 1)
+            m2_lote = (((X - media_lote) * observado) ** 2).sum(axis=0)
+            self._combinar(n_lote, media_lote, m2_lote)
+
+            # balde por aritmética (son de ancho fijo): sin búsqueda binaria
+            balde = np.floor((X - _BAJO) / _ANCHO).astype(np.int64)
+            balde = np.minimum(np.maximum(balde, -1), BALDES) + _DESPLAZAMIENTO
+            self.histogramas += np.bincount(
+                balde[observado], minlength=self.histogramas.size
+            ).reshape(self.histogramas.shape)
+
+        self.faltantes += len(X) - n_lote
+        self.clases += np.bincount(np.asarray(clases, dtype=np.int64), minlength=len(self.clases))
+        return self
+
+    def _combinar(self, n_b, media_b, m2_b):
+        # Chan et al.: une dos acumuladores de Welford sin revisitar valores
+        n = self.n + n_b
+        delta = media_b - self.media
+        peso = n_b / np.maximum(n, 1)
+        self.media = self.media + delta * peso
+        self.m2 = self.m2 + m2_b + delta ** 2 * self.n * peso
+        self.n = n
+
+    def combinar(self, otro: "Estadisticos") -> "Estadisticos":
+        self._combinar(otro.n, otro.media, otro.m2)
+        self.faltantes += otro.faltantes
+        self.histogramas += otro.histogramas
+        self.clases += otro.clases
+        return self
+
+    def varianza(self) -> np.ndarray:
+        return np.where(self.n > 1, self.m2 / np.maximum(self.n - 1, 1), np.nan)
+
+    def a_dict(self) -> dict:
+        return {
+            "n": self.n.tolist(),
+            "media": self.media.tolist(),
+            "m2": self.m2.tolist(),
+            "faltantes": self.faltantes.tolist(),
+            "histogramas": self.histogramas.tolist(),
+            "clases": self.clases.tolist(),
+        }
+
+    @classmethod
+    def desde_dict(cls, d: dict) -> "Estadisticos":
+        return cls(
+            n=np.array(d["n"], dtype=np.int64),
+            media=np.array(d["media"], dtype=np.float64),
+            m2=np.array(d["m2"], dtype=np.float64),
+            faltantes=np.array(d["faltantes"], dtype=np.int64),
+            histogramas=np.array(d["histogramas"], dtype=np.int64).reshape(len(CARACTERISTICAS), BALDES + 2),
+            clases=np.array(d["clases"], dtype=np.int64),
+        )
+
+
+def referencia_aproximada(artefacto) -> Estadisticos:
+    """Para artefactos sin `referencia`: solo media y desvío del escalador.
+    Sin histogramas ni mezcla de clases, así que PSI y KS quedan en None."""
+    escalador = artefacto.escalador
+    filas = max(int(np.max(escalador.n_samples_seen_)), 1)
+    ref = Estadisticos.vacio(len(artefacto.clases))
+    ref.n[:] = filas
+    ref.media = np.asarray(escalador.mean_, dtype=np.float64)
+    ref.m2 = np.asarray(escalador.var_, dtype=np.float64) * max(filas - 1, 1)
+    return ref
+
+
+def referencia(artefacto) -> tuple[Estadisticos, bool]:
+    """(estadísticos de entrenamiento, aproximada)."""
+    if getattr(artefacto, "referencia", None):
+        return Estadisticos.desde_dict(artefacto.referencia), False
+    return referencia_aproximada(artefacto), True
+
+
+# ---------------------------
+#   ACUMULACIÓN Y VOLCADO
+# ---------------------------
+class MonitorDeriva:
+    """Acumulador en memoria de un proceso; `volcar` lo pasa a la base."""
+
+    def __init__(self, version_modelo: int, n_clases: int, origen: str):
+        self.version_modelo = version_modelo
+        self.n_clases = n_clases
+        self.origen = origen
+        self._lock = threading.Lock()
+        self._acumulado = Estadisticos.vacio(n_clases)
+
+    def registrar(self, X: np.ndarray, P: np.ndarray):
+        """X crudo (NaN = faltante) y las probabilidades predichas para esas filas."""
+        ganadoras = np.asarray(P).argmax(axis=1)
+        with self._lock:
+            self._acumulado.agregar(X, ganadoras)
+
+    def _tomar(self) -> Estadisticos:
+        with self._lock:
+            delta, self._acumulado = self._acumulado, Estadisticos.vacio(self.n_clases)
+        return delta
+
+    def _devolver(self, delta: Estadisticos):
+        with self._lock:
+            self._acumulado.combinar(delta)
+
+    async def volcar(self, db: AsyncSession) -> int:
+        """Combina lo acumulado con la fila de la hora actual. No hace commit;
+        si falla, el delta vuelve al acumulador."""
+        delta = self._tomar()
+        if not delta.filas:
+            return 0
+        try:
+            await guardar(db, self.version_modelo, self.origen, delta)
+        except BaseException:
+            self._devolver(delta)
+            raise
+        return delta.filas
+
+
+async def guardar(db: AsyncSession, version_modelo: int, origen: str, delta: Estadisticos, hora: datetime | None = None):
+    hora = (hora or datetime.now(timezone.utc)).replace(minute=0, second=0, microsecond=0)
+    clave = {"version_modelo": version_modelo, "origen": origen, "hora": hora}
+
+    # la fila puede no existir todavía: se crea vacía y después se bloquea
+    await db.execute(
+        pg_insert(DerivaModelo)
+        .values(**clave, filas=0, estado=Estadisticos.vacio(len(delta.clases)).a_dict())
+        .on_conflict_do_nothing(index_elements=list(clave))
+    )
+    fila = (await db.execute(
+        select(DerivaModelo).filter_by(**clave).with_for_update()
+    )).scalar_one()
+
+    estado = Estadisticos.desde_dict(fila.estado).combinar(delta)
+    fila.estado = estado.a_dict()
+    fila.filas = estado.filas
+    await db.flush()
+
+
+async def acumulado(
+    db: AsyncSession, version_modelo: int, n_clases: int, horas: int, origen: str | None = None
+) -> tuple[Estadisticos, datetime | None]:
+    """Suma de las horas dentro de la ventana (y la más vieja incluida)."""
+    desde = datetime.now(timezone.utc) - timedelta(hours=horas)
+    stmt = select(DerivaModelo.hora, DerivaModelo.estado).where(
+        DerivaModelo.version_modelo == version_modelo,
+        DerivaModelo.hora >= desde.replace(minute=0, second=0, microsecond=0),
+    )
+    if origen:
+        stmt = stmt.where(DerivaModelo.origen == origen)
+
+    total = Estadisticos.vacio(n_clases)
+    primera = None
+    for hora, estado in (await db.execute(stmt)).all():
+        total.combinar(Estadisticos.desde_dict(estado))
+        primera = hora if primera is None else min(primera, hora)
+    return total, primera
+
+
+# ---------------------------
+#   INFORME
+# ---------------------------
+def _proporciones(conteos: np.ndarray) -> np.ndarray | None:
+    total = conteos.sum()
+    return conteos / total if total else None
+
+
+def psi(actual: np.ndarray, esperado: np.ndarray) -> float | None:
+    a, e = _proporciones(actual), _proporciones(esperado)
+    if a is None or e is None:
+        return None
+    a, e = np.maximum(a, EPSILON), np.maximum(e, EPSILON)
+    return float(np.sum((a - e) * np.log(a / e)))
+
+
+def ks(actual: np.ndarray, esperado: np.ndarray) -> float | None:
+    """Máxima distancia entre las distribuciones acumuladas (sobre los baldes)."""
+    a, e = _proporciones(actual), _proporciones(esperado)
+    if a is None or e is None:
+        return None
+    return float(np.max(np.abs(np.cumsum(a) - np.cumsum(e))))
+
+
+def nivel(valor: float | None) -> str | None:
+    if valor is None:
+        return None
+    if valor >= PSI_ALTA:
+        return "alta"
+    return "moderada" if valor >= PSI_MODERADA else "estable"
+
+
+def _numero(x) -> float | None:
+    x = float(x)
+    return None if math.isnan(x) else x
+
+
+def informe(actual: Estadisticos, ref: Estadisticos, clases: list[str]) -> dict:
+    desvio_actual = np.sqrt(actual.varianza())
+    desvio_ref = np.sqrt(ref.varianza())
+    total_actual = actual.n + actual.faltantes
+    total_ref = ref.n + ref.faltantes
+
+    caracteristicas = []
+    for j, c in enumerate(CARACTERISTICAS):
+        valor_psi = psi(actual.histogramas[j], ref.histogramas[j])
+        desplazamiento = None
+        if actual.n[j] and desvio_ref[j] > 0:
+            desplazamiento = float((actual.media[j] - ref.media[j]) / desvio_ref[j])
+        caracteristicas.append({
+            "caracteristica": c,
+            "n": int(actual.n[j]),
+            "media": _numero(actual.media[j]) if actual.n[j] else None,
+            "desvio": _numero(desvio_actual[j]),
+            "faltantes": float(actual.faltantes[j] / total_actual[j]) if total_actual[j] else None,
+            "media_referencia": _numero(ref.media[j]) if ref.n[j] else None,
+            "desvio_referencia": _numero(desvio_ref[j]),
+            "faltantes_referencia": float(ref.faltantes[j] / total_ref[j]) if total_ref[j] else None,
+            "desplazamiento": desplazamiento,
+            "psi": valor_psi,
+            "ks": ks(actual.histogramas[j], ref.histogramas[j]),
+            "fuera_de_rango": float(
+                (actual.histogramas[j, 0] + actual.histogramas[j, -1]) / actual.n[j]
+            ) if actual.n[j] else None,
+            "nivel": nivel(valor_psi),
+        })
+
+    mezcla = _proporciones(actual.clases)
+    mezcla_ref = _proporciones(ref.clases)
+    psi_clases = psi(actual.clases, ref.clases)
+    niveles = [n for n in [f["nivel"] for f in caracteristicas] + [nivel(psi_clases)] if n]
+    return {
+        "filas": actual.filas,
+        "caracteristicas": caracteristicas,
+        "clases": {
+            "proporciones": dict(zip(clases, map(float, mezcla))) if mezcla is not None else {},
+            "proporciones_referencia": dict(zip(clases, map(float, mezcla_ref))) if mezcla_ref is not None else {},
+            "psi": psi_clases,
+            "nivel": nivel(psi_clases),
+        },
+        "nivel": max(niveles, key=NIVELES.index) if niveles else None,
+    }
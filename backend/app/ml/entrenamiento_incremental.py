@@ -0,0 +1,344 @@
+# app/ml/entrenamiento_incremental.py
+# Entrenamiento fuera de memoria del clasificador con MLPClassifier.partial_fit.
+#
+# Las filas llegan de a lotes desde una fuente: un snapshot .npy abierto con
+# mmap (FuenteNpy) o las admisiones etiquetadas de la base leídas con un
+# cursor del servidor (FuenteBD). La memoria queda acotada al lote, no al
+# total. Orden de trabajo:
+#   1. una pasada ajusta el StandardScaler (partial_fit) y queda fijo;
+#   2. cada época recorre los lotes de entrenamiento en orden aleatorio y
+#      llama a partial_fit; al terminarla se evalúa el holdout y se guarda
+#      un checkpoint (se puede reanudar desde ahí).
+#
+# Holdout estratificado y determinista: dentro de cada clase, una de cada
+# `cada` filas (por posición en el .npy, o por hashtext(id) en la base)
+# queda para prueba, así la proporción por clase es exacta. Los lotes de
+# entrenamiento cambian de composición en cada época: en el .npy cada lote
+# junta filas repartidas por todo el archivo (un .npy ordenado por clase no
+# da lotes de una sola clase); en la base el orden es hashtext(id || sal)
+# con una sal por época.
+#
+# FuenteBD recalcula las características desde observaciones en cada época;
+# para entrenar varias épocas conviene volcar antes un snapshot
+# (python -m app.cli snapshot-caracteristicas) y entrenar con --npy.
+#
+# Etiquetas de la base: admisiones.diagnostico_principal igual (sin
+# mayúsculas ni espacios) al nombre de una clase.
+import io
+import logging
+import os
+from typing import AsyncIterator
+
+import numpy as np
+from sqlalchemy import select, func, cast, literal, Text
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from app.core.database import SessionLocal
+from app.ml.caracteristicas import CARACTERISTICAS, VALORES_REFERENCIA, ultimos_por_admision
+from app.ml.deriva import Estadisticos
+from app.ml.modelo import ArtefactoModelo, importar_joblib
+from app.models.admisiones import Admision
+
+logger = logging.getLogger("uvicorn.error")
+
+
+# ---------------------------
+#   FUENTES
+# ---------------------------
+class FuenteNpy:
+    """X (n, k) y y (n,) en .npy abiertos con mmap.
+
+    El holdout se guarda como un bit por fila. Con `rng`, la época recorre
+    las filas en el orden (a·j + b) mod n, con a coprimo con n y a, b
+    sorteados: es una permutación que no hay que materializar y cada lote
+    de `tamano` posiciones consecutivas toma filas de todo el archivo.
+    """
+
+    def __init__(self, ruta_X: str, ruta_y: str, n_clases: int, tamano: int, cada: int):
+        self.X = np.load(ruta_X, mmap_mode="r")
+        self.y = np.load(ruta_y, mmap_mode="r")
+        if self.X.shape != (len(self.y), len(CARACTERISTICAS)):
+            raise ValueError(f"Se esperaba X de forma ({len(self.y)}, {len(CARACTERISTICAS)}), vino {self.X.shape}")
+
+        self.n_clases = n_clases
+        self.tamano = tamano
+        self.cada = cada
+        self.prueba = self._marcar_prueba()
+
+    def _marcar_prueba(self) -> np.ndarray:
+        # una pasada sobre y, de a bloques múltiplos de 8 para empaquetar
+        n = len(self.y)
+        paso = max(8, self.tamano // 8 * 8)
+        bits = np.zeros((n + 7) // 8, dtype=np.uint8)
+        previas = np.zeros(self.n_clases, dtype=np.int64)
+        for i in range(0, n, paso):
+            y = np.asarray(self.y[i:i + paso], dtype=np.int64)
+            rango = np.empty(len(y), dtype=np.int64)
+            for c in range(self.n_clases):
+                de_clase = y == c
+                rango[de_clase] = previas[c] + np.arange(de_clase.sum())
+            previas += np.bincount(y, minlength=self.n_clases)
+            bits[i // 8:(i + len(y) + 7) // 8] = np.packbits(rango % self.cada == 0)
+        return bits
+
+    def _es_prueba(self, indices: np.ndarray) -> np.ndarray:
+        return ((self.prueba[indices >> 3] >> (7 - (indices & 7))) & 1).astype(bool)
+
+    def _leer(self, indices: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        return (
+            np.asarray(self.X[indices], dtype=np.float32),
+            np.asarray(self.y[indices], dtype=np.int64),
+        )
+
+    async def lotes(self, conjunto: str, rng: np.random.Generator | None = None) -> AsyncIterator:
+        n = len(self.y)
+        if rng is None or conjunto == "prueba":
+            # en orden, de a bloques contiguos
+            for i in range(0, n, self.tamano):
+                indices = np.arange(i, min(i + self.tamano, n))
+                prueba = self._es_prueba(indices)
+                yield self._leer(indices[prueba if conjunto == "prueba" else ~prueba])
+            return
+
+        a = int(rng.integers(1, n)) if n > 1 else 1
+        while np.gcd(a, n) != 1:
+            a = int(rng.integers(1, n))
+        b = int(rng.integers(n))
+        for i in range(0, n, self.tamano):
+            indices = (np.arange(i, min(i + self.tamano, n), dtype=np.int64) * a + b) % n
+            indices = np.sort(indices[~self._es_prueba(indices)])  # el mmap se lee en orden
+            X, y = self._leer(indices)
+            orden = rng.permutation(len(y))
+            yield X[orden], y[orden]
+
+
+class FuenteBD:
+    """Admisiones con diagnostico_principal igual a una clase. Las
+    características son las últimas de la ventana que termina en la salida
+    (o ahora, si sigue internada)."""
+
+    def __init__(self, clases: list[str], tamano: int, cada: int, ventana_horas: int | None = None):
+        self.clases = clases
+        self.tamano = tamano
+        self.cada = cada
+        self.ventana_horas = ventana_horas
+
+    def consulta(self, conjunto: str, sal: str = ""):
+        etiqueta = func.array_position(
+            literal([c.strip().lower() for c in self.clases], ARRAY(Text)),
+            func.lower(func.trim(Admision.diagnostico_principal))
+        )
+        rango = func.row_number().over(
+            partition_by=etiqueta,
+            order_by=(func.hashtext(cast(Admision.id_admision, Text)), Admision.id_admision)
+        )
+        sub = (
+            select(
+                Admision.id_admision,
+                func.coalesce(Admision.fecha_salida, func.now()).label("hasta"),
+                (etiqueta - 1).label("etiqueta"),
+                rango.label("rango"),
+            )
+            .where(etiqueta.is_not(None))
+            .subquery()
+        )
+        es_prueba = sub.c.rango % self.cada == 0
+        return (
+            select(sub.c.id_admision, sub.c.hasta, sub.c.etiqueta)
+            .where(es_prueba if conjunto == "prueba" else ~es_prueba)
+            # orden pseudoaleatorio (estable para una sal): las clases quedan
+            # mezcladas en cada lote; el holdout no depende de la sal
+            .order_by(func.hashtext(cast(sub.c.id_admision, Text) + sal), sub.c.id_admision)
+        )
+
+    async def contar(self, conjunto: str) -> int:
+        async with SessionLocal() as db:
+            return await db.scalar(select(func.count()).select_from(self.consulta(conjunto).subquery()))
+
+    async def lotes(self, conjunto: str, rng: np.random.Generator | None = None) -> AsyncIterator:
+        # con rng, una sal nueva reparte las filas en otros lotes
+        sal = str(rng.integers(2**31)) if rng is not None else ""
+        # sesión aparte para las características: la del cursor queda ocupada
+        async with SessionLocal() as cursor, SessionLocal() as db:
+            result = await cursor.stream(
+                self.consulta(conjunto, sal).execution_options(yield_per=self.tamano)
+            )
+            async for parte in result.partitions():
+                ids, hastas, y = zip(*parte)
+                X = await ultimos_por_admision(db, list(ids), list(hastas), self.ventana_horas)
+                y = np.array(y, dtype=np.int64)
+                if rng is not None:
+                    orden = rng.permutation(len(y))
+                    X, y = X[orden], y[orden]
+                yield X, y
+
+
+async def snapshot_npy(fuente: FuenteBD, ruta_X: str, ruta_y: str, conjunto: str | None = None) -> int:
+    """Vuelca las filas de la base a .npy sin tenerlas todas en memoria.
+
+    Sin `conjunto` se vuelcan entrenamiento y prueba (FuenteNpy vuelve a
+    separar el holdout por posición).
+    """
+    conjuntos = [conjunto] if conjunto else ["entrenamiento", "prueba"]
+    total = sum([await fuente.contar(c) for c in conjuntos])
+
+    X = np.lib.format.open_memmap(ruta_X, mode="w+", dtype=np.float32, shape=(total, len(CARACTERISTICAS)))
+    y = np.lib.format.open_memmap(ruta_y, mode="w+", dtype=np.int64, shape=(total,))
+    i = 0
+    for c in conjuntos:
+        async for X_lote, y_lote in fuente.lotes(c):
+            n = min(len(y_lote), total - i)  # filas nuevas desde el conteo
+            X[i:i + n], y[i:i + n] = X_lote[:n], y_lote[:n]
+            i += n
+    X.flush()
+    y.flush()
+    del X, y
+
+    # filas que dejaron de cumplir el filtro desde el conteo: sin recortar,
+    # la cola quedaría en ceros con etiqueta 0
+    if i < total:
+        _recortar_npy(ruta_X, i)
+        _recortar_npy(ruta_y, i)
+    return i
+
+
+def _recortar_npy(ruta: str, filas: int):
+    """Deja solo las primeras `filas` de un .npy: reescribe el encabezado
+    y trunca el archivo (o copia, si el encabezado cambia de largo)."""
+    with open(ruta, "r+b") as f:
+        formato = np.lib.format
+        version = formato.read_magic(f)
+        leer, escribir = {
+            (1, 0): (formato.read_array_header_1_0, formato.write_array_header_1_0),
+            (2, 0): (formato.read_array_header_2_0, formato.write_array_header_2_0),
+        }.get(version, (None, None))
+        if leer is not None:
+            shape, fortran, dtype = leer(f)
+            inicio = f.tell()
+            encabezado = io.BytesIO()
+            escribir(encabezado, {
+                "descr": formato.dtype_to_descr(dtype),
+                "fortran_order": fortran,
+                "shape": (filas, *shape[1:])
+            })
+        if leer is not None and encabezado.tell() == inicio:
+            f.seek(0)
+            f.write(encabezado.getvalue())
+            f.truncate(inicio + filas * int(np.prod(shape[1:], dtype=np.int64)) * dtype.itemsize)
+            return
+
+    origen = np.load(ruta, mmap_mode="r")
+    parcial = f"{ruta}.part"
+    destino = np.lib.format.open_memmap(parcial, mode="w+", dtype=origen.dtype, shape=(filas, *origen.shape[1:]))
+    for j in range(0, filas, 1_000_000):
+        destino[j:j + 1_000_000] = origen[j:j + 1_000_000]
+    destino.flush()
+    del origen, destino
+    os.replace(parcial, ruta)
+
+
+# ---------------------------
+#   ENTRENAMIENTO
+# ---------------------------
+def _imputar(X: np.ndarray, relleno: np.ndarray) -> np.ndarray:
+    return np.where(np.isnan(X), relleno, X)
+
+
+async def evaluar(fuente, artefacto: ArtefactoModelo) -> dict:
+    """Exactitud y recall por clase sobre el holdout, acumulando conteos por lote."""
+    n_clases = len(artefacto.clases)
+    confusion = np.zeros((n_clases, n_clases), dtype=np.int64)
+    async for X, y in fuente.lotes("prueba"):
+        if len(y):
+            pred = artefacto.predecir_proba(X).argmax(axis=1)
+            np.add.at(confusion, (y, pred), 1)
+
+    total = int(confusion.sum())
+    por_clase = confusion.sum(axis=1)
+    return {
+        "filas_prueba": total,
+        "exactitud": float(np.trace(confusion) / total) if total else None,
+        "recall": {
+            c: float(confusion[i, i] / por_clase[i]) if por_clase[i] else None
+            for i, c in enumerate(artefacto.clases)
+        },
+    }
+
+
+def _guardar_checkpoint(ruta: str, epoca: int, artefacto: ArtefactoModelo):
+    joblib = importar_joblib()
+    os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+    joblib.dump({"epoca": epoca, "artefacto": artefacto}, f"{ruta}.part")
+    os.replace(f"{ruta}.part", ruta)
+
+
+async def entrenar_incremental(
+    fuente,
+    clases: list[str],
+    capas: tuple[int, ...] = (16, 8),
+    epocas: int = 10,
+    tasa: float = 1e-3,
+    alpha: float = 1e-4,
+    semilla: int = 42,
+    checkpoint: str | None = None,
+    reanudar: bool = False
+) -> ArtefactoModelo:
+    """Entrena con partial_fit de a lotes de `fuente` (FuenteNpy o FuenteBD)."""
+    joblib = importar_joblib()
+    from sklearn.neural_network import MLPClassifier
+    from sklearn.preprocessing import StandardScaler
+
+    etiquetas = np.arange(len(clases))
+    inicio = 0
+
+    if reanudar and checkpoint and os.path.exists(checkpoint):
+        estado = joblib.load(checkpoint)
+        artefacto, inicio = estado["artefacto"], estado["epoca"] + 1
+        logger.info("Reanudando desde la época %s (%s)", inicio, checkpoint)
+    else:
+        escalador = StandardScaler()
+        referencia = Estadisticos.vacio(len(clases))
+        filas = 0
+        async for X, y in fuente.lotes("entrenamiento"):
+            if len(X):
+                escalador.partial_fit(X)  # ignora los NaN
+                referencia.agregar(X, y)
+                filas += len(X)
+        if not filas:
+            raise ValueError("La fuente no tiene filas de entrenamiento")
+
+        relleno = np.where(np.isnan(escalador.mean_), VALORES_REFERENCIA, escalador.mean_)
+        parametros = {
+            "hidden_layer_sizes": tuple(capas),
+            "learning_rate_init": tasa,
+            "alpha": alpha,
+            "random_state": semilla,
+        }
+        artefacto = ArtefactoModelo(
+            version=0,
+            caracteristicas=list(CARACTERISTICAS),
+            clases=list(clases),
+            escalador=escalador,
+            modelo=MLPClassifier(**parametros),
+            relleno=relleno.astype(np.float32),
+            metricas={"filas": filas},
+            parametros={**parametros, "epocas": epocas},
+            referencia=referencia.a_dict(),
+        )
+
+    for epoca in range(inicio, epocas):
+        rng = np.random.default_rng([semilla, epoca])
+        async for X, y in fuente.lotes("entrenamiento", rng):
+            if len(y):
+                Xs = artefacto.escalador.transform(_imputar(X, artefacto.relleno))
+                artefacto.modelo.partial_fit(Xs, y, classes=etiquetas)
+
+        artefacto.metricas.update(await evaluar(fuente, artefacto), epocas=epoca + 1)
+        logger.info(
+            "Época %s/%s: exactitud holdout %.4f, pérdida %.4f",
+            epoca + 1, epocas, artefacto.metricas["exactitud"] or float("nan"), artefacto.modelo.loss_
+        )
+        if checkpoint:
+            _guardar_checkpoint(checkpoint, epoca, artefacto)
+
+    return artefacto
@@ -0,0 +1,382 @@
+# app/ml/generador_clinico.py
+# Generador de datos clínicos simulados para pruebas de carga y entrenamiento.
+#
+# Produce pacientes, admisiones, observaciones y diagnósticos secundarios
+# en bloques de tamaño fijo (config.pacientes_por_bloque pacientes con todo
+# lo suyo). Cada bloque usa su propio generador, hijo de
+# SeedSequence(semilla).spawn(n_bloques): el resultado es el mismo sin
+# importar el orden o el proceso en que se genere cada bloque, y los
+# bloques se reparten en un pool de procesos. La memoria es la de un
+# bloque por proceso.
+#
+# Los signos vitales siguen las distribuciones por especialidad de
+# app/ml/datos_sinteticos.py: cada admisión tiene un nivel propio por
+# característica (0,8 σ) y cada medición agrega ruido (0,6 σ), así la
+# varianza marginal es la del prototipo. diagnostico_principal es el
+# nombre de la especialidad (la etiqueta que usa el entrenamiento).
+#
+# Destinos: .npy (arrays estructurados), Parquet (requiere pyarrow) o
+# Postgres por COPY binario de asyncpg, una conexión y una transacción por
+# bloque.
+import json
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict, field
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from app.ml.caracteristicas import CARACTERISTICAS, CODIGOS
+from app.ml.datos_sinteticos import ESPECIALIDADES, PARAMETROS
+
+TABLAS = ["pacientes", "admisiones", "observaciones", "diagnosticos_secundarios"]
+
+NOMBRES = [
+    "María", "José", "Juan", "Ana", "Luis", "Carmen", "Carlos", "Rosa", "Jorge", "Lucía",
+    "Pedro", "Elena", "Miguel", "Laura", "Diego", "Sofía", "Andrés", "Valentina", "Raúl", "Gabriela",
+]
+APELLIDOS = [
+    "González", "Rodríguez", "Gómez", "Fernández", "López", "Díaz", "Martínez", "Pérez", "García",
+    "Sánchez", "Romero", "Sosa", "Torres", "Álvarez", "Ruiz", "Ramírez", "Flores", "Acosta", "Benítez",
+]
+SEXOS = ["F", "M"]
+DIAGNOSTICOS_SECUNDARIOS = [
+    "Hipertensión arterial", "Diabetes mellitus tipo 2", "EPOC", "Enfermedad renal crónica",
+    "Dislipidemia", "Obesidad", "Fibrilación auricular", "Hipotiroidismo", "Anemia", "Asma",
+]
+
+# decimales con que se registra cada característica
+DECIMALES = np.array([0, 0, 0, 0, 1, 2, 0])
+UNIDADES = {
+    "pulso": "lpm",
+    "sistolica": "mmHg",
+    "diastolica": "mmHg",
+    "oxigeno": "%",
+    "temperatura": "°C",
+    "creatinina": "mg/dL",
+    "glucosa": "mg/dL",
+}
+CATEGORIAS = {"creatinina": "laboratorio", "glucosa": "laboratorio"}
+
+EPOCA = datetime(1970, 1, 1, tzinfo=timezone.utc)
+DIA_US = 86_400 * 10**6
+
+
+@dataclass
+class ConfigGenerador:
+    semilla: int = 42
+    pacientes: int = 100_000
+    pacientes_por_bloque: int = 2_000
+    admisiones_por_paciente: float = 1.5        # media (al menos una)
+    observaciones_por_admision: float = 40.0    # media (Poisson)
+    diagnosticos_por_admision: float = 0.8      # media (Poisson)
+    estadia_dias: float = 5.0                   # media (exponencial)
+    desde: datetime = field(default_factory=lambda: datetime(2025, 1, 1, tzinfo=timezone.utc))
+    dias: int = 365
+
+    @property
+    def n_bloques(self) -> int:
+        return -(-self.pacientes // self.pacientes_por_bloque)
+
+    @property
+    def hasta(self) -> datetime:
+        return self.desde + timedelta(days=self.dias)
+
+
+# ---------------------------
+#   GENERACIÓN (NumPy, por bloque)
+# ---------------------------
+def _uuids(rng: np.random.Generator, n: int) -> np.ndarray:
+    """(n, 16) uint8 con formato de UUID v4."""
+    b = rng.integers(0, 256, size=(n, 16), dtype=np.uint8)
+    b[:, 6] = (b[:, 6] & 0x0F) | 0x40
+    b[:, 8] = (b[:, 8] & 0x3F) | 0x80
+    return b
+
+
+def _us(instante: datetime) -> int:
+    return (instante - EPOCA) // timedelta(microseconds=1)
+
+
+def generar_bloque(config: ConfigGenerador, b: int) -> dict[str, dict[str, np.ndarray]]:
+    """Columnas de cada tabla para el bloque `b` (determinista)."""
+    rng = np.random.default_rng(np.random.SeedSequence(config.semilla).spawn(config.n_bloques)[b])
+    inicio_us, fin_us = _us(config.desde), _us(config.hasta)
+
+    # pacientes
+    n_p = min(config.pacientes_por_bloque, config.pacientes - b * config.pacientes_por_bloque)
+    id_paciente = _uuids(rng, n_p)
+    edad_dias = rng.integers(18 * 365, 90 * 365, n_p)
+    pacientes = {
+        "id_paciente": id_paciente,
+        "nombre": rng.integers(0, len(NOMBRES), n_p).astype(np.int16),
+        "apellido": rng.integers(0, len(APELLIDOS), n_p).astype(np.int16),
+        "fecha_nacimiento": np.datetime64(config.desde.date()) - edad_dias.astype("timedelta64[D]"),
+        "sexo": rng.integers(0, len(SEXOS), n_p).astype(np.int8),
+    }
+
+    # admisiones: la que sigue abierta al final del período queda activa
+    por_paciente = 1 + rng.poisson(max(config.admisiones_por_paciente - 1, 0), n_p)
+    paciente_de = np.repeat(np.arange(n_p), por_paciente)
+    n_a = len(paciente_de)
+    ingreso = rng.integers(inicio_us, fin_us, n_a)
+    duracion = (DIA_US / 24 + rng.exponential(config.estadia_dias * DIA_US, n_a)).astype(np.int64)
+    salida = ingreso + duracion
+    activa = salida > fin_us
+    especialidad = rng.integers(0, len(ESPECIALIDADES), n_a).astype(np.int8)
+    id_admision = _uuids(rng, n_a)
+    admisiones = {
+        "id_admision": id_admision,
+        "id_paciente": id_paciente[paciente_de],
+        "fecha_ingreso": ingreso.astype("datetime64[us]"),
+        "fecha_salida": np.where(activa, np.iinfo(np.int64).min, salida).astype("datetime64[us]"),  # NaT
+        "especialidad": especialidad,
+    }
+
+    # observaciones: nivel por admisión + ruido por medición
+    medias, desvios = PARAMETROS[especialidad, :, 0], PARAMETROS[especialidad, :, 1]
+    nivel = rng.normal(medias, 0.8 * desvios)
+    por_admision = rng.poisson(config.observaciones_por_admision, n_a)
+    admision_de = np.repeat(np.arange(n_a), por_admision)
+    n_o = len(admision_de)
+    codigo = rng.integers(0, len(CARACTERISTICAS), n_o).astype(np.int8)
+    valor = nivel[admision_de, codigo] + rng.normal(0, 0.6 * desvios[admision_de, codigo])
+    escala = 10.0 ** DECIMALES[codigo]
+    hasta_us = np.minimum(salida, fin_us)
+    fecha = ingreso[admision_de] + (rng.random(n_o) * (hasta_us - ingreso)[admision_de]).astype(np.int64)
+    observaciones = {
+        "id_observacion": _uuids(rng, n_o),
+        "id_paciente": admisiones["id_paciente"][admision_de],
+        "id_admision": id_admision[admision_de],
+        "codigo": codigo,
+        "fecha_hora": fecha.astype("datetime64[us]"),
+        "valor": np.round(valor * escala) / escala,
+    }
+
+    # diagnósticos secundarios
+    por_admision = rng.poisson(config.diagnosticos_por_admision, n_a)
+    admision_de = np.repeat(np.arange(n_a), por_admision)
+    diagnosticos = {
+        "id_diag_sec": _uuids(rng, len(admision_de)),
+        "id_admision": id_admision[admision_de],
+        "diagnostico": rng.integers(0, len(DIAGNOSTICOS_SECUNDARIOS), len(admision_de)).astype(np.int16),
+    }
+
+    return {
+        "pacientes": pacientes,
+        "admisiones": admisiones,
+        "observaciones": observaciones,
+        "diagnosticos_secundarios": diagnosticos,
+    }
+
+
+def diccionarios() -> dict:
+    """Valores de las columnas codificadas como índice en .npy / Parquet."""
+    return {
+        "nombre": NOMBRES,
+        "apellido": APELLIDOS,
+        "sexo": SEXOS,
+        "especialidad": ESPECIALIDADES,
+        "codigo": [CODIGOS[c] for c in CARACTERISTICAS],
+        "diagnostico": DIAGNOSTICOS_SECUNDARIOS,
+    }
+
+
+# ---------------------------
+#   DESTINOS
+# ---------------------------
+def _ruta(destino: str, tabla: str, b: int, extension: str) -> str:
+    return os.path.join(destino, tabla, f"parte-{b:05d}.{extension}")
+
+
+def _escribir_npy(bloque: dict, destino: str, b: int):
+    for tabla, columnas in bloque.items():
+        n = len(next(iter(columnas.values())))
+        arr = np.empty(n, dtype=[(c, v.dtype, v.shape[1:]) for c, v in columnas.items()])
+        for c, v in columnas.items():
+            arr[c] = v
+        np.save(_ruta(destino, tabla, b, "npy"), arr)
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        raise RuntimeError("La salida Parquet requiere pyarrow (pip install pyarrow)")
+    return pyarrow
+
+
+def _escribir_parquet(bloque: dict, destino: str, b: int):
+    pa = _pyarrow()
+    textos = diccionarios()
+
+    for tabla, columnas in bloque.items():
+        arrays = {}
+        for c, v in columnas.items():
+            if v.ndim == 2:  # UUID
+                arrays[c] = pa.FixedSizeBinaryArray.from_buffers(
+                    pa.binary(16), len(v), [None, pa.py_buffer(np.ascontiguousarray(v))]
+                )
+            elif c in textos:
+                arrays[c] = pa.DictionaryArray.from_arrays(pa.array(v.astype(np.int32)), pa.array(textos[c]))
+            elif v.dtype.kind == "M" and v.dtype != np.dtype("datetime64[D]"):
+                arrays[c] = pa.array(v, from_pandas=True).cast(pa.timestamp("us", tz="UTC"))
+            else:
+                arrays[c] = pa.array(v, from_pandas=True)
+        pa.parquet.write_table(pa.table(arrays), _ruta(destino, tabla, b, "parquet"), compression="zstd")
+
+
+def _uuid_objetos(v: np.ndarray) -> list:
+    crudo = np.ascontiguousarray(v).tobytes()
+    return [uuid.UUID(bytes=crudo[i:i + 16]) for i in range(0, len(crudo), 16)]
+
+
+def _instantes(v: np.ndarray) -> list:
+    # asyncpg toma los naive como hora local: van con tz; NaT -> NULL
+    return [
+        None if nat else EPOCA + timedelta(microseconds=us)
+        for us, nat in zip(v.astype(np.int64).tolist(), np.isnat(v).tolist())
+    ]
+
+
+async def _copiar_postgres(bloque: dict, dsn: str, tipos: dict[str, str]):
+    import asyncpg
+
+    p, a, o, d = (bloque[t] for t in TABLAS)
+    id_tipo = [uuid.UUID(tipos[c]) for c in diccionarios()["codigo"]]
+
+    conexion = await asyncpg.connect(dsn)
+    try:
+        async with conexion.transaction():
+            await conexion.copy_records_to_table(
+                "pacientes",
+                columns=["id_paciente", "nombre", "apellido", "fecha_nacimiento", "sexo"],
+                records=zip(
+                    _uuid_objetos(p["id_paciente"]),
+                    [NOMBRES[i] for i in p["nombre"].tolist()],
+                    [APELLIDOS[i] for i in p["apellido"].tolist()],
+                    p["fecha_nacimiento"].astype(object).tolist(),
+                    [SEXOS[i] for i in p["sexo"].tolist()],
+                )
+            )
+            await conexion.copy_records_to_table(
+                "admisiones",
+                columns=["id_admision", "id_paciente", "fecha_ingreso", "fecha_salida", "diagnostico_principal"],
+                records=zip(
+                    _uuid_objetos(a["id_admision"]),
+                    _uuid_objetos(a["id_paciente"]),
+                    _instantes(a["fecha_ingreso"]),
+                    _instantes(a["fecha_salida"]),
+                    [ESPECIALIDADES[i] for i in a["especialidad"].tolist()],
+                )
+            )
+            unidades = [UNIDADES[c] for c in CARACTERISTICAS]
+            await conexion.copy_records_to_table(
+                "observaciones",
+                columns=["id_observacion", "id_paciente", "id_admision", "id_tipo_obs",
+                         "fecha_hora", "valor_numerico", "unidad"],
+                records=zip(
+                    _uuid_objetos(o["id_observacion"]),
+                    _uuid_objetos(o["id_paciente"]),
+                    _uuid_objetos(o["id_admision"]),
+                    [id_tipo[i] for i in o["codigo"].tolist()],
+                    _instantes(o["fecha_hora"]),
+                    # NUMERIC: como texto, para no arrastrar el error binario del float
+                    list(map(str, o["valor"].tolist())),
+                    [unidades[i] for i in o["codigo"].tolist()],
+                )
+            )
+            await conexion.copy_records_to_table(
+                "diagnosticos_secundarios",
+                columns=["id_diag_sec", "id_admision", "diagnostico"],
+                records=zip(
+                    _uuid_objetos(d["id_diag_sec"]),
+                    _uuid_objetos(d["id_admision"]),
+                    [DIAGNOSTICOS_SECUNDARIOS[i] for i in d["diagnostico"].tolist()],
+                )
+            )
+    finally:
+        await conexion.close()
+
+
+async def asegurar_tipos(db) -> dict[str, str]:
+    """codigo -> id_tipo_obs de las siete características; crea los que falten. Sin commit."""
+    from sqlalchemy import select, insert
+    from app.models.tipos_observacion import TipoObservacion
+
+    codigos = {CODIGOS[c]: c for c in CARACTERISTICAS}
+    result = await db.execute(
+        select(TipoObservacion.codigo, TipoObservacion.id_tipo_obs)
+        .where(TipoObservacion.codigo.in_(codigos), TipoObservacion.estado == "activo")
+    )
+    tipos = {codigo: str(id_tipo) for codigo, id_tipo in result.all()}
+
+    for codigo, c in codigos.items():
+        if codigo not in tipos:
+            tipos[codigo] = str(await db.scalar(
+                insert(TipoObservacion)
+                .values(
+                    codigo=codigo,
+                    nombre=c.capitalize(),
+                    categoria=CATEGORIAS.get(c, "signo_vital"),
+                    unidad_default=UNIDADES[c]
+                )
+                .returning(TipoObservacion.id_tipo_obs)
+            ))
+    return tipos
+
+
+def procesar_bloque(config: ConfigGenerador, b: int, formato: str, destino: str, tipos: dict | None) -> dict:
+    """Genera el bloque `b` y lo escribe en `destino`. Corre en el pool."""
+    import asyncio
+
+    bloque = generar_bloque(config, b)
+    if formato == "npy":
+        _escribir_npy(bloque, destino, b)
+    elif formato == "parquet":
+        _escribir_parquet(bloque, destino, b)
+    else:
+        asyncio.run(_copiar_postgres(bloque, destino, tipos))
+    return {t: len(next(iter(c.values()))) for t, c in bloque.items()}
+
+
+def generar(
+    config: ConfigGenerador,
+    formato: str,
+    destino: str,
+    tipos: dict[str, str] | None = None,
+    procesos: int | None = None,
+    avance=None
+) -> dict:
+    """Genera todos los bloques en un pool de procesos.
+
+    `destino` es un directorio (npy / parquet) o un DSN de Postgres
+    (formato "postgres", con `tipos`: codigo -> id_tipo_obs).
+    """
+    if formato not in ("npy", "parquet", "postgres"):
+        raise ValueError(f"Formato no soportado: {formato}")
+    if formato == "parquet":
+        _pyarrow()
+    if formato != "postgres":
+        for tabla in TABLAS:
+            os.makedirs(os.path.join(destino, tabla), exist_ok=True)
+        with open(os.path.join(destino, "generador.json"), "w") as f:
+            json.dump(
+                {"config": asdict(config), "diccionarios": diccionarios()},
+                f, default=str, ensure_ascii=False, indent=2
+            )
+
+    totales = dict.fromkeys(TABLAS, 0)
+    with ProcessPoolExecutor(max_workers=procesos or os.cpu_count() or 1) as pool:
+        futuros = [
+            pool.submit(procesar_bloque, config, b, formato, destino, tipos)
+            for b in range(config.n_bloques)
+        ]
+        for hechos, futuro in enumerate(futuros, 1):
+            for tabla, n in futuro.result().items():
+                totales[tabla] += n
+            if avance:
+                avance(hechos, len(futuros), totales)
+    return totales
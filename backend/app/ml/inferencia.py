@@ -0,0 +1,117 @@
+# app/ml/inferencia.py
+# Predicción en proceso con micro-lotes.
+#
+# predict_proba tiene un costo fijo por llamada (validación, capas) mucho
+# mayor que el de cada fila extra, así que las peticiones concurrentes se
+# juntan: la primera abre un lote, se espera hasta ML_LOTE_ESPERA_MS o
+# ML_LOTE_MAX filas, y el lote entero va en una sola llamada. Corre en un
+# hilo propio (un solo hilo: los lotes no compiten entre sí ni con el
+# threadpool de la API) para no frenar el event loop. Con ML_MOTOR=numpy
+# el forward pass lo hace app/ml/motor_numpy.py, verificado contra sklearn
+# al iniciar. Cada lote suma sus entradas y predicciones al monitor de
+# deriva (app/ml/deriva.py), que se vuelca a la base cada
+# ML_DERIVA_VOLCADO_SEGUNDOS.
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.ml.deriva import MonitorDeriva
+from app.ml.modelo import ArtefactoModelo
+from app.ml.motor_numpy import elegir_motor
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class Predictor:
+    def __init__(self, artefacto: ArtefactoModelo):
+        self.artefacto = artefacto
+        self.motor = elegir_motor(artefacto)
+        self.deriva = MonitorDeriva(artefacto.version, len(artefacto.clases), "api")
+        self.cola: asyncio.Queue = asyncio.Queue()
+        self.ejecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prediccion")
+        self.tarea: asyncio.Task | None = None
+        self.tarea_deriva: asyncio.Task | None = None
+
+    async def iniciar(self):
+        self.tarea = asyncio.create_task(self._bucle())
+        self.tarea_deriva = asyncio.create_task(self._bucle_deriva())
+        logger.info(
+            "Predictor iniciado (modelo v%s, motor=%s, clases=%s)",
+            self.artefacto.version, type(self.motor).__name__, ", ".join(self.artefacto.clases)
+        )
+
+    async def detener(self):
+        for tarea in (self.tarea, self.tarea_deriva):
+            if tarea:
+                tarea.cancel()
+                await asyncio.gather(tarea, return_exceptions=True)
+        self.ejecutor.shutdown(wait=False, cancel_futures=True)
+        await self.volcar_deriva()
+
+    async def volcar_deriva(self):
+        try:
+            async with SessionLocal() as db:
+                await self.deriva.volcar(db)
+                await db.commit()
+        except Exception as e:
+            logger.warning("No se pudieron guardar los estadísticos de deriva: %s", e)
+
+    async def _bucle_deriva(self):
+        while True:
+            await asyncio.sleep(settings.ML_DERIVA_VOLCADO_SEGUNDOS)
+            await self.volcar_deriva()
+
+    async def predecir(self, X: np.ndarray) -> np.ndarray:
+        """(n, características) -> (n, clases). Se suma al lote en curso."""
+        X = np.asarray(X, dtype=np.float64).reshape(-1, len(self.artefacto.caracteristicas))
+        futuro = asyncio.get_running_loop().create_future()
+        await self.cola.put((X, futuro))
+        return await futuro
+
+    def _predecir_lote(self, X: np.ndarray) -> np.ndarray:
+        P = self.motor.predecir_proba(X)
+        self.deriva.registrar(X, P)
+        return P
+
+    async def _bucle(self):
+        loop = asyncio.get_running_loop()
+        espera = settings.ML_LOTE_ESPERA_MS / 1000
+
+        while True:
+            pedidos = [await self.cola.get()]
+            filas = len(pedidos[0][0])
+            limite = loop.time() + espera
+
+            while filas < settings.ML_LOTE_MAX:
+                try:
+                    pedido = self.cola.get_nowait()
+                except asyncio.QueueEmpty:
+                    restante = limite - loop.time()
+                    if restante <= 0:
+                        break
+                    try:
+                        pedido = await asyncio.wait_for(self.cola.get(), restante)
+                    except asyncio.TimeoutError:
+                        break
+                pedidos.append(pedido)
+                filas += len(pedido[0])
+
+            try:
+                P = await loop.run_in_executor(
+                    self.ejecutor, self._predecir_lote, np.vstack([X for X, _ in pedidos])
+                )
+            except Exception as e:
+                for _, futuro in pedidos:
+                    if not futuro.done():
+                        futuro.set_exception(e)
+                continue
+
+            inicio = 0
+            for X, futuro in pedidos:
+                if not futuro.done():  # el cliente pudo haberse ido
+                    futuro.set_result(P[inicio:inicio + len(X)])
+                inicio += len(X)
@@ -0,0 +1,182 @@
+# app/ml/modelo.py
+# Artefacto versionado del clasificador de especialidad.
+#
+# Un artefacto es un único archivo joblib (ML_DIR/especialidad_vNNNN.joblib)
+# con todo lo necesario para predecir sin el código de entrenamiento: el
+# orden de las características, el escalador, el MLP, las etiquetas de las
+# clases, los valores de relleno (medianas de entrenamiento) y la referencia
+# para el monitoreo de deriva (app/ml/deriva.py). Al cargarlo se verifica
+# que el orden coincida con app/ml/caracteristicas.py.
+#
+# Requiere scikit-learn (trae joblib): se importa al usarse.
+import os
+import re
+import tempfile
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+import numpy as np
+
+from app.core.config import settings
+from app.ml.caracteristicas import CARACTERISTICAS
+from app.ml.deriva import Estadisticos
+
+PATRON_ARCHIVO = re.compile(r"^especialidad_v(\d{4})\.joblib$")
+
+
+class ModeloNoDisponible(RuntimeError):
+    pass
+
+
+@dataclass
+class ArtefactoModelo:
+    version: int
+    caracteristicas: list[str]
+    clases: list[str]
+    escalador: object              # sklearn StandardScaler
+    modelo: object                 # sklearn MLPClassifier
+    relleno: np.ndarray            # (características,) float32
+    creado_en: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    metricas: dict = field(default_factory=dict)
+    parametros: dict = field(default_factory=dict)
+    referencia: dict | None = None   # Estadisticos de entrenamiento (None en versiones viejas)
+
+    def predecir_proba(self, X: np.ndarray) -> np.ndarray:
+        """(n, características) -> (n, clases); los NaN se completan con `relleno`."""
+        X = np.asarray(X, dtype=np.float64)
+        X = np.where(np.isnan(X), self.relleno, X)
+        return self.modelo.predict_proba(self.escalador.transform(X))
+
+
+def importar_joblib():
+    try:
+        import joblib
+    except ImportError:
+        raise ModeloNoDisponible("El clasificador requiere scikit-learn (pip install scikit-learn)")
+    return joblib
+
+
+# ---------------------------
+#   ENTRENAMIENTO
+# ---------------------------
+def entrenar(
+    X: np.ndarray,
+    y: np.ndarray,
+    clases: list[str],
+    capas: tuple[int, ...] = (16, 8),
+    max_iter: int = 1500,
+    semilla: int = 42,
+    prueba: float = 0.25,
+    tasa: float = 1e-3,
+    alpha: float = 1e-4
+) -> ArtefactoModelo:
+    """Entrena escalador + MLP con los hiperparámetros del prototipo.
+
+    `y` son índices en `clases`. Se reserva `prueba` (estratificado) para
+    las métricas y después se reentrena con todo.
+    """
+    importar_joblib()
+    from sklearn.metrics import accuracy_score
+    from sklearn.model_selection import train_test_split
+    from sklearn.neural_network import MLPClassifier
+    from sklearn.preprocessing import StandardScaler
+
+    X = np.asarray(X, dtype=np.float64)
+    referencia = Estadisticos.vacio(len(clases)).agregar(X, y)
+    relleno = np.nanmedian(X, axis=0)
+    X = np.where(np.isnan(X), relleno, X)
+    parametros = {
+        "hidden_layer_sizes": capas,
+        "learning_rate_init": tasa,
+        "alpha": alpha,
+        "max_iter": max_iter,
+        "random_state": semilla,
+    }
+
+    def ajustar(X_, y_):
+        escalador = StandardScaler().fit(X_)
+        modelo = MLPClassifier(**parametros).fit(escalador.transform(X_), y_)
+        return escalador, modelo
+
+    metricas = {"filas": int(len(X))}
+    if prueba:
+        X_tr, X_te, y_tr, y_te = train_test_split(
+            X, y, test_size=prueba, random_state=semilla, stratify=y
+        )
+        escalador, modelo = ajustar(X_tr, y_tr)
+        metricas["exactitud"] = float(accuracy_score(y_te, modelo.predict(escalador.transform(X_te))))
+
+    escalador, modelo = ajustar(X, y)
+    return ArtefactoModelo(
+        version=0,
+        caracteristicas=list(CARACTERISTICAS),
+        clases=list(clases),
+        escalador=escalador,
+        modelo=modelo,
+        relleno=relleno.astype(np.float32),
+        metricas=metricas,
+        parametros=parametros,
+        referencia=referencia.a_dict(),
+    )
+
+
+# ---------------------------
+#   PERSISTENCIA
+# ---------------------------
+def versiones(directorio: str | None = None) -> list[int]:
+    directorio = directorio or settings.ML_DIR
+    if not os.path.isdir(directorio):
+        return []
+    return sorted(
+        int(m.group(1)) for m in map(PATRON_ARCHIVO.match, os.listdir(directorio)) if m
+    )
+
+
+def ruta_version(version: int, directorio: str | None = None) -> str:
+    return os.path.join(directorio or settings.ML_DIR, f"especialidad_v{version:04d}.joblib")
+
+
+def guardar(artefacto: ArtefactoModelo, directorio: str | None = None) -> str:
+    """Guarda como la versión siguiente a la última del directorio.
+
+    Se vuelca a un temporal propio y se publica con os.link, que falla si el
+    destino existe: si otro entrenamiento tomó esa versión, se pasa a la
+    siguiente y se vuelve a volcar (la versión va dentro del artefacto).
+    """
+    joblib = importar_joblib()
+    directorio = directorio or settings.ML_DIR
+    os.makedirs(directorio, exist_ok=True)
+
+    descriptor, parcial = tempfile.mkstemp(dir=directorio, suffix=".part")
+    os.close(descriptor)
+    try:
+        version = (versiones(directorio) or [0])[-1] + 1
+        while True:
+            artefacto.version = version
+            joblib.dump(artefacto, parcial)
+            ruta = ruta_version(version, directorio)
+            try:
+                os.link(parcial, ruta)
+                return ruta
+            except FileExistsError:
+                version = max(version, *(versiones(directorio) or [0])) + 1
+    finally:
+        os.remove(parcial)
+
+
+def cargar(ruta: str | None = None) -> ArtefactoModelo:
+    """Carga `ruta`, ML_MODELO_RUTA o la última versión de ML_DIR."""
+    joblib = importar_joblib()
+    ruta = ruta or settings.ML_MODELO_RUTA
+    if not ruta:
+        disponibles = versiones()
+        if not disponibles:
+            raise ModeloNoDisponible(f"No hay modelos entrenados en {settings.ML_DIR}")
+        ruta = ruta_version(disponibles[-1])
+
+    artefacto = joblib.load(ruta)
+    if artefacto.caracteristicas != CARACTERISTICAS:
+        raise ModeloNoDisponible(
+            f"El modelo {ruta} espera {artefacto.caracteristicas}, el código arma {CARACTERISTICAS}"
+        )
+    return artefacto
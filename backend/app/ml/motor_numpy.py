@@ -0,0 +1,176 @@
+# app/ml/motor_numpy.py
+# Forward pass del MLP en NumPy puro.
+#
+# Para una fila, predict_proba de sklearn gasta casi todo en validar la
+# entrada (check_array, dtypes, escalador) y no en las multiplicaciones
+# 7→16→8→4. Acá los pesos se copian una vez a float32 contiguos, el
+# StandardScaler se pliega en la primera capa (W' = W / escala,
+# b' = b - (media / escala) @ W) y cada capa escribe en buffers
+# preasignados de BLOQUE filas; los lotes grandes se recorren de a bloques
+# para que los intermedios queden en caché.
+#
+# Una instancia no es segura entre hilos (comparte los buffers): el
+# Predictor la usa desde su único hilo.
+import logging
+import time
+
+import numpy as np
+
+from app.core.config import settings
+from app.ml.modelo import ArtefactoModelo
+
+BLOQUE = 4096
+
+logger = logging.getLogger("uvicorn.error")
+
+
+def _relu(x):
+    np.maximum(x, 0, out=x)
+
+
+def _tanh(x):
+    np.tanh(x, out=x)
+
+
+def _logistica(x):
+    np.negative(x, out=x)
+    np.exp(x, out=x)
+    x += 1
+    np.reciprocal(x, out=x)
+
+
+def _identidad(x):
+    pass
+
+
+ACTIVACIONES = {"relu": _relu, "tanh": _tanh, "logistic": _logistica, "identity": _identidad}
+
+
+class MotorNumpy:
+    def __init__(self, artefacto: ArtefactoModelo, bloque: int = BLOQUE):
+        modelo, escalador = artefacto.modelo, artefacto.escalador
+        self.clases = artefacto.clases
+        self.version = artefacto.version
+        self.bloque = bloque
+
+        media = np.asarray(escalador.mean_, dtype=np.float64)
+        escala = np.asarray(escalador.scale_, dtype=np.float64)
+        W0 = modelo.coefs_[0] / escala[:, None]
+        b0 = modelo.intercepts_[0] - (media / escala) @ modelo.coefs_[0]
+
+        self.pesos = [np.ascontiguousarray(W0, dtype=np.float32)]
+        self.pesos += [np.ascontiguousarray(W, dtype=np.float32) for W in modelo.coefs_[1:]]
+        self.sesgos = [np.ascontiguousarray(b0, dtype=np.float32)]
+        self.sesgos += [np.ascontiguousarray(b, dtype=np.float32) for b in modelo.intercepts_[1:]]
+        self.relleno = np.asarray(artefacto.relleno, dtype=np.float32)
+
+        self.activacion = ACTIVACIONES[modelo.activation]
+        # binario: una sola salida logística; multiclase: softmax
+        self.binario = modelo.out_activation_ == "logistic"
+
+        self.entrada = np.empty((bloque, self.pesos[0].shape[0]), dtype=np.float32)
+        self.capas = [np.empty((bloque, W.shape[1]), dtype=np.float32) for W in self.pesos]
+
+    def predecir_proba(self, X: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+        """(n, características) -> (n, clases) float32; los NaN se completan con `relleno`."""
+        X = np.asarray(X)
+        n = len(X)
+        if out is None:
+            out = np.empty((n, len(self.clases)), dtype=np.float32)
+
+        for inicio in range(0, n, self.bloque):
+            fin = min(inicio + self.bloque, n)
+            self._bloque(X[inicio:fin], out[inicio:fin])
+        return out
+
+    def _bloque(self, X: np.ndarray, out: np.ndarray):
+        m = len(X)
+        x = self.entrada[:m]
+        x[...] = X
+        faltan = np.isnan(x)
+        if faltan.any():
+            np.copyto(x, self.relleno, where=faltan)
+
+        ultima = len(self.pesos) - 1
+        for i, (W, b, h) in enumerate(zip(self.pesos, self.sesgos, self.capas)):
+            h = h[:m]
+            np.matmul(x, W, out=h)
+            h += b
+            if i < ultima:
+                self.activacion(h)
+            x = h
+
+        if self.binario:
+            _logistica(x)
+            out[:, 1] = x[:, 0]
+            np.subtract(1, x[:, 0], out=out[:, 0])
+        else:
+            x -= x.max(axis=1, keepdims=True)
+            np.exp(x, out=x)
+            x /= x.sum(axis=1, keepdims=True)
+            out[...] = x
+
+
+# ---------------------------
+#   PARIDAD / BENCHMARK
+# ---------------------------
+def filas_de_prueba(artefacto: ArtefactoModelo, n: int, semilla: int = 0) -> np.ndarray:
+    """Filas simuladas con la media de entrenamiento y 1,5 veces su desvío."""
+    rng = np.random.default_rng(semilla)
+    escalador = artefacto.escalador
+    return rng.normal(escalador.mean_, 1.5 * escalador.scale_, size=(n, len(escalador.mean_)))
+
+
+def verificar_paridad(
+    artefacto: ArtefactoModelo,
+    motor: MotorNumpy | None = None,
+    n: int = 10_000,
+    tolerancia: float = 1e-4
+) -> float:
+    """Máxima diferencia absoluta de probabilidades contra sklearn; ValueError si supera `tolerancia`."""
+    motor = motor or MotorNumpy(artefacto)
+    X = filas_de_prueba(artefacto, n)
+    diferencia = float(np.abs(motor.predecir_proba(X) - artefacto.predecir_proba(X)).max())
+    if diferencia > tolerancia:
+        raise ValueError(f"El motor NumPy difiere de sklearn en {diferencia:.2e} (tolerancia {tolerancia:.0e})")
+    return diferencia
+
+
+def elegir_motor(artefacto: ArtefactoModelo, n: int = 1000):
+    """MotorNumpy si ML_MOTOR lo pide y pasa la paridad; si no, el artefacto (sklearn)."""
+    if settings.ML_MOTOR != "numpy":
+        return artefacto
+    motor = MotorNumpy(artefacto)
+    try:
+        verificar_paridad(artefacto, motor, n=n)
+        return motor
+    except ValueError as e:
+        logger.warning("Se usa sklearn para predecir: %s", e)
+        return artefacto
+
+
+def _cronometrar(funcion, X, minimo_segundos: float) -> float:
+    funcion(X)  # calentamiento
+    repeticiones, inicio = 0, time.perf_counter()
+    while True:
+        funcion(X)
+        repeticiones += 1
+        transcurrido = time.perf_counter() - inicio
+        if transcurrido >= minimo_segundos:
+            return transcurrido / repeticiones
+
+
+def benchmark(
+    artefacto: ArtefactoModelo,
+    tamanos=(1, 10, 100, 1_000, 10_000, 100_000),
+    minimo_segundos: float = 0.5
+) -> list[dict]:
+    """Latencia por llamada de sklearn y del motor NumPy para cada tamaño de lote."""
+    motor = MotorNumpy(artefacto)
+    resultados = []
+    for n in tamanos:
+        X = filas_de_prueba(artefacto, n)
+        sk = _cronometrar(artefacto.predecir_proba, X, minimo_segundos)
+        np_ = _cronometrar(motor.predecir_proba, X, minimo_segundos)
+        resultados.append({"filas": n, "sklearn_s": sk, "numpy_s": np_, "aceleracion": sk / np_})
+    return resultados
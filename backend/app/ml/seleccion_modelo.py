@@ -0,0 +1,162 @@
+# app/ml/seleccion_modelo.py
+# Búsqueda de hiperparámetros con validación cruzada k-fold en paralelo.
+#
+# Cada (combinación, fold) es una tarea independiente de un pool de
+# procesos (uno por núcleo). X e y no viajan en el pickle de cada tarea:
+# se escriben una vez como .npy y cada proceso los abre con mmap, así todos
+# comparten las mismas páginas del page cache. Los folds
+# (StratifiedKFold con semilla fija) los recalcula cada proceso a partir
+# de y. BLAS queda en un hilo por proceso para no sobresuscribir núcleos.
+#
+# El resultado es una tabla ordenada por exactitud media; la mejor
+# combinación se reentrena con todos los datos y se guarda como versión
+# nueva (app/ml/modelo.py).
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from app.ml.modelo import ArtefactoModelo, entrenar, importar_joblib
+
+GRILLA = {
+    "capas": [(16, 8), (32, 16), (64, 32), (32, 16, 8)],
+    "tasa": [1e-3, 3e-3, 1e-2],
+    "alpha": [1e-5, 1e-4, 1e-3],
+}
+
+# datos abiertos por cada proceso del pool (una vez por proceso)
+_datos: dict = {}
+
+
+def combinaciones(grilla: dict, muestras: int | None = None, semilla: int = 42) -> list[dict]:
+    """Producto cartesiano de la grilla; con `muestras`, un subconjunto aleatorio sin repetir."""
+    claves = list(grilla)
+    todas = [dict(zip(claves, valores)) for valores in itertools.product(*grilla.values())]
+    if muestras and muestras < len(todas):
+        elegidas = np.random.default_rng(semilla).choice(len(todas), muestras, replace=False)
+        todas = [todas[i] for i in sorted(elegidas)]
+    return todas
+
+
+# ---------------------------
+#   PROCESOS DEL POOL
+# ---------------------------
+def _iniciar_proceso():
+    try:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(1)
+    except ImportError:
+        pass
+
+
+def _abrir(ruta_X: str, ruta_y: str):
+    clave = (ruta_X, ruta_y)
+    if clave not in _datos:
+        _datos.clear()
+        _datos[clave] = (np.load(ruta_X, mmap_mode="r"), np.load(ruta_y, mmap_mode="r"))
+    return _datos[clave]
+
+
+def _evaluar_fold(
+    ruta_X: str, ruta_y: str, i: int, combinacion: dict, fold: int, k: int, max_iter: int, semilla: int
+) -> dict:
+    from sklearn.model_selection import StratifiedKFold
+    from sklearn.neural_network import MLPClassifier
+    from sklearn.preprocessing import StandardScaler
+
+    X, y = _abrir(ruta_X, ruta_y)
+    folds = StratifiedKFold(n_splits=k, shuffle=True, random_state=semilla)
+    entrenamiento, validacion = next(itertools.islice(folds.split(np.zeros(len(y)), y), fold, None))
+
+    inicio = time.perf_counter()
+    X_tr = np.asarray(X[entrenamiento], dtype=np.float64)
+    relleno = np.nanmedian(X_tr, axis=0)
+    X_tr = np.where(np.isnan(X_tr), relleno, X_tr)
+    escalador = StandardScaler().fit(X_tr)
+    modelo = MLPClassifier(
+        hidden_layer_sizes=combinacion["capas"],
+        learning_rate_init=combinacion["tasa"],
+        alpha=combinacion["alpha"],
+        max_iter=max_iter,
+        random_state=semilla,
+    ).fit(escalador.transform(X_tr), y[entrenamiento])
+
+    X_va = np.asarray(X[validacion], dtype=np.float64)
+    X_va = np.where(np.isnan(X_va), relleno, X_va)
+    exactitud = float((modelo.predict(escalador.transform(X_va)) == y[validacion]).mean())
+
+    return {
+        "i": i,
+        "fold": fold,
+        "exactitud": exactitud,
+        "iteraciones": int(modelo.n_iter_),
+        "segundos": time.perf_counter() - inicio,
+    }
+
+
+# ---------------------------
+#   BÚSQUEDA
+# ---------------------------
+def buscar(
+    ruta_X: str,
+    ruta_y: str,
+    candidatas: list[dict],
+    k: int = 5,
+    max_iter: int = 500,
+    semilla: int = 42,
+    procesos: int | None = None,
+    avance=None
+) -> list[dict]:
+    """Evalúa cada combinación con k-fold en un pool de procesos. Devuelve la
+    tabla ordenada (mejor primero) con media y desvío de la exactitud."""
+    importar_joblib()
+    procesos = procesos or os.cpu_count() or 1
+    folds: dict[int, list[dict]] = {i: [] for i in range(len(candidatas))}
+
+    with ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_proceso) as pool:
+        futuros = [
+            pool.submit(_evaluar_fold, ruta_X, ruta_y, i, c, fold, k, max_iter, semilla)
+            for i, c in enumerate(candidatas)
+            for fold in range(k)
+        ]
+        for hechos, futuro in enumerate(as_completed(futuros), 1):
+            r = futuro.result()
+            folds[r["i"]].append(r)
+            if avance:
+                avance(hechos, len(futuros))
+
+    tabla = []
+    for i, c in enumerate(candidatas):
+        exactitudes = np.array([r["exactitud"] for r in folds[i]])
+        tabla.append({
+            **c,
+            "exactitud_media": float(exactitudes.mean()),
+            "exactitud_desvio": float(exactitudes.std()),
+            "iteraciones_media": float(np.mean([r["iteraciones"] for r in folds[i]])),
+            "segundos": float(sum(r["segundos"] for r in folds[i])),
+        })
+    tabla.sort(key=lambda r: (-r["exactitud_media"], r["exactitud_desvio"]))
+    for puesto, fila in enumerate(tabla, 1):
+        fila["puesto"] = puesto
+    return tabla
+
+
+def entrenar_mejor(
+    X: np.ndarray, y: np.ndarray, clases: list[str], tabla: list[dict], k: int, max_iter: int, semilla: int
+) -> ArtefactoModelo:
+    """Reentrena la mejor combinación con todos los datos."""
+    mejor = tabla[0]
+    artefacto = entrenar(
+        X, y, clases,
+        capas=tuple(mejor["capas"]), max_iter=max_iter, semilla=semilla,
+        tasa=mejor["tasa"], alpha=mejor["alpha"], prueba=0
+    )
+    artefacto.metricas.update(
+        exactitud_cv=mejor["exactitud_media"],
+        exactitud_cv_desvio=mejor["exactitud_desvio"],
+        folds=k,
+        combinaciones_evaluadas=len(tabla),
+    )
+    return artefacto
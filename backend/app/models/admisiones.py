@@ -1,8 +1,9 @@
 # app/models/admisiones.py
-from sqlalchemy import Column, Text, TIMESTAMP, ForeignKey
+from sqlalchemy import Column, Text, TIMESTAMP, ForeignKey, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from app.core.database import Base
+from app.core.busqueda import indice_trigram
 import uuid
 
 class Admision(Base):
@@ -26,4 +27,17 @@ class Admision(Base):
     diagnostico_principal = Column(Text, nullable=True)
     creado_en = Column(TIMESTAMP(timezone=True), server_default=func.now())
 
-    estado = Column(Text, nullable=False, server_default="activo")
\ No newline at end of file
+    estado = Column(Text, nullable=False, server_default="activo")
+
+    __table_args__ = (
+        Index("ix_admisiones_paciente_ingreso", "id_paciente", "fecha_ingreso"),
+        Index("ix_admisiones_creado_en", "creado_en", "id_admision"),
+        # admisiones en curso (vitales actuales)
+        Index(
+            "ix_admisiones_activas",
+            "fecha_ingreso", "id_admision",
+            postgresql_where=text("estado = 'activo' AND fecha_salida IS NULL")
+        ),
+        # búsquedas por subcadena (ver app/core/busqueda.py)
+        indice_trigram("ix_admisiones_diagnostico_principal_trgm", "diagnostico_principal"),
+    )
@@ -1,9 +1,10 @@
 # app/models/archivos.py
-from sqlalchemy import Column, Text, ForeignKey, BigInteger
+from sqlalchemy import Column, Text, ForeignKey, BigInteger, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.types import TIMESTAMP
 from app.core.database import Base
+from app.core.busqueda import indice_trigram
 import uuid
 
 class Archivo(Base):
@@ -14,8 +15,23 @@ class Archivo(Base):
     ruta_almacenamiento = Column(Text, nullable=False)
     tipo_archivo = Column(Text, nullable=False)
     tamaño_bytes = Column(BigInteger)
+    hash_sha256 = Column(Text, ForeignKey("contenidos_archivo.hash_sha256"), nullable=True)
     subido_por = Column(UUID(as_uuid=True), ForeignKey("usuarios.id_usuario"))
     subido_en = Column(TIMESTAMP(timezone=True), server_default=func.now())
 
     # 👉 NUEVO
     estado = Column(Text, nullable=False, server_default="activo")
+
+    __table_args__ = (
+        Index("ix_archivos_subido_en", "subido_en", "id_archivo"),
+        # descubrimiento del pipeline OCR y listados de activos
+        Index(
+            "ix_archivos_activos_subido_en",
+            "subido_en",
+            postgresql_where=text("estado = 'activo'")
+        ),
+        Index("ix_archivos_hash_sha256", "hash_sha256"),
+        Index("ix_archivos_subido_por", "subido_por"),
+        # búsquedas por subcadena (ver app/core/busqueda.py)
+        indice_trigram("ix_archivos_nombre_archivo_trgm", "nombre_archivo"),
+    )
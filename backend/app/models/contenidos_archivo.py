@@ -0,0 +1,15 @@
+# app/models/contenidos_archivo.py
+from sqlalchemy import Column, Text, BigInteger, Integer
+from sqlalchemy.sql import func
+from sqlalchemy.types import TIMESTAMP
+from app.core.database import Base
+
+# Blob físico direccionado por su sha256; varios Archivo pueden apuntarle
+class ContenidoArchivo(Base):
+    __tablename__ = "contenidos_archivo"
+
+    hash_sha256 = Column(Text, primary_key=True)
+    ruta_almacenamiento = Column(Text, nullable=False)
+    tamaño_bytes = Column(BigInteger, nullable=False)
+    referencias = Column(Integer, nullable=False, server_default="0")
+    creado_en = Column(TIMESTAMP(timezone=True), server_default=func.now())
@@ -0,0 +1,23 @@
+# app/models/deriva_modelo.py
+from sqlalchemy import Column, BigInteger, Integer, Text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+from sqlalchemy.types import TIMESTAMP
+from app.core.database import Base
+
+# Estadísticos de deriva del clasificador (app/ml/deriva.py) por versión del
+# modelo, origen (api / puntuacion) y hora. `estado` guarda los acumuladores
+# de Welford, los histogramas y el conteo de especialidades predichas; cada
+# proceso combina su delta con la fila de la hora en curso.
+class DerivaModelo(Base):
+    __tablename__ = "deriva_modelo"
+
+    version_modelo = Column(Integer, primary_key=True)
+    origen = Column(Text, primary_key=True)
+    hora = Column(TIMESTAMP(timezone=True), primary_key=True)
+
+    filas = Column(BigInteger, nullable=False, default=0)
+    estado = Column(JSONB, nullable=False)
+    actualizado_en = Column(
+        TIMESTAMP(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now()
+    )
@@ -1,8 +1,9 @@
 # app/models/diagnosticos_secundarios.py
-from sqlalchemy import Column, Text, ForeignKey
+from sqlalchemy import Column, Text, ForeignKey, Index, TIMESTAMP
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from app.core.database import Base
+from app.core.busqueda import indice_trigram
 
 class DiagnosticoSecundario(Base):
     __tablename__ = "diagnosticos_secundarios"
@@ -22,3 +23,13 @@ class DiagnosticoSecundario(Base):
     diagnostico = Column(Text, nullable=False)
 
     estado = Column(Text, nullable=False, server_default="activo")
+
+    # marca de agua de las exportaciones incrementales
+    creado_en = Column(TIMESTAMP(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_diagnosticos_secundarios_admision", "id_admision"),
+        Index("ix_diagnosticos_secundarios_creado_en", "creado_en"),
+        # búsquedas por subcadena (ver app/core/busqueda.py)
+        indice_trigram("ix_diagnosticos_secundarios_diagnostico_trgm", "diagnostico"),
+    )
@@ -0,0 +1,17 @@
+# app/models/marcas_refresco.py
+from sqlalchemy import Column, Text
+from sqlalchemy.sql import func
+from sqlalchemy.types import TIMESTAMP
+from app.core.database import Base
+
+# Hasta dónde llegó cada refresco incremental (una fila por resumen). Solo
+# la avanza el refresco completo de su tarea, no los recálculos puntuales,
+# así una edición suelta no hace saltear filas que nunca se resumieron.
+class MarcaRefresco(Base):
+    __tablename__ = "marcas_refresco"
+
+    nombre = Column(Text, primary_key=True)
+    hasta = Column(TIMESTAMP(timezone=True), nullable=False)
+    actualizado_en = Column(
+        TIMESTAMP(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now()
+    )
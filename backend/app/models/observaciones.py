@@ -1,9 +1,14 @@
 # app/models/observaciones.py
-from sqlalchemy import Column, ForeignKey, TIMESTAMP, Numeric, Text
+from sqlalchemy import Column, ForeignKey, TIMESTAMP, Numeric, Text, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func, text
 from app.core.database import Base
+from app.core.busqueda import indice_trigram
 
+# Particionada por mes sobre fecha_hora (app/servicios/particiones_observaciones.py).
+# Postgres exige que la PK incluya la clave de partición, así que la de la
+# tabla es (id_observacion, fecha_hora); el ORM sigue identificando por
+# id_observacion. Por lo mismo ninguna FK puede apuntar a esta tabla.
 class Observacion(Base):
     __tablename__ = "observaciones"
 
@@ -17,7 +22,7 @@ class Observacion(Base):
     id_admision = Column(UUID(as_uuid=True), ForeignKey("admisiones.id_admision"))
     id_tipo_obs = Column(UUID(as_uuid=True), ForeignKey("tipos_observacion.id_tipo_obs"))
 
-    fecha_hora = Column(TIMESTAMP(timezone=True), nullable=False)
+    fecha_hora = Column(TIMESTAMP(timezone=True), primary_key=True, nullable=False)
 
     valor_numerico = Column(Numeric)
     valor_texto = Column(Text)
@@ -27,3 +32,23 @@ class Observacion(Base):
     id_ocr = Column(UUID(as_uuid=True), ForeignKey("ocr_crudo.id_ocr"))
 
     creado_en = Column(TIMESTAMP(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        # filtros del listado y de las series: paciente/admisión + tipo + rango
+        Index("ix_observaciones_paciente_tipo_fecha", "id_paciente", "id_tipo_obs", "fecha_hora"),
+        Index("ix_observaciones_admision_tipo_fecha", "id_admision", "id_tipo_obs", "fecha_hora"),
+        Index("ix_observaciones_tipo_fecha", "id_tipo_obs", "fecha_hora"),
+        # orden del listado sin filtros (cursor fecha_hora, id)
+        Index("ix_observaciones_fecha", "fecha_hora", "id_observacion"),
+        # marca de agua del rollup horario
+        Index("ix_observaciones_creado_en", "creado_en"),
+        # la mayoría de las observaciones no vienen de un archivo
+        Index("ix_observaciones_archivo", "id_archivo", postgresql_where=text("id_archivo IS NOT NULL")),
+        Index("ix_observaciones_ocr", "id_ocr", postgresql_where=text("id_ocr IS NOT NULL")),
+        # búsquedas por subcadena (ver app/core/busqueda.py)
+        indice_trigram("ix_observaciones_valor_texto_trgm", "valor_texto"),
+        indice_trigram("ix_observaciones_unidad_trgm", "unidad"),
+        {"postgresql_partition_by": "RANGE (fecha_hora)"},
+    )
+
+    __mapper_args__ = {"primary_key": [id_observacion]}
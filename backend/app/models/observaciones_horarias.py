@@ -0,0 +1,39 @@
+# app/models/observaciones_horarias.py
+from sqlalchemy import Column, ForeignKey, Integer, Numeric, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from sqlalchemy.types import TIMESTAMP
+from app.core.database import Base
+
+# Resumen por hora de los valores numéricos de observaciones, por paciente
+# y tipo. Lo mantiene la tarea periódica refrescar_observaciones_horarias
+# (ver app/servicios/agregados_observaciones.py). Guarda la suma y no el
+# promedio para poder combinar horas en baldes más anchos.
+class ObservacionHoraria(Base):
+    __tablename__ = "observaciones_horarias"
+
+    id_paciente = Column(
+        UUID(as_uuid=True),
+        ForeignKey("pacientes.id_paciente", ondelete="CASCADE"),
+        primary_key=True
+    )
+    id_tipo_obs = Column(
+        UUID(as_uuid=True),
+        ForeignKey("tipos_observacion.id_tipo_obs", ondelete="CASCADE"),
+        primary_key=True
+    )
+    hora = Column(TIMESTAMP(timezone=True), primary_key=True)
+
+    minimo = Column(Numeric, nullable=False)
+    maximo = Column(Numeric, nullable=False)
+    suma = Column(Numeric, nullable=False)
+    cantidad = Column(Integer, nullable=False)
+    ultimo_valor = Column(Numeric, nullable=False)
+    ultimo_en = Column(TIMESTAMP(timezone=True), nullable=False)
+
+    actualizado_en = Column(TIMESTAMP(timezone=True), nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        # horas recalculadas recientemente (la marca del refresco está en marcas_refresco)
+        Index("ix_observaciones_horarias_actualizado_en", actualizado_en),
+    )
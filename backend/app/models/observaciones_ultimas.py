@@ -0,0 +1,34 @@
+# app/models/observaciones_ultimas.py
+from sqlalchemy import Column, ForeignKey, Numeric, Text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from sqlalchemy.types import TIMESTAMP
+from app.core.database import Base
+
+# Última observación de cada (paciente, tipo). Proyección mantenida por
+# app/servicios/ultimas_observaciones.py en cada alta, edición y baja;
+# se reconstruye con `python -m app.cli reconstruir-ultimas`.
+class ObservacionUltima(Base):
+    __tablename__ = "observaciones_ultimas"
+
+    id_paciente = Column(
+        UUID(as_uuid=True),
+        ForeignKey("pacientes.id_paciente", ondelete="CASCADE"),
+        primary_key=True
+    )
+    id_tipo_obs = Column(
+        UUID(as_uuid=True),
+        ForeignKey("tipos_observacion.id_tipo_obs", ondelete="CASCADE"),
+        primary_key=True
+    )
+
+    # sin FK: la fila se reescribe cuando se borra la observación
+    id_observacion = Column(UUID(as_uuid=True), nullable=False)
+    id_admision = Column(UUID(as_uuid=True))
+
+    fecha_hora = Column(TIMESTAMP(timezone=True), nullable=False)
+    valor_numerico = Column(Numeric)
+    valor_texto = Column(Text)
+    unidad = Column(Text)
+
+    actualizado_en = Column(TIMESTAMP(timezone=True), nullable=False, server_default=func.now())
@@ -1,9 +1,13 @@
-from sqlalchemy import Column, Integer, Text, JSON, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID, TIMESTAMP
+from sqlalchemy import Column, Integer, Text, JSON, ForeignKey, Computed, Index
+from sqlalchemy.dialects.postgresql import UUID, TIMESTAMP, TSVECTOR
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
 from app.core.database import Base
 import uuid
 
+# configuración de text search usada para indexar y para consultar
+CONFIG_BUSQUEDA = "spanish"
+
 
 class OCRCrudo(Base):
     __tablename__ = "ocr_crudo"
@@ -16,4 +20,17 @@ class OCRCrudo(Base):
     # nombre de la columna sigue siendo "metadata"
     metadata_json = Column("metadata", JSON)
 
-    creado_en = Column(TIMESTAMP(timezone=True), server_default=func.now())
\ No newline at end of file
+    creado_en = Column(TIMESTAMP(timezone=True), server_default=func.now())
+
+    # columna generada: Postgres la recalcula en cada INSERT/UPDATE de texto.
+    # Diferida para que los SELECT del ORM no la traigan.
+    texto_busqueda = deferred(Column(
+        TSVECTOR,
+        Computed(f"to_tsvector('{CONFIG_BUSQUEDA}'::regconfig, coalesce(texto, ''))", persisted=True)
+    ))
+
+    __table_args__ = (
+        Index("ix_ocr_crudo_archivo_pagina", "id_archivo", "pagina"),
+        Index("ix_ocr_crudo_creado_en", "creado_en", "id_ocr"),
+        Index("ix_ocr_crudo_texto_busqueda", texto_busqueda, postgresql_using="gin"),
+    )
@@ -1,10 +1,11 @@
 # app/models/pacientes.py
-from sqlalchemy import Column, Text, Date, TIMESTAMP
+from sqlalchemy import Column, Text, Date, TIMESTAMP, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 import uuid
 
 from app.core.database import Base
+from app.core.busqueda import indice_trigram
 
 class Paciente(Base):
     __tablename__ = "pacientes"
@@ -19,3 +20,18 @@ class Paciente(Base):
     
     # 🔥 NUEVO CAMPO PARA BAJA LÓGICA
     estado = Column(Text, nullable=False, server_default="activo")
+
+    __table_args__ = (
+        # orden de los listados (cursor creado_en, id); /activos usa el parcial
+        Index("ix_pacientes_creado_en", "creado_en", "id_paciente"),
+        Index(
+            "ix_pacientes_activos_creado_en",
+            "creado_en", "id_paciente",
+            postgresql_where=text("estado = 'activo'")
+        ),
+        Index("ix_pacientes_id_externo", "id_externo"),
+        # búsquedas por subcadena (ver app/core/busqueda.py)
+        indice_trigram("ix_pacientes_nombre_trgm", "nombre"),
+        indice_trigram("ix_pacientes_apellido_trgm", "apellido"),
+        indice_trigram("ix_pacientes_nombre_apellido_trgm", "(nombre || ' ' || apellido)"),
+    )
@@ -0,0 +1,32 @@
+# app/models/predicciones_admision.py
+from sqlalchemy import Column, ForeignKey, BigInteger, Integer, Float, Text, Index
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.sql import func
+from sqlalchemy.types import TIMESTAMP
+from app.core.database import Base
+
+# Sugerencia de especialidad vigente por admisión, escrita por el trabajo
+# de puntuación en lote (app/servicios/puntuacion_admisiones.py).
+# hash_caracteristicas resume las características con que se calculó: si
+# no cambiaron (y el modelo tampoco) la admisión no se vuelve a puntuar.
+class PrediccionAdmision(Base):
+    __tablename__ = "predicciones_admision"
+
+    id_admision = Column(
+        UUID(as_uuid=True),
+        ForeignKey("admisiones.id_admision", ondelete="CASCADE"),
+        primary_key=True
+    )
+
+    version_modelo = Column(Integer, nullable=False)
+    especialidad = Column(Text, nullable=False)
+    probabilidad = Column(Float, nullable=False)
+    probabilidades = Column(JSONB, nullable=False)
+
+    hash_caracteristicas = Column(BigInteger, nullable=False)
+    calculado_hasta = Column(TIMESTAMP(timezone=True), nullable=False)
+    actualizado_en = Column(TIMESTAMP(timezone=True), nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_predicciones_admision_especialidad", "especialidad", "probabilidad"),
+    )
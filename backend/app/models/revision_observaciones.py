@@ -1,8 +1,9 @@
 # app/models/revision_observaciones.py
-from sqlalchemy import Column, ForeignKey, Text, TIMESTAMP
+from sqlalchemy import Column, ForeignKey, ForeignKeyConstraint, Text, TIMESTAMP, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func, text
 from app.core.database import Base
+from app.core.busqueda import indice_trigram
 
 class RevisionObservacion(Base):
     __tablename__ = "revision_observaciones"
@@ -13,7 +14,10 @@ class RevisionObservacion(Base):
         server_default=text("gen_random_uuid()")
     )
 
-    id_observacion = Column(UUID(as_uuid=True), ForeignKey("observaciones.id_observacion"))
+    # observaciones está particionada: la FK apunta a su PK completa
+    # (id_observacion, fecha_hora)
+    id_observacion = Column(UUID(as_uuid=True))
+    fecha_hora = Column(TIMESTAMP(timezone=True))
     id_usuario_revisor = Column(UUID(as_uuid=True), ForeignKey("usuarios.id_usuario"))
 
     estado_revision = Column(
@@ -23,3 +27,21 @@ class RevisionObservacion(Base):
 
     comentarios = Column(Text)
     revisado_en = Column(TIMESTAMP(timezone=True))
+
+    __table_args__ = (
+        # ON UPDATE CASCADE: corregir la fecha_hora de la observación la
+        # mueve de partición y la revisión la sigue. Diferible para que
+        # crear_particion pueda pasar filas de default al mes nuevo.
+        ForeignKeyConstraint(
+            ["id_observacion", "fecha_hora"],
+            ["observaciones.id_observacion", "observaciones.fecha_hora"],
+            name="revision_observaciones_observacion_fkey",
+            onupdate="CASCADE",
+            deferrable=True,
+            initially="IMMEDIATE"
+        ),
+        Index("ix_revision_observaciones_observacion", "id_observacion"),
+        Index("ix_revision_observaciones_revisor", "id_usuario_revisor"),
+        # búsquedas por subcadena (ver app/core/busqueda.py)
+        indice_trigram("ix_revision_observaciones_comentarios_trgm", "comentarios"),
+    )
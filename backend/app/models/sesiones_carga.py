@@ -0,0 +1,26 @@
+# app/models/sesiones_carga.py
+from sqlalchemy import Column, Text, BigInteger, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from sqlalchemy.types import TIMESTAMP
+from app.core.database import Base
+import uuid
+
+# Subida reanudable: los bytes se acumulan en uploads/tmp/sesiones/<id>.part
+# hasta que se finaliza y se crea el Archivo
+class SesionCarga(Base):
+    __tablename__ = "sesiones_carga"
+
+    id_sesion = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    nombre_archivo = Column(Text, nullable=False)
+    tipo_archivo = Column(Text, nullable=False)
+    tamaño_total = Column(BigInteger, nullable=False)
+    offset_confirmado = Column(BigInteger, nullable=False, server_default="0")
+    subido_por = Column(UUID(as_uuid=True), ForeignKey("usuarios.id_usuario"))
+    creado_en = Column(TIMESTAMP(timezone=True), server_default=func.now())
+    expira_en = Column(TIMESTAMP(timezone=True), nullable=False)
+
+    # barrido de expiradas
+    __table_args__ = (
+        Index("ix_sesiones_carga_expira_en", "expira_en"),
+    )
@@ -1,5 +1,5 @@
 # app/models/tipos_observaciones.py
-from sqlalchemy import Column, Text, TIMESTAMP
+from sqlalchemy import Column, Text, TIMESTAMP, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from uuid import uuid4
@@ -23,3 +23,7 @@ class TipoObservacion(Base):
     )
 
     estado = Column(Text, nullable=False, server_default="activo")
+
+    __table_args__ = (
+        Index("ix_tipos_observacion_codigo", "codigo"),
+    )
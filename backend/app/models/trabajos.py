@@ -0,0 +1,45 @@
+# app/models/trabajos.py
+from sqlalchemy import Column, BigInteger, Integer, Text, JSON, TIMESTAMP, Index, text
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+# Cola durable de trabajos en segundo plano (ver app/servicios/cola_trabajos.py)
+# estado: pendiente / en_proceso / completado / muerto
+class Trabajo(Base):
+    __tablename__ = "trabajos"
+
+    id_trabajo = Column(BigInteger, primary_key=True, autoincrement=True)
+    tipo = Column(Text, nullable=False)
+    payload = Column(JSON, nullable=False, server_default=text("'{}'"))
+    prioridad = Column(Integer, nullable=False, server_default="0")
+
+    estado = Column(Text, nullable=False, server_default="pendiente")
+    intentos = Column(Integer, nullable=False, server_default="0")
+    max_intentos = Column(Integer, nullable=False, server_default="5")
+
+    # evita encolar dos veces lo mismo (p. ej. una tarea periódica por intervalo)
+    clave_unica = Column(Text, nullable=True, unique=True)
+
+    disponible_en = Column(TIMESTAMP(timezone=True), nullable=False, server_default=func.now())
+    bloqueado_hasta = Column(TIMESTAMP(timezone=True))
+    bloqueado_por = Column(Text)
+
+    ultimo_error = Column(Text)
+    resultado = Column(JSON)
+
+    creado_en = Column(TIMESTAMP(timezone=True), server_default=func.now())
+    terminado_en = Column(TIMESTAMP(timezone=True))
+
+    __table_args__ = (
+        # lo que recorre el SELECT ... FOR UPDATE SKIP LOCKED al reclamar
+        Index(
+            "ix_trabajos_pendientes",
+            prioridad.desc(), disponible_en,
+            postgresql_where=text("estado = 'pendiente'")
+        ),
+        Index(
+            "ix_trabajos_en_proceso",
+            bloqueado_hasta,
+            postgresql_where=text("estado = 'en_proceso'")
+        ),
+    )
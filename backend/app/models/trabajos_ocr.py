@@ -0,0 +1,38 @@
+# app/models/trabajos_ocr.py
+from sqlalchemy import Column, Text, Integer, ForeignKey, TIMESTAMP, Index, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+# Estado del OCR de cada archivo: pendiente / procesando / completado / error.
+# token_reclamo identifica el reclamo vigente: solo ese worker puede
+# completar el trabajo. latido_en lo renueva mientras sigue procesando.
+class TrabajoOCR(Base):
+    __tablename__ = "trabajos_ocr"
+
+    id_archivo = Column(
+        UUID(as_uuid=True),
+        ForeignKey("archivos.id_archivo", ondelete="CASCADE"),
+        primary_key=True
+    )
+
+    estado = Column(Text, nullable=False, server_default="pendiente")
+    motor = Column(Text)
+    paginas = Column(Integer)
+    intentos = Column(Integer, nullable=False, server_default="0")
+    error = Column(Text)
+    token_reclamo = Column(UUID(as_uuid=True))
+
+    creado_en = Column(TIMESTAMP(timezone=True), server_default=func.now())
+    iniciado_en = Column(TIMESTAMP(timezone=True))
+    terminado_en = Column(TIMESTAMP(timezone=True))
+    latido_en = Column(TIMESTAMP(timezone=True))
+
+    # lo que recorre reclamar_trabajos
+    __table_args__ = (
+        Index(
+            "ix_trabajos_ocr_pendientes",
+            "creado_en",
+            postgresql_where=text("estado IN ('pendiente', 'procesando')")
+        ),
+    )
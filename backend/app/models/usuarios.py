@@ -4,6 +4,7 @@ from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy import String, text
 import uuid
 from app.core.database import Base
+from app.core.busqueda import indice_trigram
 
 class Usuario(Base):
     __tablename__ = "usuarios"
@@ -27,3 +28,9 @@ class Usuario(Base):
 
     # RELACIÓN
     roles = relationship("UsuariosRoles", back_populates="usuario", cascade="all, delete-orphan")
+
+    # búsquedas por subcadena (ver app/core/busqueda.py)
+    __table_args__ = (
+        indice_trigram("ix_usuarios_nombre_completo_trgm", "nombre_completo"),
+        indice_trigram("ix_usuarios_correo_electronico_trgm", "correo_electronico"),
+    )
@@ -1,5 +1,5 @@
 # app/models/usuarios_roles.py
-from sqlalchemy import Column, ForeignKey, Integer
+from sqlalchemy import Column, ForeignKey, Integer, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -12,3 +12,8 @@ class UsuariosRoles(Base):
 
     usuario = relationship("Usuario", back_populates="roles")
     rol = relationship("Rol", back_populates="usuarios")
+
+    # la PK (id_usuario, id_rol) no sirve para buscar por rol
+    __table_args__ = (
+        Index("ix_usuarios_roles_rol", "id_rol"),
+    )
@@ -6,7 +6,11 @@ from uuid import UUID
 from datetime import datetime
 
 from app.core.database import get_db
+from app.core.busqueda import filtro_contiene
+from app.core.paginacion import ParametrosPagina, paginar, armar_pagina
+from app.core.exportacion import formato_respuesta, respuesta_streaming, RESPUESTAS_EXPORTACION
 from app.models.admisiones import Admision
+from app.schemas.paginacion import Pagina
 from app.schemas.admisiones import (
     AdmisionRead,
     AdmisionCreate,
@@ -19,7 +23,7 @@ router = APIRouter(prefix="/admisiones", tags=["Admisiones"])
 # --------------------------------------------------
 # LISTAR + FILTROS
 # --------------------------------------------------
-@router.get("/", response_model=list[AdmisionRead])
+@router.get("/", response_model=Pagina[AdmisionRead], responses=RESPUESTAS_EXPORTACION)
 async def listar_admisiones(
     id_paciente: UUID | None = None,
     diagnostico_principal: str | None = None,
@@ -30,6 +34,8 @@ async def listar_admisiones(
     fecha_salida_fin: datetime | None = Query(None),
     creado_inicio: datetime | None = Query(None),
     creado_fin: datetime | None = Query(None),
+    formato: str = Depends(formato_respuesta),
+    pag: ParametrosPagina = Depends(),
     db: AsyncSession = Depends(get_db)
 ):
     stmt = select(Admision)
@@ -56,7 +62,7 @@ async def listar_admisiones(
         filtros.append(Admision.id_paciente == id_paciente)
 
     if diagnostico_principal:
-        filtros.append(Admision.diagnostico_principal.ilike(f"%{diagnostico_principal}%"))
+        filtros.append(filtro_contiene(Admision.diagnostico_principal, diagnostico_principal))
 
     if estado:
         filtros.append(Admision.estado == estado)
@@ -73,8 +79,12 @@ async def listar_admisiones(
     if filtros:
         stmt = stmt.where(and_(*filtros))
 
-    result = await db.execute(stmt)
-    return result.scalars().all()
+    orden = (Admision.creado_en, Admision.id_admision)
+    if formato != "json":
+        return respuesta_streaming(stmt, AdmisionRead, formato, "admisiones", *orden)
+
+    result = await db.execute(paginar(stmt, pag, *orden))
+    return armar_pagina(result.scalars().all(), pag, *orden)
 
 
 # --------------------------------------------------
@@ -1,47 +1,73 @@
 # app/routers/archivos.py
+import asyncio
 import os
 import uuid
+import zipfile
 from datetime import datetime
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Query
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, insert
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.busqueda import filtro_contiene
+from app.core.paginacion import ParametrosPagina, paginar, armar_pagina
+from app.core.exportacion import formato_respuesta, respuesta_streaming, RESPUESTAS_EXPORTACION
+from app.core.almacenamiento import (
+    RutaCuerpoLimitado,
+    limitar_cuerpo,
+    extension_permitida,
+    hashear_archivo,
+    copiar_y_hashear,
+    escribir_contenido,
+    ruta_contenido,
+    ruta_temporal,
+    sumar_referencias,
+    almacenar_contenido,
+    liberar_contenido,
+    eliminar_silencioso
+)
+from app.core.descargas import (
+    RespuestaArchivo,
+    content_disposition,
+    http_date,
+    media_type_de,
+    no_modificado,
+    parsear_rango,
+    rango_aplicable
+)
+from starlette.concurrency import run_in_threadpool
 from app.models.archivos import Archivo
-from app.schemas.archivos import ArchivoRead, ArchivoUpdate
-from fastapi.responses import FileResponse
+from app.schemas.archivos import ArchivoRead, ArchivoUpdate, ResultadoCargaLote
+from app.schemas.paginacion import Pagina
 
-router = APIRouter(prefix="/archivos", tags=["Archivos"])
+router = APIRouter(prefix="/archivos", tags=["Archivos"], route_class=RutaCuerpoLimitado)
 
-UPLOAD_DIR = "uploads"
+UPLOAD_DIR = settings.UPLOAD_DIR
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 
 # ---------------------------
 #   SUBIR ARCHIVO
+#   El máximo se controla antes de parsear el multipart (413 por
+#   Content-Length o en cuanto el stream lo supera).
 #   Nota: por ahora aceptamos subido_por opcional; para hacerlo automático
 #   hay que extraer el usuario con una dependencia de autenticación.
 # ---------------------------
 @router.post("/upload", response_model=ArchivoRead)
+@limitar_cuerpo(settings.UPLOAD_MAX_BYTES)
 async def subir_archivo(
     archivo: UploadFile = File(...),
     subido_por: str | None = None,
     db: AsyncSession = Depends(get_db)
 ):
-    ext = archivo.filename.split(".")[-1].lower()
-    if ext == "jpeg":
-        ext = "jpg"
-    if ext not in ("pdf", "jpg", "png"):
-        raise HTTPException(400, "Tipo de archivo no permitido (solo pdf,jpg,png)")
+    ext = extension_permitida(archivo.filename)
 
     file_uuid = uuid.uuid4()
-    internal_name = f"{file_uuid}.{ext}"
-    save_path = os.path.join(UPLOAD_DIR, internal_name)
 
-    content = await archivo.read()
-    with open(save_path, "wb") as f:
-        f.write(content)
-
-    tamaño = os.path.getsize(save_path)
+    # se hashea el temporal del multipart y solo se copia al store si el
+    # contenido es nuevo: un duplicado no escribe a disco
+    tamaño, sha256 = await run_in_threadpool(hashear_archivo, archivo.file)
+    save_path = await almacenar_contenido(db, archivo.file, tamaño, sha256)
 
     nuevo = Archivo(
         id_archivo=file_uuid,
@@ -49,6 +75,7 @@ async def subir_archivo(
         ruta_almacenamiento=save_path,
         tipo_archivo=ext,
         tamaño_bytes=tamaño,
+        hash_sha256=sha256,
         subido_por=(subido_por or None)
     )
 
@@ -60,10 +87,151 @@ async def subir_archivo(
 
 
 
+# ---------------------------
+#   SUBIR EN LOTE (varios archivos y/o ZIPs)
+#   Cada archivo se valida y hashea en paralelo (acotado por
+#   UPLOAD_LOTE_CONCURRENCIA); los que fallan se informan sin afectar al
+#   resto. Todos los Archivo válidos entran en un único INSERT multi-fila
+#   y un único commit. Cada archivo tiene el máximo de /upload y el cuerpo
+#   entero, el de UPLOAD_LOTE_MAX_ARCHIVOS archivos.
+# ---------------------------
+def _extraer_miembro(zf: zipfile.ZipFile, info: zipfile.ZipInfo, destino: str) -> tuple[int, str]:
+    with zf.open(info) as miembro:
+        return copiar_y_hashear(miembro, destino)
+
+
+@router.post("/upload-lote", response_model=list[ResultadoCargaLote])
+@limitar_cuerpo(settings.UPLOAD_MAX_BYTES * settings.UPLOAD_LOTE_MAX_ARCHIVOS)
+async def subir_archivos_lote(
+    archivos: list[UploadFile] = File(...),
+    subido_por: str | None = None,
+    db: AsyncSession = Depends(get_db)
+):
+    # ---------------- EXPANDIR ZIPs ----------------
+    entradas = []
+    zips = []
+    for archivo in archivos:
+        if not archivo.filename.lower().endswith(".zip"):
+            entradas.append({"nombre": archivo.filename, "upload": archivo})
+            continue
+
+        try:
+            zf = await run_in_threadpool(zipfile.ZipFile, archivo.file)
+        except zipfile.BadZipFile:
+            entradas.append({"nombre": archivo.filename, "error": "ZIP inválido"})
+            continue
+
+        zips.append(zf)
+        for info in zf.infolist():
+            if not info.is_dir():
+                nombre = os.path.basename(info.filename)
+                entradas.append({"nombre": nombre, "zip": zf, "info": info})
+
+    if len(entradas) > settings.UPLOAD_LOTE_MAX_ARCHIVOS:
+        raise HTTPException(
+            400, f"Máximo {settings.UPLOAD_LOTE_MAX_ARCHIVOS} archivos por lote"
+        )
+
+    semaforo = asyncio.Semaphore(settings.UPLOAD_LOTE_CONCURRENCIA)
+
+    async def preparar(entrada):
+        if "error" in entrada:
+            return
+        async with semaforo:
+            try:
+                entrada["ext"] = extension_permitida(entrada["nombre"])
+
+                if "upload" in entrada:
+                    entrada["tamaño"], entrada["sha256"] = await run_in_threadpool(
+                        hashear_archivo, entrada["upload"].file, settings.UPLOAD_MAX_BYTES
+                    )
+                else:
+                    # el miembro se descomprime al vuelo a un temporal
+                    info = entrada["info"]
+                    if info.file_size > settings.UPLOAD_MAX_BYTES:
+                        raise HTTPException(
+                            413, f"El archivo supera el máximo permitido ({settings.UPLOAD_MAX_BYTES} bytes)"
+                        )
+                    entrada["temporal"] = ruta_temporal()
+                    entrada["tamaño"], entrada["sha256"] = await run_in_threadpool(
+                        _extraer_miembro, entrada["zip"], info, entrada["temporal"]
+                    )
+            except HTTPException as e:
+                entrada["error"] = e.detail
+            except (zipfile.BadZipFile, RuntimeError, OSError) as e:
+                entrada["error"] = str(e)
+
+    try:
+        await asyncio.gather(*(preparar(e) for e in entradas))
+        validas = [e for e in entradas if "error" not in e]
+
+        # ---------------- REFERENCIAS (un upsert) ----------------
+        conteos = {}
+        primera_por_hash = {}
+        for e in validas:
+            tamaño, n = conteos.get(e["sha256"], (e["tamaño"], 0))
+            conteos[e["sha256"]] = (tamaño, n + 1)
+            primera_por_hash.setdefault(e["sha256"], e)
+
+        nuevos = await sumar_referencias(db, conteos)
+
+        # ---------------- ESCRIBIR BLOBS NUEVOS ----------------
+        async def escribir(sha256, entrada):
+            destino = ruta_contenido(sha256)
+            async with semaforo:
+                if not nuevos[sha256] and await run_in_threadpool(os.path.exists, destino):
+                    return
+                if "temporal" in entrada:
+                    await escribir_contenido(db, destino, mover_desde=entrada["temporal"])
+                else:
+                    await escribir_contenido(db, destino, entrada["upload"].file)
+
+        await asyncio.gather(*(escribir(h, e) for h, e in primera_por_hash.items()))
+
+        # ---------------- INSERT MULTI-FILA ----------------
+        creados = {}
+        if validas:
+            filas = []
+            for e in validas:
+                e["id_archivo"] = uuid.uuid4()
+                filas.append({
+                    "id_archivo": e["id_archivo"],
+                    "nombre_archivo": e["nombre"],
+                    "ruta_almacenamiento": ruta_contenido(e["sha256"]),
+                    "tipo_archivo": e["ext"],
+                    "tamaño_bytes": e["tamaño"],
+                    "hash_sha256": e["sha256"],
+                    "subido_por": subido_por or None,
+                })
+
+            result = await db.scalars(insert(Archivo).values(filas).returning(Archivo))
+            creados = {a.id_archivo: a for a in result.all()}
+
+        await db.commit()
+    finally:
+        for e in entradas:
+            if "temporal" in e:
+                await run_in_threadpool(eliminar_silencioso, e["temporal"])
+        for zf in zips:
+            zf.close()
+
+    return [
+        ResultadoCargaLote(
+            nombre_archivo=e["nombre"],
+            ok=True,
+            archivo=ArchivoRead.model_validate(creados[e["id_archivo"]])
+        )
+        if "error" not in e else
+        ResultadoCargaLote(nombre_archivo=e["nombre"], ok=False, error=e["error"])
+        for e in entradas
+    ]
+
+
+
 # ---------------------------
 #   LISTAR ARCHIVOS (con filtros incluyendo rango de fecha)
 # ---------------------------
-@router.get("/", response_model=list[ArchivoRead])
+@router.get("/", response_model=Pagina[ArchivoRead], responses=RESPUESTAS_EXPORTACION)
 async def listar_archivos(
     nombre_archivo: str | None = Query(None),
     tipo_archivo: str | None = Query(None),
@@ -71,6 +239,8 @@ async def listar_archivos(
     estado: str | None = Query(None),
     subido_en_inicio: datetime | None = Query(None, description="Fecha/hora inicio (ISO)"),
     subido_en_fin: datetime | None = Query(None, description="Fecha/hora fin (ISO)"),
+    formato: str = Depends(formato_respuesta),
+    pag: ParametrosPagina = Depends(),
     db: AsyncSession = Depends(get_db)
 ):
     # construir consulta dinámica
@@ -78,7 +248,7 @@ async def listar_archivos(
     conditions = []
 
     if nombre_archivo:
-        conditions.append(Archivo.nombre_archivo.ilike(f"%{nombre_archivo}%"))
+        conditions.append(filtro_contiene(Archivo.nombre_archivo, nombre_archivo))
     if tipo_archivo:
         conditions.append(Archivo.tipo_archivo == tipo_archivo)
     if subido_por:
@@ -99,10 +269,14 @@ async def listar_archivos(
     if conditions:
         query = query.where(and_(*conditions))
 
-    q = await db.execute(query)
+    orden = (Archivo.subido_en, Archivo.id_archivo)
+    if formato != "json":
+        return respuesta_streaming(query, ArchivoRead, formato, "archivos", *orden)
+
+    q = await db.execute(paginar(query, pag, *orden))
     rows = q.scalars().all()
 
-    return [ArchivoRead.model_validate(r) for r in rows]
+    return armar_pagina(rows, pag, *orden)
 
 
 
@@ -126,8 +300,13 @@ async def obtener_archivo(id_archivo: str, db: AsyncSession = Depends(get_db)):
 # ---------------------------
 #   DESCARGAR ARCHIVO
 # ---------------------------
-@router.get("/download/{id_archivo}")
-async def descargar_archivo(id_archivo: str, db: AsyncSession = Depends(get_db)):
+@router.api_route("/download/{id_archivo}", methods=["GET", "HEAD"])
+async def descargar_archivo(
+    id_archivo: str,
+    request: Request,
+    disposicion: str = Query("attachment", pattern="^(attachment|inline)$"),
+    db: AsyncSession = Depends(get_db)
+):
     q = await db.execute(
         select(Archivo).where(Archivo.id_archivo == id_archivo)
     )
@@ -136,13 +315,46 @@ async def descargar_archivo(id_archivo: str, db: AsyncSession = Depends(get_db))
     if not obj:
         raise HTTPException(404, "Archivo no encontrado")
 
-    if not os.path.exists(obj.ruta_almacenamiento):
+    try:
+        st = await run_in_threadpool(os.stat, obj.ruta_almacenamiento)
+    except FileNotFoundError:
         raise HTTPException(500, "El archivo no existe en el servidor")
 
-    return FileResponse(
-        path=obj.ruta_almacenamiento,
-        media_type="application/octet-stream",
-        filename=obj.nombre_archivo
+    # ETag fuerte = hash del contenido; los archivos previos al store
+    # (sin hash) usan uno débil de tamaño + mtime
+    if obj.hash_sha256:
+        etag = f'"{obj.hash_sha256}"'
+    else:
+        etag = f'W/"{st.st_size:x}-{int(st.st_mtime):x}"'
+    ultima_modificacion = obj.subido_en
+
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "private, max-age=86400",
+    }
+    if ultima_modificacion:
+        headers["Last-Modified"] = http_date(ultima_modificacion)
+
+    if no_modificado(request.headers, etag, ultima_modificacion):
+        return Response(status_code=304, headers=headers)
+
+    headers["Content-Disposition"] = content_disposition(obj.nombre_archivo, disposicion)
+
+    rango = None
+    if rango_aplicable(request.headers, etag, ultima_modificacion):
+        rango = parsear_rango(request.headers.get("range"), st.st_size)
+
+    if rango:
+        headers["Content-Range"] = f"bytes {rango[0]}-{rango[1]}/{st.st_size}"
+
+    return RespuestaArchivo(
+        ruta=obj.ruta_almacenamiento,
+        tamaño=st.st_size,
+        status_code=206 if rango else 200,
+        headers=headers,
+        media_type=media_type_de(obj.tipo_archivo, obj.nombre_archivo),
+        rango=rango
     )
 
 
@@ -243,12 +455,16 @@ async def eliminar_archivo(id_archivo: str, db: AsyncSession = Depends(get_db)):
     if not obj:
         raise HTTPException(404, "Archivo no encontrado")
 
-    try:
-        os.remove(obj.ruta_almacenamiento)
-    except FileNotFoundError:
-        pass
-
     await db.delete(obj)
+    await db.flush()
+
+    # el blob sin referencias lo borra el barrido del store; los archivos
+    # previos al store se borran directo, recién confirmada la baja
+    legado = not obj.hash_sha256 or not await liberar_contenido(db, obj.hash_sha256)
+
     await db.commit()
 
+    if legado:
+        await run_in_threadpool(eliminar_silencioso, obj.ruta_almacenamiento)
+
     return {"mensaje": "Archivo eliminado"}
@@ -0,0 +1,288 @@
+# app/routers/cargas_archivos.py
+import fcntl
+import logging
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import select, delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import ClientDisconnect
+
+from app.core.config import settings
+from app.core.database import get_db, SessionLocal
+from app.core.almacenamiento import (
+    DIR_TEMPORAL,
+    extension_permitida,
+    hashear_archivo,
+    almacenar_contenido,
+    eliminar_silencioso
+)
+from app.models.archivos import Archivo
+from app.models.sesiones_carga import SesionCarga
+from app.schemas.archivos import ArchivoRead
+from app.schemas.sesiones_carga import SesionCargaCreate, SesionCargaRead
+
+logger = logging.getLogger("uvicorn.error")
+
+router = APIRouter(prefix="/archivos/cargas", tags=["Archivos"])
+
+DIR_SESIONES = os.path.join(DIR_TEMPORAL, "sesiones")
+
+
+def ruta_sesion(id_sesion: UUID) -> str:
+    return os.path.join(DIR_SESIONES, f"{id_sesion}.part")
+
+
+def _nueva_expiracion() -> datetime:
+    return datetime.now(timezone.utc) + timedelta(minutes=settings.UPLOAD_SESION_TTL_MINUTOS)
+
+
+def _abrir_en_offset(ruta: str, offset: int):
+    """Abre el .part con lock exclusivo (flock) y lo corta en `offset`;
+    None si otra petición ya está escribiendo esta sesión."""
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    f = open(ruta, "r+b" if os.path.exists(ruta) else "w+b")
+    try:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        f.close()
+        return None
+    # todo lo que haya más allá del offset confirmado es de un bloque que
+    # no llegó a confirmarse: se descarta
+    f.seek(offset)
+    f.truncate()
+    return f
+
+
+def _offset_invalido(confirmado: int) -> HTTPException:
+    return HTTPException(
+        status_code=409,
+        detail=f"Offset inválido: el servidor tiene {confirmado} bytes confirmados",
+        headers={"Upload-Offset": str(confirmado)}
+    )
+
+
+def _sincronizar(f):
+    f.flush()
+    os.fsync(f.fileno())
+
+
+async def _sesion_bloqueada(db: AsyncSession, id_sesion: UUID, bloquear: bool = True) -> SesionCarga:
+    stmt = select(SesionCarga).where(SesionCarga.id_sesion == id_sesion)
+    if bloquear:
+        stmt = stmt.with_for_update()
+    sesion = (await db.execute(stmt)).scalar_one_or_none()
+
+    if not sesion:
+        raise HTTPException(404, "Sesión de carga no encontrada")
+
+    if sesion.expira_en < datetime.now(timezone.utc):
+        raise HTTPException(410, "La sesión de carga expiró")
+
+    return sesion
+
+
+# ---------------------------
+#   CREAR SESIÓN
+# ---------------------------
+@router.post("/", response_model=SesionCargaRead, status_code=201)
+async def crear_sesion_carga(data: SesionCargaCreate, db: AsyncSession = Depends(get_db)):
+    ext = extension_permitida(data.nombre_archivo)
+
+    if data.tamaño_total > settings.UPLOAD_MAX_BYTES:
+        raise HTTPException(
+            413, f"El archivo supera el máximo permitido ({settings.UPLOAD_MAX_BYTES} bytes)"
+        )
+
+    sesion = SesionCarga(
+        nombre_archivo=data.nombre_archivo,
+        tipo_archivo=ext,
+        tamaño_total=data.tamaño_total,
+        subido_por=data.subido_por,
+        expira_en=_nueva_expiracion()
+    )
+    db.add(sesion)
+    await db.commit()
+    await db.refresh(sesion)
+
+    return sesion
+
+
+# ---------------------------
+#   CONSULTAR OFFSET CONFIRMADO
+# ---------------------------
+@router.get("/{id_sesion}", response_model=SesionCargaRead)
+async def obtener_sesion_carga(id_sesion: UUID, db: AsyncSession = Depends(get_db)):
+    sesion = await db.get(SesionCarga, id_sesion)
+
+    if not sesion:
+        raise HTTPException(404, "Sesión de carga no encontrada")
+
+    return sesion
+
+
+# ---------------------------
+#   SUBIR BLOQUE
+#   El cuerpo crudo de la petición se escribe a partir de `offset`, que
+#   tiene que coincidir con lo ya confirmado. Si el cliente se corta a
+#   mitad, se confirma lo que llegó y puede retomar desde ahí.
+#   Mientras llega el cuerpo no se retiene conexión ni lock de la base:
+#   el .part se protege con flock y la fila de la sesión se bloquea solo
+#   al final, para confirmar el offset.
+# ---------------------------
+@router.put("/{id_sesion}", response_model=SesionCargaRead)
+async def subir_bloque(
+    id_sesion: UUID,
+    request: Request,
+    offset: int = Query(..., ge=0),
+    db: AsyncSession = Depends(get_db)
+):
+    sesion = await _sesion_bloqueada(db, id_sesion, bloquear=False)
+    tamaño_total = sesion.tamaño_total
+    if offset != sesion.offset_confirmado:
+        raise _offset_invalido(sesion.offset_confirmado)
+    # devuelve la conexión al pool durante la transferencia
+    await db.rollback()
+
+    f = await run_in_threadpool(_abrir_en_offset, ruta_sesion(id_sesion), offset)
+    if f is None:
+        raise HTTPException(409, "Hay otro bloque de esta sesión en curso")
+
+    recibidos = 0
+    buffer = bytearray()
+    try:
+        try:
+            async for bloque in request.stream():
+                if offset + recibidos + len(buffer) + len(bloque) > tamaño_total:
+                    raise HTTPException(413, "El bloque excede el tamaño total declarado")
+
+                buffer += bloque
+                if len(buffer) >= settings.UPLOAD_CHUNK_BYTES:
+                    await run_in_threadpool(f.write, buffer)
+                    recibidos += len(buffer)
+                    buffer = bytearray()
+        except ClientDisconnect:
+            pass
+
+        if buffer:
+            await run_in_threadpool(f.write, buffer)
+            recibidos += len(buffer)
+        await run_in_threadpool(_sincronizar, f)
+
+        # el flock sigue tomado: nadie escribió el .part mientras tanto
+        sesion = await _sesion_bloqueada(db, id_sesion)
+        if offset != sesion.offset_confirmado:
+            raise _offset_invalido(sesion.offset_confirmado)
+
+        sesion.offset_confirmado = offset + recibidos
+        sesion.expira_en = _nueva_expiracion()
+        await db.commit()
+    finally:
+        await run_in_threadpool(f.close)  # libera el flock
+
+    await db.refresh(sesion)
+    return sesion
+
+
+# ---------------------------
+#   FINALIZAR (crea el Archivo)
+# ---------------------------
+@router.post("/{id_sesion}/finalizar", response_model=ArchivoRead)
+async def finalizar_sesion_carga(id_sesion: UUID, db: AsyncSession = Depends(get_db)):
+    sesion = await _sesion_bloqueada(db, id_sesion)
+
+    if sesion.offset_confirmado != sesion.tamaño_total:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Carga incompleta: {sesion.offset_confirmado} de {sesion.tamaño_total} bytes",
+            headers={"Upload-Offset": str(sesion.offset_confirmado)}
+        )
+
+    ruta = ruta_sesion(id_sesion)
+    f = await run_in_threadpool(open, ruta, "rb")
+    try:
+        tamaño, sha256 = await run_in_threadpool(hashear_archivo, f)
+        # el .part ya está en el mismo disco: si el blob es nuevo se renombra
+        save_path = await almacenar_contenido(db, f, tamaño, sha256, mover_desde=ruta)
+    finally:
+        await run_in_threadpool(f.close)
+
+    nuevo = Archivo(
+        nombre_archivo=sesion.nombre_archivo,
+        ruta_almacenamiento=save_path,
+        tipo_archivo=sesion.tipo_archivo,
+        tamaño_bytes=tamaño,
+        hash_sha256=sha256,
+        subido_por=sesion.subido_por
+    )
+    db.add(nuevo)
+    await db.delete(sesion)
+    await db.commit()
+    await db.refresh(nuevo)
+
+    # duplicado: el .part no se movió al store
+    await run_in_threadpool(eliminar_silencioso, ruta)
+
+    return ArchivoRead.model_validate(nuevo)
+
+
+# ---------------------------
+#   CANCELAR
+# ---------------------------
+@router.delete("/{id_sesion}")
+async def cancelar_sesion_carga(id_sesion: UUID, db: AsyncSession = Depends(get_db)):
+    sesion = await db.get(SesionCarga, id_sesion)
+
+    if not sesion:
+        raise HTTPException(404, "Sesión de carga no encontrada")
+
+    await db.delete(sesion)
+    await db.commit()
+    await run_in_threadpool(eliminar_silencioso, ruta_sesion(id_sesion))
+
+    return {"mensaje": "Sesión de carga cancelada"}
+
+
+# ---------------------------
+#   BARRIDO DE EXPIRADAS
+#   Lo corre la tarea periódica barrer_sesiones_carga de la cola
+#   (app/servicios/tareas.py); es idempotente.
+# ---------------------------
+def _barrer_temporales_viejos(antiguedad_segundos: float) -> int:
+    # temporales huérfanos (cargas abortadas, copias interrumpidas)
+    limite = time.time() - antiguedad_segundos
+    borrados = 0
+    for raiz, _, nombres in os.walk(DIR_TEMPORAL):
+        for nombre in nombres:
+            ruta = os.path.join(raiz, nombre)
+            try:
+                if os.stat(ruta).st_mtime < limite:
+                    os.remove(ruta)
+                    borrados += 1
+            except FileNotFoundError:
+                pass
+    return borrados
+
+
+async def barrer_sesiones_expiradas() -> int:
+    async with SessionLocal() as db:
+        result = await db.execute(
+            delete(SesionCarga)
+            .where(SesionCarga.expira_en < func.now())
+            .returning(SesionCarga.id_sesion)
+        )
+        expiradas = result.scalars().all()
+        await db.commit()
+
+    for id_sesion in expiradas:
+        await run_in_threadpool(eliminar_silencioso, ruta_sesion(id_sesion))
+
+    await run_in_threadpool(
+        _barrer_temporales_viejos, settings.UPLOAD_SESION_TTL_MINUTOS * 60
+    )
+
+    return len(expiradas)
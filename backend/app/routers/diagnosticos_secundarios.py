@@ -4,7 +4,11 @@ from sqlalchemy import select, and_
 from uuid import UUID
 
 from app.core.database import get_db
+from app.core.busqueda import filtro_contiene
+from app.core.paginacion import ParametrosPagina, paginar, armar_pagina
+from app.core.exportacion import formato_respuesta, respuesta_streaming, RESPUESTAS_EXPORTACION
 from app.models.diagnosticos_secundarios import DiagnosticoSecundario
+from app.schemas.paginacion import Pagina
 from app.schemas.diagnosticos_secundarios import (
     DiagnosticoSecundarioCreate,
     DiagnosticoSecundarioOut,
@@ -19,11 +23,13 @@ router = APIRouter(
 # --------------------------------------------------
 # LISTAR + FILTROS
 # --------------------------------------------------
-@router.get("/", response_model=list[DiagnosticoSecundarioOut])
+@router.get("/", response_model=Pagina[DiagnosticoSecundarioOut], responses=RESPUESTAS_EXPORTACION)
 async def listar_diagnosticos_secundarios(
     id_admision: UUID | None = None,
     diagnostico: str | None = None,
     estado: str | None = None,
+    formato: str = Depends(formato_respuesta),
+    pag: ParametrosPagina = Depends(),
     db: AsyncSession = Depends(get_db)
 ):
     stmt = select(DiagnosticoSecundario)
@@ -34,7 +40,7 @@ async def listar_diagnosticos_secundarios(
 
     if diagnostico:
         filtros.append(
-            DiagnosticoSecundario.diagnostico.ilike(f"%{diagnostico}%")
+            filtro_contiene(DiagnosticoSecundario.diagnostico, diagnostico)
         )
 
     if estado:
@@ -43,8 +49,14 @@ async def listar_diagnosticos_secundarios(
     if filtros:
         stmt = stmt.where(and_(*filtros))
 
-    result = await db.execute(stmt)
-    return result.scalars().all()
+    if formato != "json":
+        return respuesta_streaming(
+            stmt, DiagnosticoSecundarioOut, formato, "diagnosticos_secundarios",
+            DiagnosticoSecundario.id_diag_sec
+        )
+
+    result = await db.execute(paginar(stmt, pag, DiagnosticoSecundario.id_diag_sec))
+    return armar_pagina(result.scalars().all(), pag, DiagnosticoSecundario.id_diag_sec)
 
 
 # --------------------------------------------------
@@ -0,0 +1,72 @@
+# app/routers/exportaciones.py
+# Descarga de tablas clínicas en Parquet / Arrow IPC (ver
+# app/servicios/exportacion_columnar.py). El archivo se arma en un
+# temporal y se borra después de enviarlo. La cabecera X-Marca-Agua trae
+# el `desde` para pedir la próxima exportación incremental.
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from starlette.background import BackgroundTask
+from starlette.responses import FileResponse
+
+from app.core.almacenamiento import ruta_temporal, eliminar_silencioso
+from app.servicios.exportacion_columnar import (
+    TABLAS,
+    FORMATOS,
+    ExportacionNoDisponible,
+    exportar
+)
+from app.servicios.filtros_observaciones import FiltrosObservaciones
+
+router = APIRouter(prefix="/exportaciones", tags=["Exportaciones"])
+
+PARAM_FORMATO = Query("parquet", pattern="^(parquet|arrow)$", description="parquet / arrow (IPC)")
+PARAM_DESDE = Query(None, description="Marca de agua: solo filas con creado_en posterior")
+
+
+async def _exportar(tabla: str, formato: str, desde: datetime | None, condiciones=None):
+    extension, media_type = FORMATOS[formato]
+    ruta = ruta_temporal(f".{extension}")
+
+    try:
+        info = await exportar(tabla, ruta, formato, condiciones, desde)
+    except ExportacionNoDisponible as e:
+        raise HTTPException(status_code=501, detail=str(e))
+
+    return FileResponse(
+        ruta,
+        media_type=media_type,
+        filename=f"{tabla}.{extension}",
+        headers={
+            "X-Marca-Agua": info["marca_agua"].isoformat(),
+            "X-Filas": str(info["filas"]),
+        },
+        background=BackgroundTask(eliminar_silencioso, ruta)
+    )
+
+
+# ---------------------------
+#   OBSERVACIONES (mismos filtros que GET /observaciones)
+# ---------------------------
+@router.get("/observaciones")
+async def exportar_observaciones(
+    filtros: FiltrosObservaciones = Depends(),
+    formato: str = PARAM_FORMATO,
+    desde: datetime | None = PARAM_DESDE
+):
+    return await _exportar("observaciones", formato, desde, filtros.condiciones())
+
+
+# ---------------------------
+#   ADMISIONES / DIAGNÓSTICOS SECUNDARIOS
+# ---------------------------
+@router.get("/{tabla}")
+async def exportar_tabla(
+    tabla: str,
+    formato: str = PARAM_FORMATO,
+    desde: datetime | None = PARAM_DESDE
+):
+    if tabla not in TABLAS:
+        raise HTTPException(status_code=404, detail="Tabla no exportable")
+
+    return await _exportar(tabla, formato, desde)
@@ -1,21 +1,203 @@
 # app/routers/observaciones.py
-from fastapi import Query
+import csv
+import re
+from fastapi import Query, Request
 from sqlalchemy import and_
-from datetime import datetime
+from sqlalchemy.exc import IntegrityError
+from datetime import datetime, timedelta
 from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.exc import IntegrityError
 
 from app.schemas.observaciones import (
-    ObservacionCreate, ObservacionUpdate, ObservacionOut
+    ObservacionCreate,
+    ObservacionUpdate,
+    ObservacionOut,
+    ResultadoLoteObservaciones,
+    AgregadosObservaciones,
+    VitalesAdmision
 )
 from app.models.observaciones import Observacion
+from app.models.observaciones_ultimas import ObservacionUltima
+from app.models.admisiones import Admision
+from app.models.pacientes import Paciente
+from app.models.tipos_observacion import TipoObservacion
+from app.schemas.paginacion import Pagina
+from app.servicios.ingesta_observaciones import (
+    leer_lineas,
+    parsear_ndjson,
+    parsear_csv,
+    validar_claves,
+    insertar_observaciones
+)
+from app.servicios.agregados_observaciones import (
+    agregar_observaciones,
+    rollup_vigente,
+    recalcular_hora,
+    HORA
+)
+from app.servicios.filtros_observaciones import FiltrosObservaciones
+from app.servicios.ultimas_observaciones import registrar_nuevas, recalcular_pares, fila_de
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.paginacion import ParametrosPagina, paginar, armar_pagina
+from app.core.exportacion import formato_respuesta, respuesta_streaming, RESPUESTAS_EXPORTACION
 
 router = APIRouter(prefix="/observaciones", tags=["Observaciones"])
 
+UNIDADES_ANCHO = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+ANCHOS_AUTOMATICOS = [60, 300, 900, 1800, 3600, 7200, 10800, 21600, 43200, 86400, 604800]
+
+
+def parsear_ancho(ancho: str) -> int:
+    m = re.fullmatch(r"\s*(\d+)\s*([smhd])\s*", ancho or "")
+    if not m or int(m.group(1)) == 0:
+        raise HTTPException(
+            status_code=400,
+            detail="Ancho inválido: use un número y una unidad (s, m, h, d), p. ej. 15m o 1h"
+        )
+    return int(m.group(1)) * UNIDADES_ANCHO[m.group(2)]
+
+
+# --------------------------------------------------
+# SERIES AGREGADAS POR BALDES DE TIEMPO
+# (antes de /{id_observacion} para que no la capture)
+# --------------------------------------------------
+@router.get("/agregados", response_model=AgregadosObservaciones)
+async def agregar_observaciones_series(
+    id_tipo_obs: list[UUID] = Query(...),
+    desde: datetime = Query(...),
+    hasta: datetime = Query(...),
+    id_paciente: UUID | None = None,
+    id_admision: UUID | None = None,
+    ancho: str | None = Query(None, description="Ancho del balde: 15m, 1h, 1d... (por defecto automático)"),
+    db: AsyncSession = Depends(get_db)
+):
+    if not id_paciente and not id_admision:
+        raise HTTPException(status_code=400, detail="Debe especificar id_paciente o id_admision")
+
+    if hasta <= desde:
+        raise HTTPException(status_code=400, detail="La fecha final debe ser mayor a la inicial")
+
+    rango = (hasta - desde).total_seconds()
+
+    if ancho:
+        segundos = parsear_ancho(ancho)
+    else:
+        objetivo = rango / settings.OBS_AGREGADOS_PUNTOS
+        segundos = next((a for a in ANCHOS_AUTOMATICOS if a >= objetivo), ANCHOS_AUTOMATICOS[-1])
+
+    if rango / segundos > settings.OBS_AGREGADOS_MAX_PUNTOS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Demasiados baldes: el máximo es {settings.OBS_AGREGADOS_MAX_PUNTOS} por serie"
+        )
+
+    # el rollup es por paciente y por hora: sirve para baldes de horas enteras
+    usar_rollup = (
+        id_paciente is not None
+        and id_admision is None
+        and segundos % HORA == 0
+        and rango >= timedelta(days=settings.OBS_AGREGADOS_DIAS_ROLLUP).total_seconds()
+        and await rollup_vigente(db)
+    )
+
+    filas = await agregar_observaciones(
+        db,
+        id_tipo_obs,
+        desde,
+        hasta,
+        segundos,
+        id_paciente=id_paciente,
+        id_admision=id_admision,
+        usar_rollup=usar_rollup
+    )
+
+    series = {}
+    for f in filas:
+        series.setdefault(f.id_tipo_obs, []).append({
+            "inicio": f.inicio,
+            "minimo": f.minimo,
+            "maximo": f.maximo,
+            "promedio": f.promedio,
+            "cantidad": f.cantidad,
+            "ultimo": f.ultimo,
+        })
+
+    return {
+        "ancho_segundos": segundos,
+        "fuente": "horario" if usar_rollup else "crudo",
+        "series": [{"id_tipo_obs": t, "puntos": p} for t, p in series.items()]
+    }
+
+
+# --------------------------------------------------
+# SIGNOS VITALES ACTUALES DE TODAS LAS ADMISIONES ACTIVAS
+# Una sola consulta sobre observaciones_ultimas (no recorre observaciones).
+# Solo cuentan las tomadas desde el ingreso: las de una internación previa
+# no son "actuales".
+# --------------------------------------------------
+@router.get("/vitales-actuales", response_model=list[VitalesAdmision])
+async def vitales_actuales(db: AsyncSession = Depends(get_db)):
+    vitales = (
+        ObservacionUltima.__table__
+        .join(
+            TipoObservacion,
+            and_(
+                TipoObservacion.id_tipo_obs == ObservacionUltima.id_tipo_obs,
+                TipoObservacion.codigo.in_(settings.OBS_CODIGOS_VITALES)
+            )
+        )
+    )
+
+    result = await db.execute(
+        select(
+            Admision.id_admision,
+            Admision.id_paciente,
+            Paciente.nombre,
+            Paciente.apellido,
+            Admision.fecha_ingreso,
+            TipoObservacion.codigo,
+            ObservacionUltima.valor_numerico,
+            ObservacionUltima.valor_texto,
+            ObservacionUltima.unidad,
+            ObservacionUltima.fecha_hora
+        )
+        .select_from(Admision)
+        .join(Paciente, Paciente.id_paciente == Admision.id_paciente)
+        .outerjoin(
+            vitales,
+            and_(
+                ObservacionUltima.id_paciente == Admision.id_paciente,
+                ObservacionUltima.fecha_hora >= Admision.fecha_ingreso
+            )
+        )
+        .where(Admision.estado == "activo", Admision.fecha_salida.is_(None))
+        .order_by(Admision.fecha_ingreso, Admision.id_admision)
+    )
+
+    admisiones = {}
+    for f in result.all():
+        adm = admisiones.setdefault(f.id_admision, {
+            "id_admision": f.id_admision,
+            "id_paciente": f.id_paciente,
+            "nombre": f.nombre,
+            "apellido": f.apellido,
+            "fecha_ingreso": f.fecha_ingreso,
+            "vitales": {},
+        })
+        if f.codigo:
+            adm["vitales"][f.codigo] = {
+                "valor_numerico": f.valor_numerico,
+                "valor_texto": f.valor_texto,
+                "unidad": f.unidad,
+                "fecha_hora": f.fecha_hora,
+            }
+
+    return list(admisiones.values())
+
+
 # --------------------------------------------------
 # OBTENER POR ID
 # --------------------------------------------------
@@ -38,104 +220,93 @@ async def obtener_observacion(
 async def crear_observacion(data: ObservacionCreate, db: AsyncSession = Depends(get_db)):
     nueva = Observacion(**data.dict())
     db.add(nueva)
+    await db.flush()
+    await registrar_nuevas(db, [fila_de(nueva)])
     await db.commit()
     await db.refresh(nueva)
     return nueva
 
 
-@router.get("/", response_model=list[ObservacionOut])
-async def listar_observaciones(
-    id_paciente: UUID | None = None,
-    id_admision: UUID | None = None,
-    id_tipo_obs: UUID | None = None,
-    id_archivo: UUID | None = None,
-    id_ocr: UUID | None = None,
-
-    creado_inicio: datetime | None = Query(None),
-    creado_fin: datetime | None = Query(None),
-
-    fecha_hora_inicio: datetime | None = Query(None),
-    fecha_hora_fin: datetime | None = Query(None),
-
-    valor_numerico_inicio: float | None = None,
-    valor_numerico_fin: float | None = None,
-
-    valor_texto: str | None = None,
-    unidad: str | None = None,
-
+# --------------------------------------------------
+# CARGA MASIVA (NDJSON o CSV)
+# El cuerpo se procesa en streaming por tandas de OBS_LOTE_TAMANO filas.
+# Las filas inválidas se informan una por una y no frenan al resto; las
+# válidas se confirman juntas al final.
+# --------------------------------------------------
+@router.post("/lote", response_model=ResultadoLoteObservaciones)
+async def cargar_observaciones_lote(
+    request: Request,
+    formato: str | None = Query(None, description="ndjson / csv (por defecto según Content-Type)"),
     db: AsyncSession = Depends(get_db)
 ):
-    stmt = select(Observacion)
-    filtros = []
-
-    # ---------------- VALIDACIONES DE RANGO ----------------
-    def validar_rango(inicio, fin, nombre):
-        if inicio and not fin:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Debe especificar el valor final para el rango de {nombre}"
-            )
-        if fin and not inicio:
+    if formato is None:
+        tipo = request.headers.get("content-type", "")
+        formato = "csv" if "csv" in tipo else "ndjson"
+
+    if formato not in ("ndjson", "csv"):
+        raise HTTPException(status_code=400, detail="Formato no soportado (ndjson, csv)")
+
+    recibidas = 0
+    insertadas = 0
+    rechazadas = []
+    cabecera = None
+    tanda = []
+
+    async def procesar(tanda):
+        if formato == "csv":
+            validas, rechazos = parsear_csv(tanda, cabecera)
+        else:
+            validas, rechazos = parsear_ndjson(tanda)
+
+        validas, rechazos_fk = await validar_claves(db, validas)
+        rechazadas.extend(rechazos + rechazos_fk)
+        return await insertar_observaciones(db, validas)
+
+    async for linea in leer_lineas(request.stream()):
+        if not linea.strip():
+            continue
+
+        if formato == "csv" and cabecera is None:
+            cabecera = [c.strip() for c in next(csv.reader([linea]))]
+            continue
+
+        recibidas += 1
+        if recibidas > settings.OBS_LOTE_MAX_FILAS:
+            await db.rollback()
             raise HTTPException(
-                status_code=400,
-                detail=f"Debe especificar el valor inicial para el rango de {nombre}"
+                status_code=413,
+                detail=f"El lote supera el máximo de {settings.OBS_LOTE_MAX_FILAS} filas"
             )
 
-    validar_rango(creado_inicio, creado_fin, "creado_en")
-    validar_rango(fecha_hora_inicio, fecha_hora_fin, "fecha_hora")
-    validar_rango(valor_numerico_inicio, valor_numerico_fin, "valor_numerico")
-
-    # ---------------- FILTROS DIRECTOS ----------------
-    if id_paciente:
-        filtros.append(Observacion.id_paciente == id_paciente)
+        tanda.append((recibidas, linea))
+        if len(tanda) >= settings.OBS_LOTE_TAMANO:
+            insertadas += await procesar(tanda)
+            tanda = []
 
-    if id_admision:
-        filtros.append(Observacion.id_admision == id_admision)
+    if tanda:
+        insertadas += await procesar(tanda)
 
-    if id_tipo_obs:
-        filtros.append(Observacion.id_tipo_obs == id_tipo_obs)
-
-    if id_archivo:
-        filtros.append(Observacion.id_archivo == id_archivo)
-
-    if id_ocr:
-        filtros.append(Observacion.id_ocr == id_ocr)
-
-    # ---------------- FILTROS POR RANGO ----------------
-    if creado_inicio and creado_fin:
-        filtros.append(
-            Observacion.creado_en.between(creado_inicio, creado_fin)
-        )
-
-    if fecha_hora_inicio and fecha_hora_fin:
-        filtros.append(
-            Observacion.fecha_hora.between(fecha_hora_inicio, fecha_hora_fin)
-        )
+    await db.commit()
 
-    if valor_numerico_inicio and valor_numerico_fin:
-        filtros.append(
-            Observacion.valor_numerico.between(
-                valor_numerico_inicio,
-                valor_numerico_fin
-            )
-        )
+    rechazadas.sort(key=lambda r: r["fila"])
+    return {"recibidas": recibidas, "insertadas": insertadas, "rechazadas": rechazadas}
 
-    # ---------------- FILTROS DE TEXTO ----------------
-    if valor_texto:
-        filtros.append(
-            Observacion.valor_texto.ilike(f"%{valor_texto}%")
-        )
 
-    if unidad:
-        filtros.append(
-            Observacion.unidad.ilike(f"%{unidad}%")
-        )
+@router.get("/", response_model=Pagina[ObservacionOut], responses=RESPUESTAS_EXPORTACION)
+async def listar_observaciones(
+    filtros: FiltrosObservaciones = Depends(),
+    formato: str = Depends(formato_respuesta),
+    pag: ParametrosPagina = Depends(),
+    db: AsyncSession = Depends(get_db)
+):
+    stmt = filtros.aplicar(select(Observacion))
 
-    if filtros:
-        stmt = stmt.where(and_(*filtros))
+    orden = (Observacion.fecha_hora, Observacion.id_observacion)
+    if formato != "json":
+        return respuesta_streaming(stmt, ObservacionOut, formato, "observaciones", *orden)
 
-    result = await db.execute(stmt)
-    return result.scalars().all()
+    result = await db.execute(paginar(stmt, pag, *orden))
+    return armar_pagina(result.scalars().all(), pag, *orden)
 
 
 
@@ -147,9 +318,19 @@ async def actualizar_observacion(id_observacion: str, data: ObservacionUpdate, d
     if not obs:
         raise HTTPException(status_code=404, detail="Observación no encontrada")
 
+    anterior = (obs.id_paciente, obs.id_tipo_obs, obs.fecha_hora)
+
     for k, v in data.dict(exclude_unset=True).items():
         setattr(obs, k, v)
 
+    # el rollup horario se refresca por creado_en: una edición no la vería
+    await db.flush()
+    await recalcular_hora(db, *anterior)
+    if anterior != (obs.id_paciente, obs.id_tipo_obs, obs.fecha_hora):
+        await recalcular_hora(db, obs.id_paciente, obs.id_tipo_obs, obs.fecha_hora)
+
+    await recalcular_pares(db, {anterior[:2], (obs.id_paciente, obs.id_tipo_obs)})
+
     await db.commit()
     await db.refresh(obs)
     return obs
@@ -169,7 +350,7 @@ async def eliminar_observacion(
 
     try:
         await db.delete(obs)
-        await db.commit()
+        await db.flush()
     except IntegrityError:
         await db.rollback()
         raise HTTPException(
@@ -177,4 +358,8 @@ async def eliminar_observacion(
             detail="No se puede eliminar la observación porque tiene revisiones asociadas"
         )
 
+    await recalcular_hora(db, obs.id_paciente, obs.id_tipo_obs, obs.fecha_hora)
+    await recalcular_pares(db, {(obs.id_paciente, obs.id_tipo_obs)})
+    await db.commit()
+
     return {"detail": "Observación eliminada correctamente"}
@@ -1,12 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, literal_column, REAL
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.core.database import get_db
-from app.models.ocr_crudo import OCRCrudo
+from app.core.paginacion import ParametrosPagina, paginar, armar_pagina
+from app.core.exportacion import formato_respuesta, respuesta_streaming, RESPUESTAS_EXPORTACION
+from app.models.ocr_crudo import OCRCrudo, CONFIG_BUSQUEDA
+from app.models.trabajos_ocr import TrabajoOCR
+from app.schemas.trabajos_ocr import TrabajoOCRRead
+from app.schemas.paginacion import Pagina
+from app.servicios.pipeline_ocr import encolar_archivo
 from app.schemas.ocr_crudo import (
     OCRCrudoCreate,
     OCRCrudoUpdate,
-    OCRCrudoResponse
+    OCRCrudoResponse,
+    OCRBusquedaHit
 )
 
 router = APIRouter(prefix="/ocr-crudo", tags=["OCR crudo"])
@@ -22,11 +32,90 @@ async def crear_ocr_crudo(data: OCRCrudoCreate, db: AsyncSession = Depends(get_d
     return nuevo
 
 
+# ⭐ ESTADO DEL OCR AUTOMÁTICO DE UN ARCHIVO
+@router.get("/trabajos/{id_archivo}", response_model=TrabajoOCRRead)
+async def obtener_trabajo_ocr(id_archivo: UUID, db: AsyncSession = Depends(get_db)):
+    trabajo = await db.get(TrabajoOCR, id_archivo)
+
+    if not trabajo:
+        raise HTTPException(status_code=404, detail="El archivo no tiene trabajo de OCR")
+
+    return trabajo
+
+
+# ⭐ (RE)ENCOLAR UN ARCHIVO PARA OCR
+@router.post("/trabajos/{id_archivo}", response_model=TrabajoOCRRead)
+async def encolar_trabajo_ocr(id_archivo: UUID, db: AsyncSession = Depends(get_db)):
+    await encolar_archivo(db, id_archivo)
+    await db.commit()
+
+    trabajo = await db.get(TrabajoOCR, id_archivo, populate_existing=True)
+    return trabajo
+
+
+# ⭐ BÚSQUEDA DE TEXTO COMPLETO
+# Usa el índice GIN de texto_busqueda. El orden es (rank desc, id_ocr desc)
+# y el cursor guarda el último par devuelto, así que pedir la página N no
+# obliga a recorrer las anteriores.
+@router.get("/buscar", response_model=Pagina[OCRBusquedaHit])
+async def buscar_ocr_crudo(
+    q: str = Query(..., min_length=1, description="Sintaxis tipo buscador: \"frase exacta\", -excluir, or"),
+    id_archivo: Optional[UUID] = None,
+    pag: ParametrosPagina = Depends(),
+    db: AsyncSession = Depends(get_db)
+):
+    config = literal_column(f"'{CONFIG_BUSQUEDA}'::regconfig")
+    consulta = func.websearch_to_tsquery(config, q)
+    rank = func.ts_rank_cd(OCRCrudo.texto_busqueda, consulta, type_=REAL).label("rank")
+
+    coincidencias = (
+        select(OCRCrudo.id_ocr, OCRCrudo.id_archivo, OCRCrudo.pagina, OCRCrudo.texto, rank)
+        .where(OCRCrudo.texto_busqueda.bool_op("@@")(consulta))
+    )
+
+    if id_archivo:
+        coincidencias = coincidencias.where(OCRCrudo.id_archivo == id_archivo)
+
+    pagina = paginar(coincidencias, pag, rank, OCRCrudo.id_ocr).subquery()
+
+    # ts_headline es caro: se calcula solo sobre las filas de la página
+    result = await db.execute(
+        select(
+            pagina.c.id_ocr,
+            pagina.c.id_archivo,
+            pagina.c.pagina,
+            pagina.c.rank,
+            func.ts_headline(
+                config, func.coalesce(pagina.c.texto, ""), consulta,
+                "MaxFragments=2, MaxWords=25, MinWords=8"
+            ).label("snippet")
+        )
+        .order_by(pagina.c.rank.desc(), pagina.c.id_ocr.desc())
+    )
+    return armar_pagina(
+        (fila._asdict() for fila in result.all()), pag, rank, OCRCrudo.id_ocr,
+        clave=lambda fila: (fila["rank"], fila["id_ocr"])
+    )
+
+
 # ⭐ READ ALL
-@router.get("/", response_model=list[OCRCrudoResponse])
-async def listar_ocr_crudo(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(OCRCrudo))
-    return result.scalars().all()
+@router.get("/", response_model=Pagina[OCRCrudoResponse], responses=RESPUESTAS_EXPORTACION)
+async def listar_ocr_crudo(
+    id_archivo: Optional[UUID] = None,
+    formato: str = Depends(formato_respuesta),
+    pag: ParametrosPagina = Depends(),
+    db: AsyncSession = Depends(get_db)
+):
+    stmt = select(OCRCrudo)
+    if id_archivo:
+        stmt = stmt.where(OCRCrudo.id_archivo == id_archivo)
+
+    orden = (OCRCrudo.creado_en, OCRCrudo.id_ocr)
+    if formato != "json":
+        return respuesta_streaming(stmt, OCRCrudoResponse, formato, "ocr_crudo", *orden)
+
+    result = await db.execute(paginar(stmt, pag, *orden))
+    return armar_pagina(result.scalars().all(), pag, *orden)
 
 
 # ⭐ READ BY ID
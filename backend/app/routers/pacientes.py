@@ -1,17 +1,30 @@
 # app/routers/pacientes.py
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, literal_column
 from uuid import UUID as UUID_type
 from typing import List, Optional
 from datetime import date, timedelta
 
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.busqueda import (
+    filtro_contiene,
+    fijar_umbral_similitud,
+    coincide_similar,
+    similitud
+)
+from app.core.paginacion import ParametrosPagina, paginar, armar_pagina
+from app.core.exportacion import formato_respuesta, respuesta_streaming, RESPUESTAS_EXPORTACION
 from app.models.pacientes import Paciente
 from app.schemas.pacientes import PacienteCreate, PacienteUpdate, PacienteOut
+from app.schemas.paginacion import Pagina
 
 router = APIRouter(prefix="/pacientes", tags=["Pacientes"])
 
+# orden de los listados paginados (más recientes primero)
+ORDEN_PACIENTES = (Paciente.creado_en, Paciente.id_paciente)
+
 
 # ============================================================
 # VALIDACIÓN FECHA NACIMIENTO
@@ -59,10 +72,10 @@ async def crear_paciente(data: PacienteCreate, db: AsyncSession = Depends(get_db
 
 
 # ============================================================
-# Listar pacientes con filtros + paginación + filtro por estado
-# incluyendo filtro por fecha_nacimiento (min - max)
+# Listar pacientes con filtros + paginación por cursor + filtro por
+# estado, incluyendo filtro por fecha_nacimiento (min - max)
 # ============================================================
-@router.get("/", response_model=List[PacienteOut])
+@router.get("/", response_model=Pagina[PacienteOut], responses=RESPUESTAS_EXPORTACION)
 async def listar_pacientes(
     db: AsyncSession = Depends(get_db),
     nombre: Optional[str] = Query(None),
@@ -71,15 +84,15 @@ async def listar_pacientes(
     estado: Optional[str] = Query(None, description="activo / inactivo"),
     fecha_min: Optional[date] = Query(None),
     fecha_max: Optional[date] = Query(None),
-    limite: int = Query(50, ge=1, le=1000),
-    offset: int = Query(0, ge=0)
+    formato: str = Depends(formato_respuesta),
+    pag: ParametrosPagina = Depends()
 ):
     stmt = select(Paciente)
 
     if nombre:
-        stmt = stmt.where(Paciente.nombre.ilike(f"%{nombre}%"))
+        stmt = stmt.where(filtro_contiene(Paciente.nombre, nombre))
     if apellido:
-        stmt = stmt.where(Paciente.apellido.ilike(f"%{apellido}%"))
+        stmt = stmt.where(filtro_contiene(Paciente.apellido, apellido))
     if id_externo:
         stmt = stmt.where(Paciente.id_externo == id_externo)
     if estado:
@@ -90,31 +103,74 @@ async def listar_pacientes(
     if fecha_max:
         stmt = stmt.where(Paciente.fecha_nacimiento <= fecha_max)
 
-    stmt = stmt.offset(offset).limit(limite)
+    if formato != "json":
+        return respuesta_streaming(stmt, PacienteOut, formato, "pacientes", *ORDEN_PACIENTES)
 
-    result = await db.execute(stmt)
+    result = await db.execute(paginar(stmt, pag, *ORDEN_PACIENTES))
     rows = result.scalars().all()
-    return rows
+    return armar_pagina(rows, pag, *ORDEN_PACIENTES)
+
+
+# ============================================================
+# Búsqueda por nombre completo ordenada por similitud
+# Tolera errores de tipeo y el orden nombre/apellido; usa el índice
+# trigram sobre (nombre || ' ' || apellido).
+# ============================================================
+@router.get("/buscar", response_model=List[PacienteOut])
+async def buscar_pacientes(
+    db: AsyncSession = Depends(get_db),
+    q: str = Query(..., min_length=2),
+    estado: Optional[str] = Query(None, description="activo / inactivo"),
+    limite: int = Query(20, ge=1, le=100)
+):
+    # misma expresión que el índice (separador literal, no parámetro)
+    nombre_completo = (Paciente.nombre + literal_column("' '") + Paciente.apellido).self_group()
+    puntaje = similitud(nombre_completo, q)
+
+    await fijar_umbral_similitud(db, settings.BUSQUEDA_SIMILITUD_MINIMA)
+
+    stmt = select(Paciente).where(coincide_similar(nombre_completo, q))
+    if estado:
+        stmt = stmt.where(Paciente.estado == estado)
+
+    stmt = stmt.order_by(puntaje.desc(), Paciente.apellido, Paciente.nombre).limit(limite)
+
+    result = await db.execute(stmt)
+    return result.scalars().all()
 
 
 # ============================================================
 # Listar solo activos
 # ============================================================
-@router.get("/activos", response_model=List[PacienteOut])
-async def listar_pacientes_activos(db: AsyncSession = Depends(get_db)):
+@router.get("/activos", response_model=Pagina[PacienteOut], responses=RESPUESTAS_EXPORTACION)
+async def listar_pacientes_activos(
+    formato: str = Depends(formato_respuesta),
+    pag: ParametrosPagina = Depends(),
+    db: AsyncSession = Depends(get_db)
+):
     stmt = select(Paciente).where(Paciente.estado == "activo")
-    r = await db.execute(stmt)
-    return r.scalars().all()
+    if formato != "json":
+        return respuesta_streaming(stmt, PacienteOut, formato, "pacientes_activos", *ORDEN_PACIENTES)
+
+    r = await db.execute(paginar(stmt, pag, *ORDEN_PACIENTES))
+    return armar_pagina(r.scalars().all(), pag, *ORDEN_PACIENTES)
 
 
 # ============================================================
 # Listar solo inactivos
 # ============================================================
-@router.get("/inactivos", response_model=List[PacienteOut])
-async def listar_pacientes_inactivos(db: AsyncSession = Depends(get_db)):
+@router.get("/inactivos", response_model=Pagina[PacienteOut], responses=RESPUESTAS_EXPORTACION)
+async def listar_pacientes_inactivos(
+    formato: str = Depends(formato_respuesta),
+    pag: ParametrosPagina = Depends(),
+    db: AsyncSession = Depends(get_db)
+):
     stmt = select(Paciente).where(Paciente.estado == "inactivo")
-    r = await db.execute(stmt)
-    return r.scalars().all()
+    if formato != "json":
+        return respuesta_streaming(stmt, PacienteOut, formato, "pacientes_inactivos", *ORDEN_PACIENTES)
+
+    r = await db.execute(paginar(stmt, pag, *ORDEN_PACIENTES))
+    return armar_pagina(r.scalars().all(), pag, *ORDEN_PACIENTES)
 
 
 # ============================================================
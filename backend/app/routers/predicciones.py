@@ -0,0 +1,182 @@
+# app/routers/predicciones.py
+# Clasificador de especialidad (ver app/ml/). El modelo se carga una vez al
+# arrancar (app.state.predictor); las peticiones concurrentes se juntan en
+# micro-lotes dentro del predictor. Las predicciones guardadas de las
+# admisiones activas las escribe el trabajo `puntuar_admisiones`. La deriva
+# de entradas y predicciones se lee de los estadísticos acumulados
+# (app/ml/deriva.py), sin recorrer observaciones.
+import asyncio
+from typing import Literal, Optional
+from uuid import UUID
+
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.exportacion import formato_respuesta, respuesta_streaming, RESPUESTAS_EXPORTACION
+from app.core.paginacion import ParametrosPagina, paginar, armar_pagina
+from app.ml import deriva, modelo
+from app.ml.caracteristicas import CARACTERISTICAS, matriz_caracteristicas
+from app.ml.inferencia import Predictor
+from app.models.admisiones import Admision
+from app.models.predicciones_admision import PrediccionAdmision
+from app.schemas.paginacion import Pagina
+from app.schemas.predicciones import (
+    PrediccionEntrada,
+    PrediccionLoteEntrada,
+    PrediccionOut,
+    PrediccionLoteOut,
+    PrediccionAdmisionOut,
+    PrediccionGuardadaOut,
+    PuntuacionEntrada,
+    DerivaOut
+)
+from app.servicios import tareas  # noqa: F401  (registra puntuar_admisiones)
+from app.servicios.cola_trabajos import encolar
+
+router = APIRouter(prefix="/predicciones", tags=["Predicciones"])
+
+
+def obtener_predictor(request: Request) -> Predictor:
+    predictor = getattr(request.app.state, "predictor", None)
+    if predictor is None:
+        raise HTTPException(status_code=503, detail="Modelo de predicción no disponible")
+    return predictor
+
+
+def _matriz(instancias: list[PrediccionEntrada]) -> np.ndarray:
+    return np.array(
+        [[getattr(i, c) for c in CARACTERISTICAS] for i in instancias], dtype=np.float64
+    )
+
+
+def _armar(clases: list[str], P: np.ndarray, faltantes: np.ndarray) -> list[dict]:
+    ganadoras = P.argmax(axis=1)
+    return [
+        {
+            "especialidad": clases[g],
+            "probabilidades": dict(zip(clases, map(float, p))),
+            "imputadas": [c for c, f in zip(CARACTERISTICAS, falta) if f],
+        }
+        for g, p, falta in zip(ganadoras, P, faltantes)
+    ]
+
+
+# ---------------------------
+#   A PARTIR DE VALORES
+# ---------------------------
+@router.post("/", response_model=PrediccionOut)
+async def predecir(data: PrediccionEntrada, predictor: Predictor = Depends(obtener_predictor)):
+    X = _matriz([data])
+    P = await predictor.predecir(X)
+    return _armar(predictor.artefacto.clases, P, np.isnan(X))[0]
+
+
+@router.post("/lote", response_model=PrediccionLoteOut)
+async def predecir_lote(data: PrediccionLoteEntrada, predictor: Predictor = Depends(obtener_predictor)):
+    X = _matriz(data.instancias)
+    P = await predictor.predecir(X)
+    return {
+        "version_modelo": predictor.artefacto.version,
+        "predicciones": _armar(predictor.artefacto.clases, P, np.isnan(X)),
+    }
+
+
+# ---------------------------
+#   GUARDADAS (admisiones activas)
+# ---------------------------
+@router.get("/admisiones", response_model=Pagina[PrediccionGuardadaOut], responses=RESPUESTAS_EXPORTACION)
+async def listar_predicciones_admisiones(
+    especialidad: Optional[str] = None,
+    formato: str = Depends(formato_respuesta),
+    pag: ParametrosPagina = Depends(),
+    db: AsyncSession = Depends(get_db)
+):
+    stmt = (
+        select(PrediccionAdmision)
+        .join(Admision, Admision.id_admision == PrediccionAdmision.id_admision)
+        .where(Admision.estado == "activo", Admision.fecha_salida.is_(None))
+    )
+    if especialidad:
+        stmt = stmt.where(PrediccionAdmision.especialidad == especialidad)
+
+    if formato != "json":
+        return respuesta_streaming(
+            stmt, PrediccionGuardadaOut, formato, "predicciones_admision", PrediccionAdmision.id_admision
+        )
+
+    result = await db.execute(paginar(stmt, pag, PrediccionAdmision.id_admision))
+    return armar_pagina(result.scalars().all(), pag, PrediccionAdmision.id_admision)
+
+
+@router.post("/admisiones/puntuar", status_code=202)
+async def puntuar_admisiones(data: PuntuacionEntrada, db: AsyncSession = Depends(get_db)):
+    id_trabajo = await encolar(db, "puntuar_admisiones", {"forzar": data.forzar})
+    await db.commit()
+    return {"id_trabajo": id_trabajo}
+
+
+# ---------------------------
+#   DERIVA
+# ---------------------------
+@router.get("/deriva", response_model=DerivaOut)
+async def informe_deriva(
+    request: Request,
+    version: Optional[int] = None,
+    origen: Optional[Literal["api", "puntuacion"]] = None,
+    horas: int = Query(settings.ML_DERIVA_HORAS, ge=1, le=24 * 90),
+    db: AsyncSession = Depends(get_db)
+):
+    predictor = getattr(request.app.state, "predictor", None)
+    if version is None:
+        version = predictor.artefacto.version if predictor else (modelo.versiones() or [None])[-1]
+    if version is None:
+        raise HTTPException(status_code=404, detail="No hay modelos entrenados")
+
+    if predictor and predictor.artefacto.version == version:
+        artefacto = predictor.artefacto
+        await predictor.volcar_deriva()  # que el informe incluya lo acumulado en este proceso
+    elif version in modelo.versiones():
+        artefacto = await asyncio.to_thread(modelo.cargar, modelo.ruta_version(version))
+    else:
+        raise HTTPException(status_code=404, detail="Versión de modelo no encontrada")
+
+    actual, desde = await deriva.acumulado(db, version, len(artefacto.clases), horas, origen)
+    referencia, aproximada = deriva.referencia(artefacto)
+    return {
+        **deriva.informe(actual, referencia, artefacto.clases),
+        "version_modelo": version,
+        "origen": origen,
+        "horas": horas,
+        "desde": desde,
+        "referencia_aproximada": aproximada,
+    }
+
+
+# ---------------------------
+#   A PARTIR DE LAS OBSERVACIONES DE UNA ADMISIÓN
+# ---------------------------
+@router.get("/admisiones/{id_admision}", response_model=PrediccionAdmisionOut)
+async def predecir_admision(
+    id_admision: UUID,
+    predictor: Predictor = Depends(obtener_predictor),
+    db: AsyncSession = Depends(get_db)
+):
+    if not await db.get(Admision, id_admision):
+        raise HTTPException(status_code=404, detail="Admisión no encontrada")
+
+    artefacto = predictor.artefacto
+    m = await matriz_caracteristicas(db, [id_admision], relleno=artefacto.relleno)
+    # sin imputar: el predictor completa igual y la deriva cuenta los faltantes
+    P = await predictor.predecir(np.where(m.observado, m.X, np.nan))
+
+    return {
+        **_armar(artefacto.clases, P, ~m.observado)[0],
+        "id_admision": id_admision,
+        "version_modelo": artefacto.version,
+        "calculado_hasta": m.hasta,
+        "caracteristicas": dict(zip(CARACTERISTICAS, map(float, m.X[0]))),
+    }
@@ -7,7 +7,12 @@ from datetime import datetime
 from uuid import UUID
 
 from app.core.database import get_db
+from app.core.busqueda import filtro_contiene
+from app.core.paginacion import ParametrosPagina, paginar, armar_pagina
+from app.core.exportacion import formato_respuesta, respuesta_streaming, RESPUESTAS_EXPORTACION
+from app.models.observaciones import Observacion
 from app.models.revision_observaciones import RevisionObservacion
+from app.schemas.paginacion import Pagina
 from app.schemas.revision_observaciones import (
     RevisionObsCreate, RevisionObsUpdate, RevisionObsOut
 )
@@ -25,6 +30,13 @@ async def crear_revision(
     data: RevisionObsCreate,
     db: AsyncSession = Depends(get_db)
 ):
+    # la FK es (id_observacion, fecha_hora): se completa la fecha_hora
+    fecha_hora = await db.scalar(
+        select(Observacion.fecha_hora).where(Observacion.id_observacion == data.id_observacion)
+    )
+    if fecha_hora is None:
+        raise HTTPException(status_code=404, detail="Observación no encontrada")
+
     # Validar duplicado por observación
     existe = await db.execute(
         select(RevisionObservacion)
@@ -38,6 +50,7 @@ async def crear_revision(
 
     nueva = RevisionObservacion(
         id_observacion=data.id_observacion,
+        fecha_hora=fecha_hora,
         id_usuario_revisor=data.id_usuario_revisor,
         comentarios=data.comentarios,
         estado_revision="pendiente"
@@ -72,7 +85,7 @@ async def obtener_revision(
 # ============================
 # LIST + FILTERS
 # ============================
-@router.get("/", response_model=list[RevisionObsOut])
+@router.get("/", response_model=Pagina[RevisionObsOut], responses=RESPUESTAS_EXPORTACION)
 async def listar_revisiones(
     id_observacion: UUID | None = None,
     id_usuario_revisor: UUID | None = None,
@@ -80,6 +93,8 @@ async def listar_revisiones(
     comentarios: str | None = None,
     revisado_desde: datetime | None = Query(None),
     revisado_hasta: datetime | None = Query(None),
+    formato: str = Depends(formato_respuesta),
+    pag: ParametrosPagina = Depends(),
     db: AsyncSession = Depends(get_db)
 ):
     if (revisado_desde and not revisado_hasta) or (revisado_hasta and not revisado_desde):
@@ -106,7 +121,7 @@ async def listar_revisiones(
         condiciones.append(RevisionObservacion.estado_revision == estado_revision)
 
     if comentarios:
-        condiciones.append(RevisionObservacion.comentarios.ilike(f"%{comentarios}%"))
+        condiciones.append(filtro_contiene(RevisionObservacion.comentarios, comentarios))
 
     if revisado_desde and revisado_hasta:
         condiciones.append(
@@ -119,8 +134,13 @@ async def listar_revisiones(
     if condiciones:
         stmt = stmt.where(and_(*condiciones))
 
-    result = await db.execute(stmt)
-    return result.scalars().all()
+    if formato != "json":
+        return respuesta_streaming(
+            stmt, RevisionObsOut, formato, "revision_observaciones", RevisionObservacion.id_revision
+        )
+
+    result = await db.execute(paginar(stmt, pag, RevisionObservacion.id_revision))
+    return armar_pagina(result.scalars().all(), pag, RevisionObservacion.id_revision)
 
 
 # ============================
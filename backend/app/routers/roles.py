@@ -1,10 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from typing import List
 
 from app.core.database import get_db
+from app.core.busqueda import filtro_contiene
+from app.core.paginacion import ParametrosPagina, paginar, armar_pagina
+from app.core.exportacion import formato_respuesta, respuesta_streaming, RESPUESTAS_EXPORTACION
 from app.models.roles import Rol
+from app.schemas.paginacion import Pagina
 from app.schemas.roles import RolCreate, RolUpdate, RolOut
 
 router = APIRouter(prefix="/roles", tags=["Roles"])
@@ -24,17 +27,22 @@ async def crear_rol(data: RolCreate, db: AsyncSession = Depends(get_db)):
 
 
 # READ - listar roles
-@router.get("/", response_model=List[RolOut])
+@router.get("/", response_model=Pagina[RolOut], responses=RESPUESTAS_EXPORTACION)
 async def listar_roles(
     db: AsyncSession = Depends(get_db),
-    nombre: str | None = Query(None)
+    nombre: str | None = Query(None),
+    formato: str = Depends(formato_respuesta),
+    pag: ParametrosPagina = Depends()
 ):
     stmt = select(Rol)
     if nombre:
-        stmt = stmt.where(Rol.nombre_rol.ilike(f"%{nombre}%"))
+        stmt = stmt.where(filtro_contiene(Rol.nombre_rol, nombre))
 
-    result = await db.execute(stmt)
-    return result.scalars().all()
+    if formato != "json":
+        return respuesta_streaming(stmt, RolOut, formato, "roles", Rol.id_rol)
+
+    result = await db.execute(paginar(stmt, pag, Rol.id_rol))
+    return armar_pagina(result.scalars().all(), pag, Rol.id_rol)
 
 
 # READ - obtener uno
@@ -6,7 +6,11 @@ from uuid import UUID
 from datetime import datetime
 
 from app.core.database import get_db
+from app.core.busqueda import filtro_contiene
+from app.core.paginacion import ParametrosPagina, paginar, armar_pagina
+from app.core.exportacion import formato_respuesta, respuesta_streaming, RESPUESTAS_EXPORTACION
 from app.models.tipos_observacion import TipoObservacion
+from app.schemas.paginacion import Pagina
 from app.schemas.tipos_observacion import (
     TipoObservacionRead,
     TipoObservacionCreate,
@@ -34,7 +38,7 @@ async def crear_tipo_observacion(
 # --------------------------------------------------------
 #   LISTAR + FILTROS
 # --------------------------------------------------------
-@router.get("/", response_model=list[TipoObservacionRead])
+@router.get("/", response_model=Pagina[TipoObservacionRead], responses=RESPUESTAS_EXPORTACION)
 async def listar_tipos_observacion(
     codigo: str | None = None,
     nombre: str | None = None,
@@ -43,6 +47,8 @@ async def listar_tipos_observacion(
     estado: str | None = None,
     fecha_inicio: datetime | None = Query(None),
     fecha_fin: datetime | None = Query(None),
+    formato: str = Depends(formato_respuesta),
+    pag: ParametrosPagina = Depends(),
     db: AsyncSession = Depends(get_db)
 ):
     query = select(TipoObservacion)
@@ -52,7 +58,7 @@ async def listar_tipos_observacion(
         filtros.append(TipoObservacion.codigo == codigo)
 
     if nombre:
-        filtros.append(TipoObservacion.nombre.ilike(f"%{nombre}%"))
+        filtros.append(filtro_contiene(TipoObservacion.nombre, nombre))
 
     if categoria:
         filtros.append(TipoObservacion.categoria == categoria)
@@ -75,8 +81,12 @@ async def listar_tipos_observacion(
     if filtros:
         query = query.where(and_(*filtros))
 
-    result = await db.execute(query)
-    return result.scalars().all()
+    orden = (TipoObservacion.creado_en, TipoObservacion.id_tipo_obs)
+    if formato != "json":
+        return respuesta_streaming(query, TipoObservacionRead, formato, "tipos_observacion", *orden)
+
+    result = await db.execute(paginar(query, pag, *orden))
+    return armar_pagina(result.scalars().all(), pag, *orden)
 
 
 # --------------------------------------------------------
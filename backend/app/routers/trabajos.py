@@ -0,0 +1,81 @@
+# app/routers/trabajos.py
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.core.database import get_db
+from app.core.paginacion import ParametrosPagina, paginar, armar_pagina
+from app.core.exportacion import formato_respuesta, respuesta_streaming, RESPUESTAS_EXPORTACION
+from app.models.trabajos import Trabajo
+from app.schemas.trabajos import TrabajoCreate, TrabajoRead
+from app.schemas.paginacion import Pagina
+from app.servicios import tareas  # noqa: F401  (registra los tipos válidos)
+from app.servicios.cola_trabajos import TAREAS, encolar, reintentar
+
+router = APIRouter(prefix="/trabajos", tags=["Trabajos"])
+
+
+# ⭐ ENCOLAR
+@router.post("/", response_model=TrabajoRead, status_code=201)
+async def encolar_trabajo(data: TrabajoCreate, db: AsyncSession = Depends(get_db)):
+    if data.tipo not in TAREAS:
+        raise HTTPException(status_code=400, detail=f"Tipo de trabajo desconocido: {data.tipo}")
+
+    id_trabajo = await encolar(
+        db,
+        data.tipo,
+        data.payload,
+        prioridad=data.prioridad,
+        max_intentos=data.max_intentos,
+        clave_unica=data.clave_unica
+    )
+
+    if id_trabajo is None:
+        raise HTTPException(status_code=409, detail="Ya existe un trabajo con esa clave_unica")
+
+    await db.commit()
+    return await db.get(Trabajo, id_trabajo)
+
+
+# ⭐ READ ALL (filtrable por estado / tipo)
+@router.get("/", response_model=Pagina[TrabajoRead], responses=RESPUESTAS_EXPORTACION)
+async def listar_trabajos(
+    estado: Optional[str] = None,
+    tipo: Optional[str] = None,
+    formato: str = Depends(formato_respuesta),
+    pag: ParametrosPagina = Depends(),
+    db: AsyncSession = Depends(get_db)
+):
+    query = select(Trabajo)
+
+    if estado:
+        query = query.where(Trabajo.estado == estado)
+    if tipo:
+        query = query.where(Trabajo.tipo == tipo)
+
+    if formato != "json":
+        return respuesta_streaming(query, TrabajoRead, formato, "trabajos", Trabajo.id_trabajo)
+
+    result = await db.execute(paginar(query, pag, Trabajo.id_trabajo))
+    return armar_pagina(result.scalars().all(), pag, Trabajo.id_trabajo)
+
+
+# ⭐ READ BY ID
+@router.get("/{id_trabajo}", response_model=TrabajoRead)
+async def obtener_trabajo(id_trabajo: int, db: AsyncSession = Depends(get_db)):
+    trabajo = await db.get(Trabajo, id_trabajo)
+
+    if not trabajo:
+        raise HTTPException(status_code=404, detail="Trabajo no encontrado")
+
+    return trabajo
+
+
+# ⭐ REINTENTAR UN TRABAJO MUERTO
+@router.post("/{id_trabajo}/reintentar", response_model=TrabajoRead)
+async def reintentar_trabajo(id_trabajo: int, db: AsyncSession = Depends(get_db)):
+    if not await reintentar(db, id_trabajo):
+        raise HTTPException(status_code=409, detail="Solo se pueden reintentar trabajos muertos")
+
+    await db.commit()
+    return await db.get(Trabajo, id_trabajo, populate_existing=True)
@@ -7,10 +7,14 @@ from passlib.context import CryptContext
 import uuid
 
 from app.core.database import get_db
+from app.core.busqueda import filtro_contiene
+from app.core.paginacion import ParametrosPagina, paginar, armar_pagina
+from app.core.exportacion import formato_respuesta, respuesta_streaming, RESPUESTAS_EXPORTACION
 from app.models.usuarios import Usuario
 from app.models.roles import Rol
 from app.models.usuarios_roles import UsuariosRoles
 from app.schemas.usuarios import UsuarioCreate, UsuarioRead, UsuarioUpdate
+from app.schemas.paginacion import Pagina
 
 router = APIRouter(prefix="/usuarios", tags=["Usuarios"])
 
@@ -66,15 +70,28 @@ async def crear_usuario(data: UsuarioCreate, db: AsyncSession = Depends(get_db))
     )
 
 
+def _usuario_con_rol(u: Usuario, r: Rol) -> UsuarioRead:
+    return UsuarioRead(
+        id_usuario=u.id_usuario,
+        nombre_usuario=u.nombre_usuario,
+        nombre_completo=u.nombre_completo,
+        correo_electronico=u.correo_electronico,
+        estado=u.estado,
+        rol=r.nombre_rol
+    )
+
+
 # ============================================================
 # READ ALL (GET)
 # ============================================================
-@router.get("/", response_model=list[UsuarioRead])
+@router.get("/", response_model=Pagina[UsuarioRead], responses=RESPUESTAS_EXPORTACION)
 async def listar_usuarios(
     rol: str | None = None,
     nombre: str | None = None,
     correo: str | None = None,
     estado: str | None = None,
+    formato: str = Depends(formato_respuesta),
+    pag: ParametrosPagina = Depends(),
     db: AsyncSession = Depends(get_db)
 ):
 
@@ -91,10 +108,10 @@ async def listar_usuarios(
         conditions.append(Rol.nombre_rol == rol)
 
     if nombre:
-        conditions.append(Usuario.nombre_completo.ilike(f"%{nombre}%"))
+        conditions.append(filtro_contiene(Usuario.nombre_completo, nombre))
 
     if correo:
-        conditions.append(Usuario.correo_electronico.ilike(f"%{correo}%"))
+        conditions.append(filtro_contiene(Usuario.correo_electronico, correo))
 
     if estado:
         conditions.append(Usuario.estado == estado)
@@ -102,19 +119,19 @@ async def listar_usuarios(
     if conditions:
         stmt = stmt.where(and_(*conditions))
 
-    rows = (await db.execute(stmt)).all()
-
-    return [
-        UsuarioRead(
-            id_usuario=u.id_usuario,
-            nombre_usuario=u.nombre_usuario,
-            nombre_completo=u.nombre_completo,
-            correo_electronico=u.correo_electronico,
-            estado=u.estado,
-            rol=r.nombre_rol
+    # un usuario con varios roles sale una vez por rol: el rol desempata
+    orden = (Usuario.id_usuario, Rol.id_rol)
+    if formato != "json":
+        return respuesta_streaming(
+            stmt, UsuarioRead, formato, "usuarios", *orden,
+            convertir=lambda f: _usuario_con_rol(*f)
         )
-        for u, r in rows
-    ]
+
+    rows = (await db.execute(paginar(stmt, pag, *orden))).all()
+    pagina = armar_pagina(rows, pag, *orden, clave=lambda f: (f[0].id_usuario, f[1].id_rol))
+
+    pagina["items"] = [_usuario_con_rol(u, r) for u, r in pagina["items"]]
+    return pagina
 
 
 # ============================================================
@@ -2,9 +2,12 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.core.database import get_db
+from app.core.paginacion import ParametrosPagina, paginar, armar_pagina
+from app.core.exportacion import formato_respuesta, respuesta_streaming, RESPUESTAS_EXPORTACION
 
 from app.models.usuarios_roles import UsuariosRoles
 from app.schemas.usuarios_roles import UsuarioRolCreate, UsuarioRolResponse
+from app.schemas.paginacion import Pagina
 
 router = APIRouter(
     prefix="/usuarios-roles",
@@ -40,10 +43,18 @@ async def asignar_rol(datos: UsuarioRolCreate, db: AsyncSession = Depends(get_db
 
 
 # Listar todos los roles asignados
-@router.get("/", response_model=list[UsuarioRolResponse])
-async def listar_asignaciones(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(UsuariosRoles))
-    return result.scalars().all()
+@router.get("/", response_model=Pagina[UsuarioRolResponse], responses=RESPUESTAS_EXPORTACION)
+async def listar_asignaciones(
+    formato: str = Depends(formato_respuesta),
+    pag: ParametrosPagina = Depends(),
+    db: AsyncSession = Depends(get_db)
+):
+    orden = (UsuariosRoles.id_usuario, UsuariosRoles.id_rol)
+    if formato != "json":
+        return respuesta_streaming(select(UsuariosRoles), UsuarioRolResponse, formato, "usuarios_roles", *orden)
+
+    result = await db.execute(paginar(select(UsuariosRoles), pag, *orden))
+    return armar_pagina(result.scalars().all(), pag, *orden)
 
 
 # Eliminar una asignación
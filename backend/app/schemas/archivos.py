@@ -9,6 +9,7 @@ class ArchivoRead(BaseModel):
     ruta_almacenamiento: str
     tipo_archivo: str
     tamaño_bytes: int
+    hash_sha256: str | None = None
     subido_por: UUID | None
     subido_en: datetime
     estado: str   # 👉 NUEVO
@@ -21,3 +22,10 @@ class ArchivoUpdate(BaseModel):
     nombre_archivo: str | None = None
     tipo_archivo: str | None = None
     estado: str | None = None
+
+
+class ResultadoCargaLote(BaseModel):
+    nombre_archivo: str
+    ok: bool
+    archivo: ArchivoRead | None = None
+    error: str | None = None
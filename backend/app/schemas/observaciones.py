@@ -1,7 +1,7 @@
 # app/schemas/observaciones.py
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional
+from typing import Optional, List, Dict
 from uuid import UUID
 
 class ObservacionBase(BaseModel):
@@ -27,3 +27,44 @@ class ObservacionOut(ObservacionBase):
 
     class Config:
         from_attributes = True
+
+
+class RechazoObservacion(BaseModel):
+    fila: int
+    error: str
+
+class ResultadoLoteObservaciones(BaseModel):
+    recibidas: int
+    insertadas: int
+    rechazadas: List[RechazoObservacion]
+
+class PuntoAgregado(BaseModel):
+    inicio: datetime
+    minimo: float
+    maximo: float
+    promedio: float
+    cantidad: int
+    ultimo: float
+
+class SerieAgregada(BaseModel):
+    id_tipo_obs: UUID
+    puntos: List[PuntoAgregado]
+
+class AgregadosObservaciones(BaseModel):
+    ancho_segundos: int
+    fuente: str   # crudo / horario
+    series: List[SerieAgregada]
+
+class VitalActual(BaseModel):
+    valor_numerico: Optional[float] = None
+    valor_texto: Optional[str] = None
+    unidad: Optional[str] = None
+    fecha_hora: datetime
+
+class VitalesAdmision(BaseModel):
+    id_admision: UUID
+    id_paciente: UUID
+    nombre: str
+    apellido: str
+    fecha_ingreso: datetime
+    vitales: Dict[str, VitalActual]   # por codigo de tipo de observación
@@ -25,3 +25,11 @@ class OCRCrudoResponse(OCRCrudoBase):
 
     class Config:
         from_attributes = True
+
+
+class OCRBusquedaHit(BaseModel):
+    id_ocr: UUID
+    id_archivo: UUID
+    pagina: int
+    snippet: str
+    rank: float
@@ -0,0 +1,11 @@
+# app/schemas/paginacion.py
+from typing import Generic, List, Optional, TypeVar
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+
+class Pagina(BaseModel, Generic[T]):
+    items: List[T]
+    # None = no hay más páginas
+    next_cursor: Optional[str] = None
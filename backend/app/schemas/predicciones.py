@@ -0,0 +1,90 @@
+# app/schemas/predicciones.py
+from datetime import datetime
+from typing import Dict, List, Optional
+from uuid import UUID
+from pydantic import BaseModel, Field
+
+# --- Entrada: una fila de características (las que falten se imputan) ---
+class PrediccionEntrada(BaseModel):
+    pulso: Optional[float] = None
+    sistolica: Optional[float] = None
+    diastolica: Optional[float] = None
+    oxigeno: Optional[float] = None
+    temperatura: Optional[float] = None
+    creatinina: Optional[float] = None
+    glucosa: Optional[float] = None
+
+
+class PrediccionLoteEntrada(BaseModel):
+    instancias: List[PrediccionEntrada] = Field(min_length=1, max_length=10_000)
+
+
+# --- Salida ---
+class PrediccionOut(BaseModel):
+    especialidad: str
+    probabilidades: Dict[str, float]
+    imputadas: List[str]
+
+
+class PrediccionLoteOut(BaseModel):
+    version_modelo: int
+    predicciones: List[PrediccionOut]
+
+
+class PrediccionAdmisionOut(PrediccionOut):
+    id_admision: UUID
+    version_modelo: int
+    calculado_hasta: datetime
+    caracteristicas: Dict[str, float]
+
+
+class PrediccionGuardadaOut(BaseModel):
+    id_admision: UUID
+    version_modelo: int
+    especialidad: str
+    probabilidad: float
+    probabilidades: Dict[str, float]
+    calculado_hasta: datetime
+    actualizado_en: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class PuntuacionEntrada(BaseModel):
+    forzar: bool = False
+
+
+# --- Deriva (app/ml/deriva.py) ---
+class DerivaCaracteristicaOut(BaseModel):
+    caracteristica: str
+    n: int
+    media: Optional[float] = None
+    desvio: Optional[float] = None
+    faltantes: Optional[float] = None
+    media_referencia: Optional[float] = None
+    desvio_referencia: Optional[float] = None
+    faltantes_referencia: Optional[float] = None
+    desplazamiento: Optional[float] = None     # (media - media_referencia) / desvio_referencia
+    psi: Optional[float] = None
+    ks: Optional[float] = None
+    fuera_de_rango: Optional[float] = None
+    nivel: Optional[str] = None                # estable / moderada / alta
+
+
+class DerivaClasesOut(BaseModel):
+    proporciones: Dict[str, float]
+    proporciones_referencia: Dict[str, float]
+    psi: Optional[float] = None
+    nivel: Optional[str] = None
+
+
+class DerivaOut(BaseModel):
+    version_modelo: int
+    origen: Optional[str] = None
+    horas: int
+    desde: Optional[datetime] = None
+    referencia_aproximada: bool
+    filas: int
+    nivel: Optional[str] = None
+    caracteristicas: List[DerivaCaracteristicaOut]
+    clases: DerivaClasesOut
@@ -0,0 +1,22 @@
+# app/schemas/sesiones_carga.py
+from uuid import UUID
+from datetime import datetime
+from pydantic import BaseModel, Field
+
+class SesionCargaCreate(BaseModel):
+    nombre_archivo: str
+    tamaño_total: int = Field(gt=0)
+    subido_por: UUID | None = None
+
+
+class SesionCargaRead(BaseModel):
+    id_sesion: UUID
+    nombre_archivo: str
+    tipo_archivo: str
+    tamaño_total: int
+    offset_confirmado: int
+    subido_por: UUID | None
+    creado_en: datetime | None
+    expira_en: datetime
+
+    model_config = {"from_attributes": True}
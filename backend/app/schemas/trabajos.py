@@ -0,0 +1,31 @@
+# app/schemas/trabajos.py
+from datetime import datetime
+from typing import Any, Dict, Optional
+from pydantic import BaseModel, Field
+
+class TrabajoCreate(BaseModel):
+    tipo: str
+    payload: Dict[str, Any] = Field(default_factory=dict)
+    prioridad: int = 0
+    max_intentos: Optional[int] = None
+    clave_unica: Optional[str] = None
+
+
+class TrabajoRead(BaseModel):
+    id_trabajo: int
+    tipo: str
+    payload: Dict[str, Any]
+    prioridad: int
+    estado: str
+    intentos: int
+    max_intentos: int
+    clave_unica: Optional[str]
+    disponible_en: datetime
+    bloqueado_hasta: Optional[datetime]
+    bloqueado_por: Optional[str]
+    ultimo_error: Optional[str]
+    resultado: Optional[Any]
+    creado_en: Optional[datetime]
+    terminado_en: Optional[datetime]
+
+    model_config = {"from_attributes": True}
@@ -0,0 +1,17 @@
+# app/schemas/trabajos_ocr.py
+from uuid import UUID
+from datetime import datetime
+from pydantic import BaseModel
+
+class TrabajoOCRRead(BaseModel):
+    id_archivo: UUID
+    estado: str
+    motor: str | None
+    paginas: int | None
+    intentos: int
+    error: str | None
+    creado_en: datetime | None
+    iniciado_en: datetime | None
+    terminado_en: datetime | None
+
+    model_config = {"from_attributes": True}
@@ -0,0 +1 @@
+# package servicios
\ No newline at end of file
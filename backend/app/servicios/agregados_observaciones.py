@@ -0,0 +1,291 @@
+# app/servicios/agregados_observaciones.py
+# Series temporales agregadas de observaciones numéricas.
+#
+# Los baldes se calculan con date_bin sobre un origen fijo (2000-01-01 UTC),
+# así un balde de N horas siempre empieza en una hora exacta y se puede armar
+# tanto desde las filas crudas como desde el resumen observaciones_horarias.
+# Para rangos largos se combinan: horas ya resumidas desde el rollup y el
+# tramo reciente (todavía no resumido) desde observaciones.
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+from sqlalchemy import (
+    select, delete, union_all, and_, or_, func, literal, literal_column, Integer
+)
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, array_agg, aggregate_order_by
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.types import TIMESTAMP
+
+from app.core.config import settings
+from app.models.marcas_refresco import MarcaRefresco
+from app.models.observaciones import Observacion
+from app.models.observaciones_horarias import ObservacionHoraria
+
+ORIGEN = datetime(2000, 1, 1, tzinfo=timezone.utc)
+HORA = 3600
+
+# fila de marcas_refresco del rollup horario
+MARCA_HORARIAS = "observaciones_horarias"
+
+
+def balde(ancho_segundos: int, columna):
+    # intervalo y origen van inline (son enteros/constantes): así la misma
+    # expresión aparece idéntica en SELECT y GROUP BY
+    return func.date_bin(
+        literal_column(f"interval '{int(ancho_segundos)} seconds'"),
+        columna,
+        literal_column("timestamptz '2000-01-01 00:00:00+00'"),
+        type_=TIMESTAMP(timezone=True)
+    )
+
+
+def piso(instante: datetime, ancho_segundos: int) -> datetime:
+    """Inicio del balde que contiene `instante` (equivale a date_bin)."""
+    if instante.tzinfo is None:
+        # asyncpg interpreta los naive como UTC
+        instante = instante.replace(tzinfo=timezone.utc)
+    pasos = (instante - ORIGEN) // timedelta(seconds=ancho_segundos)
+    return ORIGEN + pasos * timedelta(seconds=ancho_segundos)
+
+
+def _ultimo(valor, orden):
+    return array_agg(aggregate_order_by(valor, orden.desc()))[1]
+
+
+# ---------------------------
+#   CONSULTA
+# ---------------------------
+def _parciales_crudo(ancho: int, filtros: list):
+    b = balde(ancho, Observacion.fecha_hora)
+    return (
+        select(
+            b.label("inicio"),
+            Observacion.id_tipo_obs.label("id_tipo_obs"),
+            func.min(Observacion.valor_numerico).label("minimo"),
+            func.max(Observacion.valor_numerico).label("maximo"),
+            func.sum(Observacion.valor_numerico).label("suma"),
+            func.count(Observacion.valor_numerico).label("cantidad"),
+            func.max(Observacion.fecha_hora).label("ultimo_en"),
+            _ultimo(Observacion.valor_numerico, Observacion.fecha_hora).label("ultimo_valor"),
+        )
+        .where(Observacion.valor_numerico.is_not(None), *filtros)
+        .group_by(b, Observacion.id_tipo_obs)
+    )
+
+
+def _parciales_horario(ancho: int, filtros: list):
+    b = balde(ancho, ObservacionHoraria.hora)
+    return (
+        select(
+            b.label("inicio"),
+            ObservacionHoraria.id_tipo_obs.label("id_tipo_obs"),
+            func.min(ObservacionHoraria.minimo).label("minimo"),
+            func.max(ObservacionHoraria.maximo).label("maximo"),
+            func.sum(ObservacionHoraria.suma).label("suma"),
+            func.sum(ObservacionHoraria.cantidad).label("cantidad"),
+            func.max(ObservacionHoraria.ultimo_en).label("ultimo_en"),
+            _ultimo(ObservacionHoraria.ultimo_valor, ObservacionHoraria.ultimo_en).label("ultimo_valor"),
+        )
+        .where(*filtros)
+        .group_by(b, ObservacionHoraria.id_tipo_obs)
+    )
+
+
+async def rollup_vigente(db: AsyncSession) -> bool:
+    ultima = await db.scalar(select(MarcaRefresco.hasta).where(MarcaRefresco.nombre == MARCA_HORARIAS))
+    limite = datetime.now(timezone.utc) - timedelta(minutes=settings.OBS_HORARIAS_REPASO_MINUTOS)
+    return ultima is not None and ultima >= limite
+
+
+async def agregar_observaciones(
+    db: AsyncSession,
+    tipos: list[UUID],
+    desde: datetime,
+    hasta: datetime,
+    ancho: int,
+    id_paciente: UUID | None = None,
+    id_admision: UUID | None = None,
+    usar_rollup: bool = False
+) -> list:
+    """Devuelve filas (id_tipo_obs, inicio, minimo, maximo, promedio,
+    cantidad, ultimo) ordenadas por tipo e inicio."""
+    base = [Observacion.id_tipo_obs.in_(tipos)]
+    if id_paciente:
+        base.append(Observacion.id_paciente == id_paciente)
+    if id_admision:
+        base.append(Observacion.id_admision == id_admision)
+
+    if usar_rollup:
+        # horas enteras, cerradas y resumidas -> rollup; la hora parcial del
+        # comienzo y el tramo reciente -> crudo, así `desde` es exacto como
+        # en la consulta cruda
+        primera = piso(desde, HORA)
+        if primera < desde:
+            primera += timedelta(hours=1)
+        corte = min(
+            piso(hasta, HORA),
+            piso(datetime.now(timezone.utc) - timedelta(minutes=settings.OBS_HORARIAS_REPASO_MINUTOS), HORA)
+        )
+        partes = [
+            _parciales_horario(ancho, [
+                ObservacionHoraria.id_paciente == id_paciente,
+                ObservacionHoraria.id_tipo_obs.in_(tipos),
+                ObservacionHoraria.hora >= primera,
+                ObservacionHoraria.hora < corte,
+            ]),
+            # si no hay horas enteras (corte <= primera) cubre todo el rango
+            _parciales_crudo(ancho, base + [
+                Observacion.fecha_hora.between(desde, hasta),
+                or_(Observacion.fecha_hora < primera, Observacion.fecha_hora >= corte),
+            ]),
+        ]
+    else:
+        partes = [
+            _parciales_crudo(ancho, base + [Observacion.fecha_hora.between(desde, hasta)])
+        ]
+
+    p = union_all(*partes).subquery()
+    result = await db.execute(
+        select(
+            p.c.id_tipo_obs,
+            p.c.inicio,
+            func.min(p.c.minimo).label("minimo"),
+            func.max(p.c.maximo).label("maximo"),
+            (func.sum(p.c.suma) / func.sum(p.c.cantidad)).label("promedio"),
+            func.sum(p.c.cantidad).cast(Integer).label("cantidad"),
+            _ultimo(p.c.ultimo_valor, p.c.ultimo_en).label("ultimo"),
+        )
+        .group_by(p.c.id_tipo_obs, p.c.inicio)
+        .order_by(p.c.id_tipo_obs, p.c.inicio)
+    )
+    return result.all()
+
+
+# ---------------------------
+#   MANTENIMIENTO DEL ROLLUP
+#   Cada hora afectada se recalcula entera desde observaciones (borrar +
+#   insertar), así una corrección o un borrado no deja el resumen viejo.
+# ---------------------------
+async def _recalcular(db: AsyncSession, afectadas) -> int:
+    """`afectadas`: subconsulta con (id_paciente, id_tipo_obs, hora)."""
+    await db.execute(
+        delete(ObservacionHoraria).where(
+            ObservacionHoraria.id_paciente == afectadas.c.id_paciente,
+            ObservacionHoraria.id_tipo_obs == afectadas.c.id_tipo_obs,
+            ObservacionHoraria.hora == afectadas.c.hora
+        )
+    )
+
+    hora = balde(HORA, Observacion.fecha_hora)
+    agregados = (
+        select(
+            Observacion.id_paciente,
+            Observacion.id_tipo_obs,
+            hora,
+            func.min(Observacion.valor_numerico),
+            func.max(Observacion.valor_numerico),
+            func.sum(Observacion.valor_numerico),
+            func.count(Observacion.valor_numerico),
+            _ultimo(Observacion.valor_numerico, Observacion.fecha_hora),
+            func.max(Observacion.fecha_hora),
+        )
+        .join(afectadas, and_(
+            Observacion.id_paciente == afectadas.c.id_paciente,
+            Observacion.id_tipo_obs == afectadas.c.id_tipo_obs,
+            Observacion.fecha_hora >= afectadas.c.hora,
+            Observacion.fecha_hora < afectadas.c.hora + timedelta(hours=1)
+        ))
+        .where(Observacion.valor_numerico.is_not(None))
+        .group_by(Observacion.id_paciente, Observacion.id_tipo_obs, hora)
+    )
+
+    stmt = pg_insert(ObservacionHoraria).from_select(
+        ["id_paciente", "id_tipo_obs", "hora", "minimo", "maximo", "suma",
+         "cantidad", "ultimo_valor", "ultimo_en"],
+        agregados
+    )
+    # otro refresco concurrente pudo insertar la misma hora
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[
+            ObservacionHoraria.id_paciente,
+            ObservacionHoraria.id_tipo_obs,
+            ObservacionHoraria.hora
+        ],
+        set_={
+            c: stmt.excluded[c]
+            for c in ("minimo", "maximo", "suma", "cantidad", "ultimo_valor", "ultimo_en")
+        } | {"actualizado_en": func.now()}
+    )
+    result = await db.execute(stmt)
+    return result.rowcount
+
+
+async def refrescar_horarias(
+    db: AsyncSession, desde: datetime | None = None, completo: bool = False
+) -> int:
+    """Recalcula las horas que tocaron las observaciones creadas desde
+    `desde` (por defecto, la marca del último refresco menos un margen de
+    repaso para transacciones largas). Sin marca, o con `completo`, lo
+    reconstruye entero.
+
+    La marca (marcas_refresco) solo avanza si lo recorrido la cubre: un
+    `desde` posterior a la marca deja huecos sin resumir. Los recálculos
+    puntuales (recalcular_hora) no la tocan.
+    """
+    if desde is not None and desde.tzinfo is None:
+        desde = desde.replace(tzinfo=timezone.utc)
+
+    # FOR UPDATE: dos refrescos a la vez se ordenan en vez de pisarse
+    marca = await db.scalar(
+        select(MarcaRefresco.hasta)
+        .where(MarcaRefresco.nombre == MARCA_HORARIAS)
+        .with_for_update()
+    )
+    if completo or marca is None:
+        desde = None
+    elif desde is None:
+        desde = marca - timedelta(minutes=settings.OBS_HORARIAS_REPASO_MINUTOS)
+    cubre = desde is None or desde <= marca
+
+    afectadas = (
+        select(
+            Observacion.id_paciente.label("id_paciente"),
+            Observacion.id_tipo_obs.label("id_tipo_obs"),
+            balde(HORA, Observacion.fecha_hora).label("hora")
+        )
+        .where(
+            Observacion.id_paciente.is_not(None),
+            Observacion.id_tipo_obs.is_not(None),
+            Observacion.valor_numerico.is_not(None)
+        )
+        .distinct()
+    )
+    if desde is not None:
+        afectadas = afectadas.where(Observacion.creado_en >= desde)
+
+    filas = await _recalcular(db, afectadas.subquery())
+
+    if cubre:
+        # now() es el inicio de esta transacción: lo creado después entra
+        # en el próximo refresco
+        stmt = pg_insert(MarcaRefresco).values(nombre=MARCA_HORARIAS, hasta=func.now())
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=[MarcaRefresco.nombre],
+            set_={"hasta": stmt.excluded.hasta, "actualizado_en": func.now()}
+        ))
+    return filas
+
+
+async def recalcular_hora(db: AsyncSession, id_paciente, id_tipo_obs, fecha_hora: datetime):
+    """Recalcula la hora de una sola observación (alta/edición/baja puntual)."""
+    if not (id_paciente and id_tipo_obs and fecha_hora):
+        return
+
+    afectadas = select(
+        literal(id_paciente, PG_UUID(as_uuid=True)).label("id_paciente"),
+        literal(id_tipo_obs, PG_UUID(as_uuid=True)).label("id_tipo_obs"),
+        literal(piso(fecha_hora, HORA), TIMESTAMP(timezone=True)).label("hora")
+    ).subquery()
+
+    await _recalcular(db, afectadas)
@@ -0,0 +1,325 @@
+# app/servicios/cola_trabajos.py
+# Cola durable sobre la tabla `trabajos`. Los workers reclaman con
+# FOR UPDATE SKIP LOCKED, así que escalar es levantar más procesos contra
+# la misma base. Un trabajo reclamado queda invisible hasta
+# `bloqueado_hasta` (timeout de visibilidad); si el worker muere, vence y
+# vuelve a pendiente. Los fallos se reintentan con backoff exponencial y,
+# agotados los intentos, el trabajo queda "muerto" (dead letter).
+import asyncio
+import logging
+import os
+import random
+import socket
+import time
+import traceback
+import uuid
+from datetime import timedelta
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import select, update, delete, func, and_, case
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.trabajos import Trabajo
+
+logger = logging.getLogger("uvicorn.error")
+
+Manejador = Callable[[dict], Awaitable[Any]]
+
+TAREAS: dict[str, Manejador] = {}
+PERIODICAS: dict[str, timedelta] = {}
+
+
+def tarea(tipo: str, cada: timedelta | None = None):
+    """Registra un manejador async `f(payload) -> resultado` para `tipo`.
+
+    Con `cada`, los workers lo encolan solos una vez por intervalo.
+    """
+    def registrar(f: Manejador) -> Manejador:
+        TAREAS[tipo] = f
+        if cada:
+            PERIODICAS[tipo] = cada
+        return f
+    return registrar
+
+
+# ---------------------------
+#   PRODUCTOR
+# ---------------------------
+async def encolar(
+    db: AsyncSession,
+    tipo: str,
+    payload: dict | None = None,
+    prioridad: int = 0,
+    retraso: timedelta | None = None,
+    max_intentos: int | None = None,
+    clave_unica: str | None = None
+) -> int | None:
+    """Encola un trabajo y devuelve su id (None si `clave_unica` ya existía).
+
+    No hace commit: el trabajo se publica junto con la transacción del que
+    lo encola.
+    """
+    valores = {
+        "tipo": tipo,
+        "payload": payload or {},
+        "prioridad": prioridad,
+        "max_intentos": max_intentos or settings.COLA_MAX_INTENTOS,
+        "clave_unica": clave_unica,
+    }
+    if retraso:
+        valores["disponible_en"] = func.now() + retraso
+
+    stmt = pg_insert(Trabajo).values(**valores)
+    if clave_unica:
+        stmt = stmt.on_conflict_do_nothing(index_elements=[Trabajo.clave_unica])
+
+    result = await db.execute(stmt.returning(Trabajo.id_trabajo))
+    return result.scalar_one_or_none()
+
+
+# ---------------------------
+#   CONSUMIDOR
+# ---------------------------
+async def reclamar(
+    db: AsyncSession,
+    worker: str,
+    cantidad: int,
+    tipos: list[str] | None = None
+) -> list[Trabajo]:
+    visibilidad = timedelta(seconds=settings.COLA_VISIBILIDAD_SEGUNDOS)
+
+    elegibles = (
+        select(Trabajo.id_trabajo)
+        .where(Trabajo.estado == "pendiente", Trabajo.disponible_en <= func.now())
+        .order_by(Trabajo.prioridad.desc(), Trabajo.disponible_en)
+        .limit(cantidad)
+        .with_for_update(skip_locked=True)
+    )
+    if tipos:
+        elegibles = elegibles.where(Trabajo.tipo.in_(tipos))
+
+    result = await db.execute(
+        update(Trabajo)
+        .where(Trabajo.id_trabajo.in_(elegibles.scalar_subquery()))
+        .values(
+            estado="en_proceso",
+            intentos=Trabajo.intentos + 1,
+            bloqueado_por=worker,
+            bloqueado_hasta=func.now() + visibilidad
+        )
+        .returning(Trabajo)
+    )
+    return list(result.scalars().all())
+
+
+def _es_mio(id_trabajo: int, worker: str):
+    # si el timeout de visibilidad venció y otro worker lo reclamó,
+    # el resultado de este worker se descarta
+    return and_(
+        Trabajo.id_trabajo == id_trabajo,
+        Trabajo.estado == "en_proceso",
+        Trabajo.bloqueado_por == worker
+    )
+
+
+async def completar(db: AsyncSession, id_trabajo: int, worker: str, resultado: Any = None):
+    await db.execute(
+        update(Trabajo)
+        .where(_es_mio(id_trabajo, worker))
+        .values(
+            estado="completado",
+            resultado=resultado,
+            ultimo_error=None,
+            bloqueado_hasta=None,
+            terminado_en=func.now()
+        )
+    )
+
+
+def backoff(intentos: int) -> timedelta:
+    # exponencial con jitter completo, acotado
+    tope = min(
+        settings.COLA_BACKOFF_BASE_SEGUNDOS * 2 ** max(intentos - 1, 0),
+        settings.COLA_BACKOFF_MAX_SEGUNDOS
+    )
+    return timedelta(seconds=random.uniform(tope / 2, tope))
+
+
+async def fallar(db: AsyncSession, trabajo: Trabajo, worker: str, error: str):
+    agotado = trabajo.intentos >= trabajo.max_intentos
+    valores = {"ultimo_error": error[:4000], "bloqueado_hasta": None}
+
+    if agotado:
+        valores.update(estado="muerto", terminado_en=func.now())
+    else:
+        valores.update(estado="pendiente", disponible_en=func.now() + backoff(trabajo.intentos))
+
+    await db.execute(update(Trabajo).where(_es_mio(trabajo.id_trabajo, worker)).values(**valores))
+
+
+async def recuperar_vencidos(db: AsyncSession) -> int:
+    """Devuelve a pendiente (o a muerto) los trabajos cuyo worker dejó de latir."""
+    result = await db.execute(
+        update(Trabajo)
+        .where(Trabajo.estado == "en_proceso", Trabajo.bloqueado_hasta < func.now())
+        .values(
+            estado=case(
+                (Trabajo.intentos >= Trabajo.max_intentos, "muerto"),
+                else_="pendiente"
+            ),
+            bloqueado_por=None,
+            bloqueado_hasta=None,
+            ultimo_error="Timeout de visibilidad vencido"
+        )
+        .returning(Trabajo.id_trabajo)
+    )
+    return len(result.all())
+
+
+async def reintentar(db: AsyncSession, id_trabajo: int) -> bool:
+    """Saca un trabajo de la dead letter y lo deja pendiente de nuevo."""
+    result = await db.execute(
+        update(Trabajo)
+        .where(Trabajo.id_trabajo == id_trabajo, Trabajo.estado == "muerto")
+        .values(
+            estado="pendiente",
+            intentos=0,
+            disponible_en=func.now(),
+            terminado_en=None
+        )
+        .returning(Trabajo.id_trabajo)
+    )
+    return result.scalar_one_or_none() is not None
+
+
+async def purgar_terminados(db: AsyncSession, dias: int | None = None) -> int:
+    dias = dias or settings.COLA_RETENCION_DIAS
+    result = await db.execute(
+        delete(Trabajo)
+        .where(
+            Trabajo.estado == "completado",
+            Trabajo.terminado_en < func.now() - timedelta(days=dias)
+        )
+        .returning(Trabajo.id_trabajo)
+    )
+    return len(result.all())
+
+
+# ---------------------------
+#   WORKER
+# ---------------------------
+class Worker:
+    def __init__(self, concurrencia: int = 4, tipos: list[str] | None = None):
+        self.id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.concurrencia = concurrencia
+        self.tipos = tipos
+        self.activos: dict[int, asyncio.Task] = {}
+        self.detenido = asyncio.Event()
+
+    async def correr(self):
+        logger.info("Worker %s escuchando (%s)", self.id, ", ".join(self.tipos or TAREAS))
+        latido = asyncio.create_task(self._latido())
+        mantenimiento = asyncio.create_task(self._mantenimiento())
+        try:
+            while not self.detenido.is_set():
+                libres = self.concurrencia - len(self.activos)
+                trabajos = []
+                if libres > 0:
+                    try:
+                        async with SessionLocal() as db:
+                            trabajos = await reclamar(db, self.id, libres, self.tipos)
+                            await db.commit()
+                    except Exception as e:
+                        logger.error("Worker %s: no se pudo reclamar: %s", self.id, e)
+
+                for trabajo in trabajos:
+                    tarea_ = asyncio.create_task(self._ejecutar(trabajo))
+                    self.activos[trabajo.id_trabajo] = tarea_
+                    tarea_.add_done_callback(
+                        lambda _, i=trabajo.id_trabajo: self.activos.pop(i, None)
+                    )
+
+                if not trabajos:
+                    try:
+                        await asyncio.wait_for(self.detenido.wait(), settings.COLA_SONDEO_SEGUNDOS)
+                    except asyncio.TimeoutError:
+                        pass
+                elif len(self.activos) >= self.concurrencia:
+                    await asyncio.wait(list(self.activos.values()), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            if self.activos:
+                await asyncio.gather(*self.activos.values(), return_exceptions=True)
+            latido.cancel()
+            mantenimiento.cancel()
+
+    def detener(self):
+        self.detenido.set()
+
+    async def _ejecutar(self, trabajo: Trabajo):
+        manejador = TAREAS.get(trabajo.tipo)
+        inicio = time.perf_counter()
+        try:
+            if manejador is None:
+                raise LookupError(f"No hay manejador registrado para '{trabajo.tipo}'")
+            resultado = await manejador(trabajo.payload or {})
+        except Exception:
+            error = traceback.format_exc()
+            logger.error("Trabajo %s (%s) falló: %s", trabajo.id_trabajo, trabajo.tipo, error)
+            async with SessionLocal() as db:
+                await fallar(db, trabajo, self.id, error)
+                await db.commit()
+            return
+
+        async with SessionLocal() as db:
+            await completar(db, trabajo.id_trabajo, self.id, resultado)
+            await db.commit()
+        logger.info(
+            "Trabajo %s (%s) completado en %.2fs",
+            trabajo.id_trabajo, trabajo.tipo, time.perf_counter() - inicio
+        )
+
+    async def _latido(self):
+        # extiende la visibilidad de lo que sigue corriendo
+        visibilidad = timedelta(seconds=settings.COLA_VISIBILIDAD_SEGUNDOS)
+        while True:
+            await asyncio.sleep(settings.COLA_VISIBILIDAD_SEGUNDOS / 3)
+            if not self.activos:
+                continue
+            try:
+                async with SessionLocal() as db:
+                    await db.execute(
+                        update(Trabajo)
+                        .where(
+                            Trabajo.id_trabajo.in_(list(self.activos)),
+                            Trabajo.bloqueado_por == self.id,
+                            Trabajo.estado == "en_proceso"
+                        )
+                        .values(bloqueado_hasta=func.now() + visibilidad)
+                    )
+                    await db.commit()
+            except Exception as e:
+                logger.error("Worker %s: falló el latido: %s", self.id, e)
+
+    async def _mantenimiento(self):
+        while True:
+            try:
+                async with SessionLocal() as db:
+                    await recuperar_vencidos(db)
+                    await encolar_periodicas(db)
+                    await purgar_terminados(db)
+                    await db.commit()
+            except Exception as e:
+                logger.error("Worker %s: falló el mantenimiento: %s", self.id, e)
+            await asyncio.sleep(30)
+
+
+async def encolar_periodicas(db: AsyncSession):
+    # una clave por intervalo: aunque haya N workers, se encola una sola vez
+    ahora = time.time()
+    for tipo, cada in PERIODICAS.items():
+        segundos = cada.total_seconds()
+        ventana = int(ahora // segundos)
+        await encolar(db, tipo, clave_unica=f"periodica:{tipo}:{ventana}")
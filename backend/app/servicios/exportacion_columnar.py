@@ -0,0 +1,189 @@
+# app/servicios/exportacion_columnar.py
+# Exportación a Parquet / Arrow IPC para análisis.
+#
+# Las filas salen de un cursor del servidor de a EXPORTAR_FILAS_POR_GRUPO
+# y cada tanda se convierte en un RecordBatch columnar y se escribe como
+# un row group; la memoria queda acotada a una tanda. La conversión y la
+# escritura corren en el threadpool para no frenar el event loop.
+#
+# Incremental: cada exportación devuelve una marca de agua (creado_en) y la
+# siguiente pide `desde` esa marca. La marca queda EXPORTAR_MARGEN_SEGUNDOS
+# por detrás de now(): una transacción que seguía abierta al exportar
+# confirma filas con un creado_en anterior a su commit, y sin el margen la
+# próxima exportación incremental se las saltearía.
+#
+# Requiere pyarrow (opcional): se importa al usarse.
+import json
+import os
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import select, func, types as sqltypes
+from starlette.concurrency import run_in_threadpool
+
+from app.core.almacenamiento import eliminar_silencioso
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.admisiones import Admision
+from app.models.diagnosticos_secundarios import DiagnosticoSecundario
+from app.models.observaciones import Observacion
+
+TABLAS = {
+    "observaciones": Observacion.__table__,
+    "admisiones": Admision.__table__,
+    "diagnosticos_secundarios": DiagnosticoSecundario.__table__,
+}
+
+FORMATOS = {
+    "parquet": ("parquet", "application/vnd.apache.parquet"),
+    "arrow": ("arrow", "application/vnd.apache.arrow.file"),
+}
+
+
+class ExportacionNoDisponible(RuntimeError):
+    pass
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        raise ExportacionNoDisponible("La exportación columnar requiere pyarrow (pip install pyarrow)")
+    return pyarrow
+
+
+# ---------------------------
+#   TIPOS
+# ---------------------------
+def _tipo_arrow(pa, tipo):
+    if isinstance(tipo, sqltypes.Uuid):
+        return pa.string()
+    if isinstance(tipo, sqltypes.DateTime):
+        return pa.timestamp("us", tz="UTC") if tipo.timezone else pa.timestamp("us")
+    if isinstance(tipo, sqltypes.Date):
+        return pa.date32()
+    if isinstance(tipo, sqltypes.Numeric):
+        return pa.float64()
+    if isinstance(tipo, sqltypes.Integer):
+        return pa.int64()
+    return pa.string()
+
+
+def _conversor(tipo):
+    # a valores que pa.array acepta sin adivinar
+    if isinstance(tipo, sqltypes.Uuid):
+        return lambda v: None if v is None else str(v)
+    if isinstance(tipo, sqltypes.Numeric) and not isinstance(tipo, sqltypes.Float):
+        return lambda v: float(v) if isinstance(v, Decimal) else v
+    if isinstance(tipo, sqltypes.JSON):
+        return lambda v: None if v is None else json.dumps(v, ensure_ascii=False)
+    return None
+
+
+class _Escritor:
+    def __init__(self, ruta: str, columnas, formato: str):
+        pa = _pyarrow()
+        self.pa = pa
+        self.esquema = pa.schema([
+            pa.field(c.name, _tipo_arrow(pa, c.type), nullable=c.nullable) for c in columnas
+        ])
+        self.conversores = [_conversor(c.type) for c in columnas]
+        self.formato = formato
+
+        if formato == "parquet":
+            self.writer = pa.parquet.ParquetWriter(
+                ruta, self.esquema, compression=settings.EXPORTAR_PARQUET_COMPRESION
+            )
+        else:
+            self.sink = pa.OSFile(ruta, "wb")
+            self.writer = pa.ipc.new_file(self.sink, self.esquema)
+
+    def escribir(self, filas: list):
+        valores = zip(*filas)
+        arrays = []
+        for campo, convertir, columna in zip(self.esquema, self.conversores, valores):
+            if convertir:
+                columna = [convertir(v) for v in columna]
+            arrays.append(self.pa.array(columna, type=campo.type))
+
+        lote = self.pa.RecordBatch.from_arrays(arrays, schema=self.esquema)
+        if self.formato == "parquet":
+            # una tanda = un row group
+            self.writer.write_batch(lote, row_group_size=len(filas))
+        else:
+            self.writer.write_batch(lote)
+
+    def cerrar(self):
+        self.writer.close()
+        if self.formato != "parquet":
+            self.sink.close()
+
+
+# ---------------------------
+#   EXPORTAR
+# ---------------------------
+async def exportar(
+    tabla: str,
+    destino: str,
+    formato: str = "parquet",
+    condiciones: list | None = None,
+    desde: datetime | None = None
+) -> dict:
+    """Escribe `tabla` en `destino` (vía .part + rename).
+
+    `condiciones` son filtros SQL extra (p. ej. FiltrosObservaciones);
+    con `desde` solo se exportan filas con creado_en posterior. Devuelve
+    {filas, grupos, marca_agua, ...}; marca_agua es el `desde` de la
+    próxima exportación incremental.
+    """
+    if tabla not in TABLAS:
+        raise ValueError(f"Tabla no exportable: {tabla}")
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato no soportado: {formato}")
+    _pyarrow()
+
+    t = TABLAS[tabla]
+    columnas = list(t.columns)
+    parcial = f"{destino}.{uuid.uuid4().hex}.part"
+    filas = grupos = 0
+
+    async with SessionLocal() as db:
+        marca_agua = await db.scalar(
+            select(func.now() - timedelta(seconds=settings.EXPORTAR_MARGEN_SEGUNDOS))
+        )
+
+        stmt = select(*columnas).where(t.c.creado_en <= marca_agua)
+        if desde is not None:
+            stmt = stmt.where(t.c.creado_en > desde)
+        if condiciones:
+            stmt = stmt.where(*condiciones)
+        stmt = stmt.order_by(t.c.creado_en).execution_options(
+            yield_per=settings.EXPORTAR_FILAS_POR_GRUPO
+        )
+
+        escritor = await run_in_threadpool(_Escritor, parcial, columnas, formato)
+        try:
+            try:
+                result = await db.stream(stmt)
+                async for tanda in result.partitions():
+                    await run_in_threadpool(escritor.escribir, tanda)
+                    filas += len(tanda)
+                    grupos += 1
+            finally:
+                await run_in_threadpool(escritor.cerrar)
+            await run_in_threadpool(os.replace, parcial, destino)
+        except BaseException:
+            await run_in_threadpool(eliminar_silencioso, parcial)
+            raise
+
+    return {
+        "tabla": tabla,
+        "formato": formato,
+        "ruta": destino,
+        "filas": filas,
+        "grupos": grupos,
+        "desde": desde,
+        "marca_agua": marca_agua,
+    }
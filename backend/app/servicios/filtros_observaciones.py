@@ -0,0 +1,110 @@
+# app/servicios/filtros_observaciones.py
+# Filtros de GET /observaciones, compartidos con las exportaciones.
+# Se usa como dependencia (`filtros: FiltrosObservaciones = Depends()`) o
+# construyéndola a mano desde la CLI.
+from datetime import datetime
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy import and_
+
+from app.core.busqueda import filtro_contiene
+from app.models.observaciones import Observacion
+
+
+def _validar_rango(inicio, fin, nombre):
+    if inicio is not None and fin is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Debe especificar el valor final para el rango de {nombre}"
+        )
+    if fin is not None and inicio is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Debe especificar el valor inicial para el rango de {nombre}"
+        )
+
+
+class FiltrosObservaciones:
+    def __init__(
+        self,
+        id_paciente: UUID | None = None,
+        id_admision: UUID | None = None,
+        id_tipo_obs: UUID | None = None,
+        id_archivo: UUID | None = None,
+        id_ocr: UUID | None = None,
+
+        creado_inicio: datetime | None = None,
+        creado_fin: datetime | None = None,
+
+        fecha_hora_inicio: datetime | None = None,
+        fecha_hora_fin: datetime | None = None,
+
+        valor_numerico_inicio: float | None = None,
+        valor_numerico_fin: float | None = None,
+
+        valor_texto: str | None = None,
+        unidad: str | None = None
+    ):
+        _validar_rango(creado_inicio, creado_fin, "creado_en")
+        _validar_rango(fecha_hora_inicio, fecha_hora_fin, "fecha_hora")
+        _validar_rango(valor_numerico_inicio, valor_numerico_fin, "valor_numerico")
+
+        self.id_paciente = id_paciente
+        self.id_admision = id_admision
+        self.id_tipo_obs = id_tipo_obs
+        self.id_archivo = id_archivo
+        self.id_ocr = id_ocr
+        self.creado_inicio = creado_inicio
+        self.creado_fin = creado_fin
+        self.fecha_hora_inicio = fecha_hora_inicio
+        self.fecha_hora_fin = fecha_hora_fin
+        self.valor_numerico_inicio = valor_numerico_inicio
+        self.valor_numerico_fin = valor_numerico_fin
+        self.valor_texto = valor_texto
+        self.unidad = unidad
+
+    def condiciones(self) -> list:
+        filtros = []
+
+        # ---------------- FILTROS DIRECTOS ----------------
+        if self.id_paciente:
+            filtros.append(Observacion.id_paciente == self.id_paciente)
+
+        if self.id_admision:
+            filtros.append(Observacion.id_admision == self.id_admision)
+
+        if self.id_tipo_obs:
+            filtros.append(Observacion.id_tipo_obs == self.id_tipo_obs)
+
+        if self.id_archivo:
+            filtros.append(Observacion.id_archivo == self.id_archivo)
+
+        if self.id_ocr:
+            filtros.append(Observacion.id_ocr == self.id_ocr)
+
+        # ---------------- FILTROS POR RANGO ----------------
+        # fecha_hora acota las particiones que se recorren
+        if self.creado_inicio and self.creado_fin:
+            filtros.append(Observacion.creado_en.between(self.creado_inicio, self.creado_fin))
+
+        if self.fecha_hora_inicio and self.fecha_hora_fin:
+            filtros.append(Observacion.fecha_hora.between(self.fecha_hora_inicio, self.fecha_hora_fin))
+
+        if self.valor_numerico_inicio is not None and self.valor_numerico_fin is not None:
+            filtros.append(
+                Observacion.valor_numerico.between(self.valor_numerico_inicio, self.valor_numerico_fin)
+            )
+
+        # ---------------- FILTROS DE TEXTO ----------------
+        if self.valor_texto:
+            filtros.append(filtro_contiene(Observacion.valor_texto, self.valor_texto))
+
+        if self.unidad:
+            filtros.append(filtro_contiene(Observacion.unidad, self.unidad))
+
+        return filtros
+
+    def aplicar(self, stmt):
+        filtros = self.condiciones()
+        return stmt.where(and_(*filtros)) if filtros else stmt
@@ -0,0 +1,164 @@
+# app/servicios/ingesta_observaciones.py
+# Carga masiva de observaciones (monitores, interfaces de laboratorio).
+# Las filas se validan en tandas: el esquema fila por fila, las claves
+# foráneas con una consulta `= ANY(array)` por columna y por tanda, y las
+# válidas entran por COPY binario de asyncpg en la misma transacción.
+import csv
+import uuid
+from decimal import Decimal
+from typing import AsyncIterator, Iterable
+
+from pydantic import ValidationError
+from sqlalchemy import select, insert, any_, literal
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.admisiones import Admision
+from app.models.archivos import Archivo
+from app.models.observaciones import Observacion
+from app.models.ocr_crudo import OCRCrudo
+from app.models.pacientes import Paciente
+from app.models.tipos_observacion import TipoObservacion
+from app.schemas.observaciones import ObservacionCreate
+from app.servicios.ultimas_observaciones import registrar_nuevas
+
+# orden de las columnas en COPY / INSERT. El id se genera acá para poder
+# actualizar observaciones_ultimas sin releer lo copiado.
+COLUMNAS = [
+    "id_observacion",
+    "id_paciente",
+    "id_admision",
+    "id_tipo_obs",
+    "fecha_hora",
+    "valor_numerico",
+    "valor_texto",
+    "unidad",
+    "id_archivo",
+    "id_ocr",
+]
+
+CLAVES_FORANEAS = {
+    "id_paciente": Paciente.id_paciente,
+    "id_admision": Admision.id_admision,
+    "id_tipo_obs": TipoObservacion.id_tipo_obs,
+    "id_archivo": Archivo.id_archivo,
+    "id_ocr": OCRCrudo.id_ocr,
+}
+
+
+# ---------------------------
+#   LECTURA DEL CUERPO
+#   Un registro por línea tanto en NDJSON como en CSV (con cabecera).
+# ---------------------------
+async def leer_lineas(bloques: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    resto = b""
+    async for bloque in bloques:
+        resto += bloque
+        *lineas, resto = resto.split(b"\n")
+        for linea in lineas:
+            yield linea.rstrip(b"\r").decode("utf-8-sig")
+    if resto.strip():
+        yield resto.decode("utf-8-sig")
+
+
+def parsear_ndjson(lineas: Iterable[tuple[int, str]]):
+    """Devuelve (validas, rechazos); `validas` son (nro_fila, ObservacionCreate)."""
+    validas, rechazos = [], []
+    for nro, linea in lineas:
+        try:
+            validas.append((nro, ObservacionCreate.model_validate_json(linea)))
+        except ValidationError as e:
+            rechazos.append({"fila": nro, "error": _resumir_error(e)})
+    return validas, rechazos
+
+
+def parsear_csv(lineas: Iterable[tuple[int, str]], cabecera: list[str]):
+    validas, rechazos = [], []
+    numeros = [nro for nro, _ in lineas]
+    lector = csv.DictReader((linea for _, linea in lineas), fieldnames=cabecera)
+    for nro, registro in zip(numeros, lector):
+        # en CSV el vacío es NULL
+        datos = {k: (v if v != "" else None) for k, v in registro.items() if k}
+        try:
+            validas.append((nro, ObservacionCreate.model_validate(datos)))
+        except ValidationError as e:
+            rechazos.append({"fila": nro, "error": _resumir_error(e)})
+    return validas, rechazos
+
+
+def _resumir_error(e: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(p) for p in err['loc']) or 'fila'}: {err['msg']}"
+        for err in e.errors()
+    )
+
+
+# ---------------------------
+#   VALIDACIÓN DE CLAVES FORÁNEAS
+# ---------------------------
+async def validar_claves(db: AsyncSession, filas: list[tuple[int, ObservacionCreate]]):
+    """Separa las filas cuyas claves foráneas no existen. Una consulta por
+    columna, sin importar el tamaño de la tanda."""
+    faltantes: dict[str, set] = {}
+
+    for campo, columna in CLAVES_FORANEAS.items():
+        ids = {getattr(obs, campo) for _, obs in filas} - {None}
+        if not ids:
+            continue
+
+        result = await db.execute(
+            select(columna).where(
+                columna == any_(literal(list(ids), ARRAY(UUID(as_uuid=True))))
+            )
+        )
+        faltantes[campo] = ids - set(result.scalars().all())
+
+    validas, rechazos = [], []
+    for nro, obs in filas:
+        errores = [
+            f"{campo} {getattr(obs, campo)} no existe"
+            for campo, ids in faltantes.items()
+            if getattr(obs, campo) in ids
+        ]
+        if errores:
+            rechazos.append({"fila": nro, "error": "; ".join(errores)})
+        else:
+            validas.append(obs)
+
+    return validas, rechazos
+
+
+# ---------------------------
+#   CARGA
+# ---------------------------
+def _registro(obs: ObservacionCreate) -> tuple:
+    valores = obs.model_dump()
+    valores["id_observacion"] = uuid.uuid4()
+    if valores["valor_numerico"] is not None:
+        # la columna es NUMERIC: se evita arrastrar el error binario del float
+        valores["valor_numerico"] = Decimal(str(valores["valor_numerico"]))
+    return tuple(valores[c] for c in COLUMNAS)
+
+
+async def insertar_observaciones(db: AsyncSession, observaciones: list[ObservacionCreate]) -> int:
+    """Inserta sin commit y actualiza observaciones_ultimas. Usa COPY si el
+    driver es asyncpg; si no, INSERT multi-fila."""
+    if not observaciones:
+        return 0
+
+    registros = [_registro(obs) for obs in observaciones]
+
+    conexion = await db.connection()
+    crudo = (await conexion.get_raw_connection()).driver_connection
+
+    if hasattr(crudo, "copy_records_to_table"):
+        await crudo.copy_records_to_table(
+            Observacion.__tablename__, records=registros, columns=COLUMNAS
+        )
+    else:
+        # executemany: SQLAlchemy lo agrupa en INSERT ... VALUES (...), (...)
+        await db.execute(insert(Observacion), [dict(zip(COLUMNAS, r)) for r in registros])
+
+    await registrar_nuevas(db, [dict(zip(COLUMNAS, r)) for r in registros])
+
+    return len(registros)
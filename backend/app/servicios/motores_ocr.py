@@ -0,0 +1,142 @@
+# app/servicios/motores_ocr.py
+# Motores de OCR intercambiables. Todo lo de este módulo corre dentro de
+# los procesos del pool, así que las funciones de entrada (contar_paginas,
+# reconocer_pagina) son de nivel módulo y reciben el nombre del motor en
+# lugar de la instancia.
+import re
+import time
+from abc import ABC, abstractmethod
+
+
+class MotorOCR(ABC):
+    nombre = "base"
+
+    @abstractmethod
+    def contar_paginas(self, ruta: str, tipo: str) -> int:
+        ...
+
+    @abstractmethod
+    def reconocer_pagina(self, ruta: str, tipo: str, pagina: int) -> tuple[str, float | None]:
+        """Devuelve (texto, confianza media 0-100) de la página `pagina` (1-based)."""
+
+
+# ---------------------------
+#   TESSERACT (local)
+#   Requiere pytesseract + binario tesseract, Pillow, y pypdfium2 para
+#   partir PDFs. Se importan al usarse para que el stub no los necesite.
+# ---------------------------
+class MotorTesseract(MotorOCR):
+    nombre = "tesseract"
+
+    def __init__(self, idioma: str = "spa", dpi: int = 300):
+        self.idioma = idioma
+        self.dpi = dpi
+
+    def contar_paginas(self, ruta, tipo):
+        if tipo != "pdf":
+            return 1
+        import pypdfium2 as pdfium
+        pdf = pdfium.PdfDocument(ruta)
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+
+    def _imagen(self, ruta, tipo, pagina):
+        if tipo != "pdf":
+            from PIL import Image
+            return Image.open(ruta)
+        import pypdfium2 as pdfium
+        pdf = pdfium.PdfDocument(ruta)
+        try:
+            return pdf[pagina - 1].render(scale=self.dpi / 72).to_pil()
+        finally:
+            pdf.close()
+
+    def reconocer_pagina(self, ruta, tipo, pagina):
+        import pytesseract
+
+        datos = pytesseract.image_to_data(
+            self._imagen(ruta, tipo, pagina),
+            lang=self.idioma,
+            output_type=pytesseract.Output.DICT
+        )
+
+        # reconstruye líneas a partir de las palabras
+        lineas = {}
+        confianzas = []
+        for texto, conf, bloque, parrafo, linea in zip(
+            datos["text"], datos["conf"], datos["block_num"], datos["par_num"], datos["line_num"]
+        ):
+            if not texto.strip():
+                continue
+            lineas.setdefault((bloque, parrafo, linea), []).append(texto)
+            if float(conf) >= 0:
+                confianzas.append(float(conf))
+
+        texto = "\n".join(" ".join(palabras) for palabras in lineas.values())
+        confianza = sum(confianzas) / len(confianzas) if confianzas else None
+        return texto, confianza
+
+
+# ---------------------------
+#   STUB (tests / entornos sin tesseract)
+#   No hace OCR: cuenta páginas de forma aproximada y devuelve texto fijo.
+# ---------------------------
+class MotorStub(MotorOCR):
+    nombre = "stub"
+
+    def __init__(self, **_):
+        pass
+
+    def contar_paginas(self, ruta, tipo):
+        if tipo != "pdf":
+            return 1
+        with open(ruta, "rb") as f:
+            paginas = len(re.findall(rb"/Type\s*/Page(?!s)", f.read()))
+        return max(paginas, 1)
+
+    def reconocer_pagina(self, ruta, tipo, pagina):
+        return f"[stub] página {pagina}", 100.0
+
+
+MOTORES: dict[str, type[MotorOCR]] = {
+    MotorTesseract.nombre: MotorTesseract,
+    MotorStub.nombre: MotorStub,
+}
+
+
+def registrar_motor(clase: type[MotorOCR]):
+    """Permite enchufar otro motor; debe registrarse antes de crear el pool."""
+    MOTORES[clase.nombre] = clase
+    return clase
+
+
+_instancias: dict[tuple, MotorOCR] = {}
+
+
+def obtener_motor(nombre: str, idioma: str, dpi: int) -> MotorOCR:
+    clave = (nombre, idioma, dpi)
+    if clave not in _instancias:
+        if nombre not in MOTORES:
+            raise ValueError(f"Motor OCR desconocido: {nombre}")
+        _instancias[clave] = MOTORES[nombre](idioma=idioma, dpi=dpi)
+    return _instancias[clave]
+
+
+# ---------------------------
+#   ENTRADAS DEL PROCESS POOL
+# ---------------------------
+def contar_paginas(motor: str, idioma: str, dpi: int, ruta: str, tipo: str) -> int:
+    return obtener_motor(motor, idioma, dpi).contar_paginas(ruta, tipo)
+
+
+def reconocer_pagina(motor: str, idioma: str, dpi: int, ruta: str, tipo: str, pagina: int) -> dict:
+    inicio = time.perf_counter()
+    texto, confianza = obtener_motor(motor, idioma, dpi).reconocer_pagina(ruta, tipo, pagina)
+    return {
+        "pagina": pagina,
+        "texto": texto,
+        "confianza": confianza,
+        "segundos": round(time.perf_counter() - inicio, 3),
+    }
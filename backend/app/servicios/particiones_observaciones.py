@@ -0,0 +1,203 @@
+# app/servicios/particiones_observaciones.py
+# Particiones mensuales de observaciones (RANGE sobre fecha_hora).
+#
+# - Cada mes es una tabla observaciones_pAAAA_MM con límites en UTC; las
+#   consultas con rango de fecha_hora solo tocan los meses que cubre.
+# - observaciones_default recibe lo que no tenga partición (cargas
+#   históricas, fechas mal tipeadas). Al crear el mes que falta, sus filas
+#   se mueven a la partición nueva antes de adjuntarla.
+# - Los meses vencidos se desprenden (DETACH) y pasan al esquema de
+#   archivo o se borran: vacuum e índices de la tabla viva no crecen
+#   con el histórico.
+#
+# Las funciones aceptan una sesión o una conexión (la migración v0004
+# las usa) y no hacen commit.
+import logging
+import re
+from datetime import date, datetime, timezone
+
+from sqlalchemy import text
+
+from app.core.config import settings
+
+logger = logging.getLogger("uvicorn.error")
+
+TABLA = "observaciones"
+DEFECTO = "observaciones_default"
+
+PATRON_NOMBRE = re.compile(r"^observaciones_p(\d{4})_(\d{2})$")
+
+
+def inicio_mes(d: date | datetime) -> date:
+    return date(d.year, d.month, 1)
+
+
+def sumar_meses(mes: date, n: int) -> date:
+    total = mes.year * 12 + mes.month - 1 + n
+    return date(total // 12, total % 12 + 1, 1)
+
+
+def nombre_particion(mes: date) -> str:
+    return f"{TABLA}_p{mes:%Y_%m}"
+
+
+def _limite(mes: date) -> str:
+    # literal explícito en UTC: un '2026-10-01' a secas dependería del TimeZone de la sesión
+    return f"'{mes.isoformat()} 00:00:00+00'"
+
+
+async def _bloquear(db):
+    # dos workers manteniendo particiones a la vez se pisarían el DDL
+    await db.execute(text("SELECT pg_advisory_xact_lock(hashtext('particiones_observaciones'))"))
+
+
+# ---------------------------
+#   CONSULTA
+# ---------------------------
+async def listar_particiones(db) -> list[dict]:
+    result = await db.execute(text(f"""
+        SELECT c.relname AS nombre,
+               pg_get_expr(c.relpartbound, c.oid) AS limites,
+               greatest(c.reltuples, 0)::bigint AS filas_estimadas,
+               pg_total_relation_size(c.oid) AS bytes
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = '{TABLA}'::regclass
+        ORDER BY c.relname
+    """))
+    return [dict(f) for f in result.mappings().all()]
+
+
+async def meses_particionados(db) -> list[date]:
+    meses = []
+    for p in await listar_particiones(db):
+        m = PATRON_NOMBRE.match(p["nombre"])
+        if m:
+            meses.append(date(int(m.group(1)), int(m.group(2)), 1))
+    return sorted(meses)
+
+
+# ---------------------------
+#   CREACIÓN
+# ---------------------------
+async def asegurar_defecto(db):
+    await db.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFECTO} PARTITION OF {TABLA} DEFAULT"))
+
+
+async def crear_particion(db, mes: date) -> bool:
+    """Crea la partición de `mes`. Devuelve False si ya existía."""
+    nombre = nombre_particion(mes)
+    if await db.scalar(text("SELECT to_regclass(:n)"), {"n": nombre}) is not None:
+        return False
+
+    desde, hasta = _limite(mes), _limite(sumar_meses(mes, 1))
+    rango = f"FOR VALUES FROM ({desde}) TO ({hasta})"
+
+    en_defecto = await db.scalar(text(f"""
+        SELECT EXISTS (
+            SELECT 1 FROM {DEFECTO} WHERE fecha_hora >= {desde} AND fecha_hora < {hasta}
+        )
+    """))
+
+    if not en_defecto:
+        await db.execute(text(f"CREATE TABLE {nombre} PARTITION OF {TABLA} {rango}"))
+        return True
+
+    # hay filas de ese mes en default: se crea suelta, se le pasan las filas
+    # y se adjunta. El CHECK equivalente al rango evita que ATTACH la recorra.
+    logger.info("Particiones: moviendo filas de %s a %s", DEFECTO, nombre)
+    await db.execute(text(f"CREATE TABLE {nombre} (LIKE {TABLA} INCLUDING DEFAULTS)"))
+    await db.execute(text(f"""
+        ALTER TABLE {nombre} ADD CONSTRAINT {nombre}_rango
+            CHECK (fecha_hora >= {desde} AND fecha_hora < {hasta})
+    """))
+    # la FK de revision_observaciones se verifica al commit, con las filas
+    # ya en la partición adjunta
+    await db.execute(text("SET CONSTRAINTS ALL DEFERRED"))
+    await db.execute(text(f"""
+        WITH movidas AS (
+            DELETE FROM {DEFECTO}
+            WHERE fecha_hora >= {desde} AND fecha_hora < {hasta}
+            RETURNING *
+        )
+        INSERT INTO {nombre} SELECT * FROM movidas
+    """))
+    await db.execute(text(f"ALTER TABLE {TABLA} ATTACH PARTITION {nombre} {rango}"))
+    await db.execute(text(f"ALTER TABLE {nombre} DROP CONSTRAINT {nombre}_rango"))
+    return True
+
+
+async def asegurar_particiones(
+    db,
+    desde: date | None = None,
+    hasta: date | None = None
+) -> list[str]:
+    """Crea default y los meses de `desde` a `hasta` inclusive.
+
+    Por defecto: del mes actual a OBS_PARTICIONES_MESES_ADELANTE meses más.
+    """
+    await _bloquear(db)
+    actual = inicio_mes(datetime.now(timezone.utc))
+    mes = inicio_mes(desde) if desde else actual
+    hasta = inicio_mes(hasta) if hasta else sumar_meses(actual, settings.OBS_PARTICIONES_MESES_ADELANTE)
+
+    await asegurar_defecto(db)
+    creadas = []
+    while mes <= hasta:
+        if await crear_particion(db, mes):
+            creadas.append(nombre_particion(mes))
+        mes = sumar_meses(mes, 1)
+
+    if creadas:
+        logger.info("Particiones creadas: %s", ", ".join(creadas))
+    return creadas
+
+
+# ---------------------------
+#   ARCHIVO
+# ---------------------------
+async def archivar_particiones(db, retencion_meses: int, eliminar: bool = False) -> list[str]:
+    """Desprende los meses anteriores a `retencion_meses` y los mueve al
+    esquema OBS_PARTICIONES_ESQUEMA_ARCHIVO (o los borra con `eliminar`).
+
+    Las filas desprendidas dejan de verse desde la API; el rollup horario
+    ya calculado se conserva. Un mes con observaciones revisadas no se
+    puede desprender (FK de revision_observaciones): se saltea.
+    """
+    if retencion_meses < 1:
+        raise ValueError("La retención tiene que ser de al menos un mes")
+
+    await _bloquear(db)
+    limite = sumar_meses(inicio_mes(datetime.now(timezone.utc)), -retencion_meses)
+    esquema = settings.OBS_PARTICIONES_ESQUEMA_ARCHIVO
+
+    archivadas = []
+    for mes in await meses_particionados(db):
+        if mes >= limite:
+            break
+
+        nombre = nombre_particion(mes)
+        revisadas = await db.scalar(text(f"""
+            SELECT EXISTS (
+                SELECT 1 FROM revision_observaciones r
+                JOIN {nombre} o USING (id_observacion, fecha_hora)
+            )
+        """))
+        if revisadas:
+            logger.warning("Particiones: %s tiene observaciones revisadas, no se archiva", nombre)
+            continue
+
+        await db.execute(text(f"ALTER TABLE {TABLA} DETACH PARTITION {nombre}"))
+        if eliminar:
+            await db.execute(text(f"DROP TABLE {nombre}"))
+        else:
+            await db.execute(text(f"CREATE SCHEMA IF NOT EXISTS {esquema}"))
+            await db.execute(text(f"ALTER TABLE {nombre} SET SCHEMA {esquema}"))
+        archivadas.append(nombre)
+
+    if archivadas:
+        logger.info(
+            "Particiones %s: %s", "eliminadas" if eliminar else f"archivadas en {esquema}",
+            ", ".join(archivadas)
+        )
+    return archivadas
@@ -0,0 +1,306 @@
+# app/servicios/pipeline_ocr.py
+# Pipeline de OCR en segundo plano: descubre archivos nuevos, reclama
+# trabajos con SKIP LOCKED (varios procesos `python -m app.cli ocr` pueden
+# correrlo a la vez), parte cada documento en páginas y las reconoce en un
+# pool de procesos. Las filas de ocr_crudo de un documento entran en un
+# solo INSERT multi-fila junto con el cambio de estado del trabajo.
+#
+# Cada reclamo lleva un token y el pipeline late (latido_en) por todo lo
+# que tiene en vuelo; un trabajo se vuelve a reclamar solo si pasaron
+# OCR_TIMEOUT_MINUTOS sin latido, y el resultado se guarda solo si el token
+# sigue siendo el vigente. Corre en su propio proceso, no en la API: el
+# pool de OCR ocupa todos los núcleos.
+import asyncio
+import logging
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+from sqlalchemy import select, insert, update, and_, or_, exists, func, case, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.archivos import Archivo
+from app.models.ocr_crudo import OCRCrudo
+from app.models.trabajos_ocr import TrabajoOCR
+from app.servicios import motores_ocr
+
+logger = logging.getLogger("uvicorn.error")
+
+VENTANA_DESCUBRIMIENTO = timedelta(hours=24)
+FILAS_POR_INSERT = 500
+
+
+# ---------------------------
+#   COLA EN BASE DE DATOS
+# ---------------------------
+async def descubrir_archivos(db: AsyncSession) -> None:
+    """Crea trabajos pendientes para los archivos recientes que no tienen uno."""
+    candidatos = (
+        select(Archivo.id_archivo)
+        .where(
+            Archivo.estado == "activo",
+            Archivo.subido_en > func.now() - VENTANA_DESCUBRIMIENTO,
+            ~exists().where(TrabajoOCR.id_archivo == Archivo.id_archivo)
+        )
+    )
+    await db.execute(
+        pg_insert(TrabajoOCR)
+        .from_select(["id_archivo"], candidatos)
+        .on_conflict_do_nothing()
+    )
+
+
+async def encolar_archivo(db: AsyncSession, id_archivo) -> None:
+    """Pone (o vuelve a poner) un archivo en la cola de OCR."""
+    stmt = pg_insert(TrabajoOCR).values(id_archivo=id_archivo, estado="pendiente")
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[TrabajoOCR.id_archivo],
+            set_={"estado": "pendiente", "intentos": 0, "error": None}
+        )
+    )
+
+
+async def reclamar_trabajos(db: AsyncSession, cantidad: int, motor: str) -> list:
+    """Marca hasta `cantidad` trabajos como procesando y devuelve
+    (id_archivo, ruta, tipo, token). Los que pasaron más de
+    OCR_TIMEOUT_MINUTOS sin latido (worker caído) se vuelven a reclamar, o
+    pasan a error si ya agotaron OCR_MAX_INTENTOS."""
+    colgado = func.now() - timedelta(minutes=settings.OCR_TIMEOUT_MINUTOS)
+    token = uuid.uuid4()
+    sin_latido = and_(
+        TrabajoOCR.estado == "procesando",
+        func.coalesce(TrabajoOCR.latido_en, TrabajoOCR.iniciado_en) < colgado
+    )
+
+    # p. ej. un archivo que tira abajo el worker en cada intento
+    await db.execute(
+        update(TrabajoOCR)
+        .where(sin_latido, TrabajoOCR.intentos >= settings.OCR_MAX_INTENTOS)
+        .values(
+            estado="error",
+            error=(
+                f"El worker dejó de responder en el intento {settings.OCR_MAX_INTENTOS} "
+                f"(sin latido por más de {settings.OCR_TIMEOUT_MINUTOS} minutos)"
+            ),
+            token_reclamo=None,
+            terminado_en=func.now()
+        )
+    )
+
+    elegibles = (
+        select(TrabajoOCR.id_archivo)
+        .where(
+            or_(
+                TrabajoOCR.estado == "pendiente",
+                and_(sin_latido, TrabajoOCR.intentos < settings.OCR_MAX_INTENTOS)
+            )
+        )
+        .order_by(TrabajoOCR.creado_en)
+        .limit(cantidad)
+        .with_for_update(skip_locked=True)
+    )
+
+    result = await db.execute(
+        update(TrabajoOCR)
+        .where(TrabajoOCR.id_archivo.in_(elegibles.scalar_subquery()))
+        .values(
+            estado="procesando",
+            motor=motor,
+            iniciado_en=func.now(),
+            latido_en=func.now(),
+            token_reclamo=token,
+            intentos=TrabajoOCR.intentos + 1,
+            error=None
+        )
+        .returning(TrabajoOCR.id_archivo)
+    )
+    ids = result.scalars().all()
+    if not ids:
+        return []
+
+    result = await db.execute(
+        select(Archivo.id_archivo, Archivo.ruta_almacenamiento, Archivo.tipo_archivo)
+        .where(Archivo.id_archivo.in_(ids))
+    )
+    return [(*fila, token) for fila in result.all()]
+
+
+def _reclamo_vigente(id_archivo, token):
+    # si el trabajo se volvió a reclamar, el resultado de este worker se descarta
+    return and_(
+        TrabajoOCR.id_archivo == id_archivo,
+        TrabajoOCR.estado == "procesando",
+        TrabajoOCR.token_reclamo == token
+    )
+
+
+# ---------------------------
+#   PIPELINE
+# ---------------------------
+class PipelineOCR:
+    def __init__(self, motor: str | None = None, procesos: int | None = None):
+        self.motor = motor or settings.OCR_MOTOR
+        # se instancia acá: un motor desconocido o incompleto falla al
+        # arrancar y no dentro del pool a mitad de un trabajo
+        motores_ocr.obtener_motor(self.motor, settings.OCR_IDIOMA, settings.OCR_DPI)
+        self.procesos = procesos or settings.OCR_PROCESOS or os.cpu_count() or 1
+        # cola acotada: nunca se reclaman más trabajos de los que caben,
+        # así el productor frena cuando los consumidores no dan abasto
+        self.cola: asyncio.Queue = asyncio.Queue(maxsize=settings.OCR_COLA_MAX)
+        self.pool: ProcessPoolExecutor | None = None
+        self.tareas: list[asyncio.Task] = []
+        # reclamados y todavía sin terminar (en la cola o procesando): {id_archivo: token}
+        self.en_vuelo: dict = {}
+
+    def asegurar_pool(self) -> ProcessPoolExecutor:
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.procesos)
+        return self.pool
+
+    async def iniciar(self):
+        self.asegurar_pool()
+        self.tareas = [asyncio.create_task(self._productor()), asyncio.create_task(self._latido())]
+        self.tareas += [
+            asyncio.create_task(self._consumidor())
+            for _ in range(settings.OCR_DOCUMENTOS_EN_VUELO)
+        ]
+        logger.info("Pipeline OCR iniciado (motor=%s, procesos=%s)", self.motor, self.procesos)
+
+    async def detener(self):
+        for tarea in self.tareas:
+            tarea.cancel()
+        await asyncio.gather(*self.tareas, return_exceptions=True)
+        if self.pool:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+
+    async def _productor(self):
+        while True:
+            reclamados = 0
+            try:
+                libres = self.cola.maxsize - self.cola.qsize()
+                if libres > 0:
+                    async with SessionLocal() as db:
+                        await descubrir_archivos(db)
+                        trabajos = await reclamar_trabajos(db, libres, self.motor)
+                        await db.commit()
+
+                    for trabajo in trabajos:
+                        self.en_vuelo[trabajo[0]] = trabajo[3]
+                        self.cola.put_nowait(trabajo)
+                    reclamados = len(trabajos)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("OCR: no se pudieron reclamar trabajos: %s", e)
+
+            # si se llenó la tanda probablemente hay más: no dormir
+            if not reclamados or self.cola.full():
+                await asyncio.sleep(settings.OCR_INTERVALO_SEGUNDOS)
+
+    async def _latido(self):
+        while True:
+            await asyncio.sleep(settings.OCR_LATIDO_SEGUNDOS)
+            if not self.en_vuelo:
+                continue
+            try:
+                async with SessionLocal() as db:
+                    await db.execute(
+                        update(TrabajoOCR)
+                        .where(
+                            tuple_(TrabajoOCR.id_archivo, TrabajoOCR.token_reclamo).in_(list(self.en_vuelo.items())),
+                            TrabajoOCR.estado == "procesando"
+                        )
+                        .values(latido_en=func.now())
+                    )
+                    await db.commit()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("OCR: falló el latido: %s", e)
+
+    async def _consumidor(self):
+        while True:
+            id_archivo, ruta, tipo, token = await self.cola.get()
+            try:
+                await self.procesar(id_archivo, ruta, tipo, token)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("OCR falló para %s: %s", id_archivo, e)
+                await self._marcar_error(id_archivo, token, e)
+            finally:
+                self.en_vuelo.pop(id_archivo, None)
+                self.cola.task_done()
+
+    async def procesar(self, id_archivo, ruta: str, tipo: str, token):
+        loop = asyncio.get_running_loop()
+        self.asegurar_pool()
+        args = (self.motor, settings.OCR_IDIOMA, settings.OCR_DPI, ruta, tipo)
+
+        paginas = await loop.run_in_executor(self.pool, motores_ocr.contar_paginas, *args)
+
+        # una tarea por página: un PDF largo se reparte entre todos los núcleos
+        resultados = await asyncio.gather(*(
+            loop.run_in_executor(self.pool, motores_ocr.reconocer_pagina, *args, pagina)
+            for pagina in range(1, paginas + 1)
+        ))
+
+        filas = [
+            {
+                "id_ocr": uuid.uuid4(),
+                "id_archivo": id_archivo,
+                "pagina": r["pagina"],
+                "texto": r["texto"],
+                "metadata_json": {
+                    "origen": "pipeline",
+                    "motor": self.motor,
+                    "idioma": settings.OCR_IDIOMA,
+                    "dpi": settings.OCR_DPI,
+                    "confianza": r["confianza"],
+                    "segundos": r["segundos"],
+                },
+            }
+            for r in resultados
+        ]
+
+        async with SessionLocal() as db:
+            # primero el estado: toma el lock de la fila y confirma el token
+            result = await db.execute(
+                update(TrabajoOCR)
+                .where(_reclamo_vigente(id_archivo, token))
+                .values(estado="completado", paginas=paginas, terminado_en=func.now())
+                .returning(TrabajoOCR.id_archivo)
+            )
+            if result.scalar_one_or_none() is None:
+                await db.rollback()
+                logger.warning("OCR de %s descartado: el trabajo fue reclamado de nuevo", id_archivo)
+                return
+
+            for i in range(0, len(filas), FILAS_POR_INSERT):
+                await db.execute(insert(OCRCrudo).values(filas[i:i + FILAS_POR_INSERT]))
+            await db.commit()
+
+    async def _marcar_error(self, id_archivo, token, error: Exception):
+        # vuelve a pendiente hasta agotar OCR_MAX_INTENTOS
+        try:
+            async with SessionLocal() as db:
+                await db.execute(
+                    update(TrabajoOCR)
+                    .where(_reclamo_vigente(id_archivo, token))
+                    .values(
+                        estado=case(
+                            (TrabajoOCR.intentos >= settings.OCR_MAX_INTENTOS, "error"),
+                            else_="pendiente"
+                        ),
+                        error=str(error)[:2000],
+                        terminado_en=func.now()
+                    )
+                )
+                await db.commit()
+        except Exception as e:
+            logger.error("OCR: no se pudo registrar el error de %s: %s", id_archivo, e)
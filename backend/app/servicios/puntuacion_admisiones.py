@@ -0,0 +1,146 @@
+# app/servicios/puntuacion_admisiones.py
+# Puntuación en lote de las admisiones activas.
+#
+# Por cada tanda de ML_PUNTUAR_LOTE admisiones: una consulta arma la matriz
+# de características (app/ml/caracteristicas.py), otra trae el hash y la
+# versión de la predicción guardada, y solo las filas cuyo hash o modelo
+# cambiaron se puntúan (una llamada vectorizada) y se escriben con INSERT
+# multi-fila ... ON CONFLICT DO UPDATE. El hash se calcula en NumPy sobre
+# los bits float32 de cada fila. Las filas puntuadas se suman a los
+# estadísticos de deriva (origen "puntuacion", app/ml/deriva.py).
+from datetime import datetime, timezone
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import select, func, literal
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.ml import deriva
+from app.ml.caracteristicas import admisiones_activas, matriz_caracteristicas
+from app.ml.modelo import ArtefactoModelo
+from app.ml.motor_numpy import elegir_motor
+from app.models.predicciones_admision import PrediccionAdmision
+
+FILAS_POR_UPSERT = 1000
+
+FNV_BASE = np.uint64(0xCBF29CE484222325)
+FNV_PRIMO = np.uint64(0x100000001B3)
+
+
+def huella(X: np.ndarray, observado: np.ndarray) -> np.ndarray:
+    """Hash FNV-1a de 64 bits por fila sobre (bits float32, observado); int64 para BIGINT."""
+    bits = np.ascontiguousarray(X, dtype=np.float32).view(np.uint32).astype(np.uint64)
+    bits |= observado.astype(np.uint64) << np.uint64(32)
+
+    h = np.full(len(X), FNV_BASE, dtype=np.uint64)
+    for j in range(bits.shape[1]):  # por columna, no por paciente
+        h ^= bits[:, j]
+        h *= FNV_PRIMO
+    return h.view(np.int64)
+
+
+async def _previas(db: AsyncSession, ids: list[UUID]) -> tuple[np.ndarray, np.ndarray]:
+    """(hash, versión) guardados para `ids`, en el mismo orden; versión -1 si no hay."""
+    entrada = (
+        func.unnest(literal(ids, ARRAY(PG_UUID(as_uuid=True))))
+        .table_valued("id_admision", with_ordinality="fila")
+        .render_derived()
+    )
+    result = await db.execute(
+        select(
+            func.coalesce(PrediccionAdmision.hash_caracteristicas, 0),
+            func.coalesce(PrediccionAdmision.version_modelo, -1),
+        )
+        .select_from(entrada)
+        .outerjoin(PrediccionAdmision, PrediccionAdmision.id_admision == entrada.c.id_admision)
+        .order_by(entrada.c.fila)
+    )
+    filas = result.all()
+    if not filas:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    previas = np.array(filas, dtype=np.int64)
+    return previas[:, 0], previas[:, 1]
+
+
+async def _guardar(db: AsyncSession, filas: list[dict]):
+    for inicio in range(0, len(filas), FILAS_POR_UPSERT):
+        stmt = pg_insert(PrediccionAdmision).values(filas[inicio:inicio + FILAS_POR_UPSERT])
+        await db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[PrediccionAdmision.id_admision],
+                set_={
+                    "version_modelo": stmt.excluded.version_modelo,
+                    "especialidad": stmt.excluded.especialidad,
+                    "probabilidad": stmt.excluded.probabilidad,
+                    "probabilidades": stmt.excluded.probabilidades,
+                    "hash_caracteristicas": stmt.excluded.hash_caracteristicas,
+                    "calculado_hasta": stmt.excluded.calculado_hasta,
+                    "actualizado_en": func.now(),
+                }
+            )
+        )
+
+
+async def puntuar_admisiones(
+    db: AsyncSession,
+    artefacto: ArtefactoModelo,
+    ids_admision: list[UUID] | None = None,
+    forzar: bool = False,
+    hasta: datetime | None = None
+) -> dict:
+    """Puntúa `ids_admision` (por defecto todas las activas) y guarda lo que cambió.
+
+    No hace commit. Con `forzar` se reescriben todas aunque el hash coincida.
+    """
+    motor = elegir_motor(artefacto)
+    clases = artefacto.clases
+    hasta = hasta or datetime.now(timezone.utc)
+
+    if ids_admision is None:
+        ids_admision = await admisiones_activas(db)
+
+    estadisticos = deriva.Estadisticos.vacio(len(clases))
+    puntuadas = 0
+    for inicio in range(0, len(ids_admision), settings.ML_PUNTUAR_LOTE):
+        ids = ids_admision[inicio:inicio + settings.ML_PUNTUAR_LOTE]
+        m = await matriz_caracteristicas(db, ids, hasta, relleno=artefacto.relleno)
+        hashes = huella(m.X, m.observado)
+
+        cambiadas = np.ones(len(ids), dtype=bool)
+        if not forzar:
+            previos, versiones = await _previas(db, ids)
+            cambiadas = (hashes != previos) | (versiones != artefacto.version)
+
+        indices = np.flatnonzero(cambiadas)
+        if not len(indices):
+            continue
+
+        P = motor.predecir_proba(m.X[indices])
+        ganadoras = P.argmax(axis=1)
+        estadisticos.agregar(np.where(m.observado[indices], m.X[indices], np.nan), ganadoras)
+        await _guardar(db, [
+            {
+                "id_admision": ids[i],
+                "version_modelo": artefacto.version,
+                "especialidad": clases[g],
+                "probabilidad": float(p[g]),
+                "probabilidades": dict(zip(clases, map(float, p))),
+                "hash_caracteristicas": int(hashes[i]),
+                "calculado_hasta": hasta,
+            }
+            for i, g, p in zip(indices.tolist(), ganadoras.tolist(), P)
+        ])
+        puntuadas += len(indices)
+
+    if puntuadas:
+        await deriva.guardar(db, artefacto.version, "puntuacion", estadisticos)
+
+    return {
+        "admisiones": len(ids_admision),
+        "puntuadas": puntuadas,
+        "sin_cambios": len(ids_admision) - puntuadas,
+        "version_modelo": artefacto.version,
+    }
@@ -0,0 +1,86 @@
+# app/servicios/tareas.py
+# Manejadores de la cola de trabajos. Importar este módulo los registra;
+# lo hacen tanto el worker como la API (para validar los tipos al encolar).
+from datetime import timedelta
+
+from app.core.almacenamiento import barrer_contenidos
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.ml import modelo
+from app.routers.cargas_archivos import barrer_sesiones_expiradas
+from app.servicios.agregados_observaciones import refrescar_horarias
+from app.servicios.cola_trabajos import tarea
+from app.servicios.particiones_observaciones import asegurar_particiones, archivar_particiones
+from app.servicios.puntuacion_admisiones import puntuar_admisiones
+
+_artefacto: modelo.ArtefactoModelo | None = None
+
+
+@tarea(
+    "barrer_sesiones_carga",
+    cada=timedelta(seconds=settings.UPLOAD_BARRIDO_SEGUNDOS)
+)
+async def barrer_sesiones_carga(payload: dict):
+    return {"expiradas": await barrer_sesiones_expiradas()}
+
+
+@tarea(
+    "barrer_contenidos_archivo",
+    cada=timedelta(seconds=settings.UPLOAD_BARRIDO_SEGUNDOS)
+)
+async def barrer_contenidos_archivo(payload: dict):
+    async with SessionLocal() as db:
+        borrados = await barrer_contenidos(db)
+        await db.commit()
+    return {"blobs": borrados}
+
+
+@tarea(
+    "refrescar_observaciones_horarias",
+    cada=timedelta(minutes=settings.OBS_HORARIAS_REFRESCO_MINUTOS)
+)
+async def refrescar_observaciones_horarias(payload: dict):
+    async with SessionLocal() as db:
+        filas = await refrescar_horarias(db)
+        await db.commit()
+    return {"horas": filas}
+
+
+@tarea(
+    "mantener_particiones_observaciones",
+    cada=timedelta(hours=settings.OBS_PARTICIONES_REVISION_HORAS)
+)
+async def mantener_particiones_observaciones(payload: dict):
+    async with SessionLocal() as db:
+        creadas = await asegurar_particiones(db)
+        archivadas = []
+        if settings.OBS_PARTICIONES_RETENCION_MESES:
+            archivadas = await archivar_particiones(db, settings.OBS_PARTICIONES_RETENCION_MESES)
+        await db.commit()
+    return {"creadas": creadas, "archivadas": archivadas}
+
+
+def _modelo_vigente() -> modelo.ArtefactoModelo:
+    # se carga una vez por worker y se recarga cuando aparece una versión nueva
+    global _artefacto
+    if _artefacto is None or (
+        not settings.ML_MODELO_RUTA and (modelo.versiones() or [None])[-1] != _artefacto.version
+    ):
+        _artefacto = modelo.cargar()
+    return _artefacto
+
+
+@tarea(
+    "puntuar_admisiones",
+    cada=timedelta(minutes=settings.ML_PUNTUAR_MINUTOS) if settings.ML_PUNTUAR_MINUTOS else None
+)
+async def puntuar_admisiones_activas(payload: dict):
+    try:
+        artefacto = _modelo_vigente()
+    except modelo.ModeloNoDisponible as e:
+        return {"omitido": str(e)}
+
+    async with SessionLocal() as db:
+        resultado = await puntuar_admisiones(db, artefacto, forzar=bool(payload.get("forzar")))
+        await db.commit()
+    return resultado
@@ -0,0 +1,143 @@
+# app/servicios/ultimas_observaciones.py
+# Mantiene observaciones_ultimas, el último valor de cada (paciente, tipo).
+#
+# - Altas (router y carga masiva): upsert que solo pisa la fila si la
+#   observación nueva es igual o más reciente. Es incremental y seguro con
+#   escrituras concurrentes (el ON CONFLICT toma el lock de la fila).
+# - Ediciones y bajas: el par afectado se recalcula desde observaciones
+#   con un LATERAL ... ORDER BY fecha_hora DESC LIMIT 1 por par, que
+#   resuelve el índice (id_paciente, id_tipo_obs, fecha_hora).
+from datetime import timezone
+
+from sqlalchemy import select, delete, literal, true
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import func
+
+from app.models.observaciones import Observacion
+from app.models.observaciones_ultimas import ObservacionUltima
+
+CAMPOS = [
+    "id_paciente",
+    "id_tipo_obs",
+    "id_observacion",
+    "id_admision",
+    "fecha_hora",
+    "valor_numerico",
+    "valor_texto",
+    "unidad",
+]
+
+# 8 parámetros por fila; asyncpg admite 32767 por sentencia
+FILAS_POR_UPSERT = 2000
+
+
+def _instante(f: dict):
+    # asyncpg toma los naive como UTC: se comparan igual
+    fh = f["fecha_hora"]
+    return fh.replace(tzinfo=timezone.utc) if fh.tzinfo is None else fh
+
+
+def _ultima_de_cada_par(filas: list[dict]) -> list[dict]:
+    ultimas: dict[tuple, dict] = {}
+    for f in filas:
+        if f["id_paciente"] is None or f["id_tipo_obs"] is None:
+            continue
+        par = (f["id_paciente"], f["id_tipo_obs"])
+        if par not in ultimas or _instante(f) >= _instante(ultimas[par]):
+            ultimas[par] = f
+    return list(ultimas.values())
+
+
+async def registrar_nuevas(db: AsyncSession, filas: list[dict]):
+    """Aplica observaciones recién insertadas (dicts con CAMPOS). Sin commit."""
+    valores = [{c: f[c] for c in CAMPOS} for f in _ultima_de_cada_par(filas)]
+    if not valores:
+        return
+
+    # orden fijo de locks entre lotes concurrentes
+    valores.sort(key=lambda v: (str(v["id_paciente"]), str(v["id_tipo_obs"])))
+
+    for i in range(0, len(valores), FILAS_POR_UPSERT):
+        stmt = pg_insert(ObservacionUltima).values(valores[i:i + FILAS_POR_UPSERT])
+        await db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[ObservacionUltima.id_paciente, ObservacionUltima.id_tipo_obs],
+                set_={c: stmt.excluded[c] for c in CAMPOS[2:]} | {"actualizado_en": func.now()},
+                where=stmt.excluded.fecha_hora >= ObservacionUltima.fecha_hora
+            )
+        )
+
+
+def fila_de(obs: Observacion) -> dict:
+    return {c: getattr(obs, c) for c in CAMPOS}
+
+
+async def recalcular_pares(db: AsyncSession, pares: set[tuple]):
+    """Recalcula desde observaciones los (id_paciente, id_tipo_obs) dados."""
+    pares = sorted(
+        {(p, t) for p, t in pares if p is not None and t is not None},
+        key=lambda par: (str(par[0]), str(par[1]))
+    )
+    if not pares:
+        return
+
+    arreglo = ARRAY(UUID(as_uuid=True))
+    par = (
+        func.unnest(
+            literal([p for p, _ in pares], arreglo),
+            literal([t for _, t in pares], arreglo)
+        )
+        .table_valued("id_paciente", "id_tipo_obs")
+        .render_derived(name="par")
+    )
+
+    await db.execute(
+        delete(ObservacionUltima).where(
+            ObservacionUltima.id_paciente == par.c.id_paciente,
+            ObservacionUltima.id_tipo_obs == par.c.id_tipo_obs
+        )
+    )
+
+    ultima = (
+        select(*(getattr(Observacion, c) for c in CAMPOS))
+        .where(
+            Observacion.id_paciente == par.c.id_paciente,
+            Observacion.id_tipo_obs == par.c.id_tipo_obs
+        )
+        .order_by(Observacion.fecha_hora.desc(), Observacion.creado_en.desc())
+        .limit(1)
+        .lateral("ultima")
+    )
+
+    await db.execute(
+        pg_insert(ObservacionUltima).from_select(
+            CAMPOS,
+            select(*(ultima.c[c] for c in CAMPOS)).select_from(par.join(ultima, true()))
+        )
+    )
+
+
+async def reconstruir_ultimas(db: AsyncSession) -> int:
+    """Reconstruye la proyección completa con un DISTINCT ON. Sin commit."""
+    await db.execute(delete(ObservacionUltima))
+
+    result = await db.execute(
+        pg_insert(ObservacionUltima).from_select(
+            CAMPOS,
+            select(*(getattr(Observacion, c) for c in CAMPOS))
+            .where(
+                Observacion.id_paciente.is_not(None),
+                Observacion.id_tipo_obs.is_not(None)
+            )
+            .distinct(Observacion.id_paciente, Observacion.id_tipo_obs)
+            .order_by(
+                Observacion.id_paciente,
+                Observacion.id_tipo_obs,
+                Observacion.fecha_hora.desc(),
+                Observacion.creado_en.desc()
+            )
+        )
+    )
+    return result.rowcount
@@ -0,0 +1,89 @@
+# tests/test_deriva.py
+# Estadísticos de deriva: acumulación por lotes, histogramas y PSI/KS.
+import numpy as np
+import pytest
+
+from app.ml.caracteristicas import CARACTERISTICAS
+from app.ml.deriva import BALDES, RANGOS, Estadisticos, ks, psi
+
+N_CLASES = 4
+
+
+def _datos(n: int, semilla: int, corrimiento: float = 0.0) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(semilla)
+    bajo = np.array([RANGOS[c][0] for c in CARACTERISTICAS])
+    alto = np.array([RANGOS[c][1] for c in CARACTERISTICAS])
+    # un 10 % más allá de cada extremo, para llenar los baldes de desborde
+    margen = (alto - bajo) * 0.1
+    X = rng.uniform(bajo - margen, alto + margen, size=(n, len(CARACTERISTICAS))) + corrimiento * (alto - bajo)
+    X[rng.random(X.shape) < 0.15] = np.nan
+    return X, rng.integers(N_CLASES, size=n)
+
+
+def _acumular(X: np.ndarray, y: np.ndarray, lotes: int) -> Estadisticos:
+    e = Estadisticos.vacio(N_CLASES)
+    for Xl, yl in zip(np.array_split(X, lotes), np.array_split(y, lotes)):
+        e.agregar(Xl, yl)
+    return e
+
+
+def test_media_y_varianza_por_lotes():
+    X, y = _datos(5000, 0)
+    e = _acumular(X, y, 7)
+
+    np.testing.assert_array_equal(e.n, (~np.isnan(X)).sum(axis=0))
+    np.testing.assert_array_equal(e.faltantes, np.isnan(X).sum(axis=0))
+    np.testing.assert_allclose(e.media, np.nanmean(X, axis=0), rtol=1e-10)
+    np.testing.assert_allclose(e.varianza(), np.nanvar(X, axis=0, ddof=1), rtol=1e-9)
+    np.testing.assert_array_equal(e.clases, np.bincount(y, minlength=N_CLASES))
+
+
+def test_combinar_equivale_a_un_solo_acumulador():
+    X, y = _datos(3000, 1)
+    partes = [Estadisticos.vacio(N_CLASES).agregar(Xl, yl)
+              for Xl, yl in zip(np.array_split(X, 3), np.array_split(y, 3))]
+    juntos = partes[0].combinar(partes[1]).combinar(partes[2])
+    uno = Estadisticos.vacio(N_CLASES).agregar(X, y)
+
+    np.testing.assert_allclose(juntos.media, uno.media, rtol=1e-10)
+    np.testing.assert_allclose(juntos.m2, uno.m2, rtol=1e-9)
+    np.testing.assert_array_equal(juntos.histogramas, uno.histogramas)
+
+
+def test_histogramas_coinciden_con_np_histogram():
+    X, y = _datos(5000, 2)
+    e = _acumular(X, y, 5)
+
+    for k, c in enumerate(CARACTERISTICAS):
+        bajo, alto = RANGOS[c]
+        x = X[:, k][~np.isnan(X[:, k])]
+        dentro = x[(x >= bajo) & (x < alto)]
+        esperado, _ = np.histogram(dentro, bins=np.linspace(bajo, alto, BALDES + 1))
+        assert e.histogramas[k, 0] == (x < bajo).sum()
+        assert e.histogramas[k, -1] == (x >= alto).sum()
+        np.testing.assert_array_equal(e.histogramas[k, 1:-1], esperado)
+
+
+def test_ida_y_vuelta_por_dict():
+    X, y = _datos(1000, 3)
+    e = Estadisticos.vacio(N_CLASES).agregar(X, y)
+    r = Estadisticos.desde_dict(e.a_dict())
+
+    for campo in ("n", "media", "m2", "faltantes", "histogramas", "clases"):
+        np.testing.assert_array_equal(getattr(r, campo), getattr(e, campo))
+
+
+def test_psi_y_ks():
+    X, y = _datos(20000, 4)
+    e = Estadisticos.vacio(N_CLASES).agregar(X, y)
+    assert psi(e.histogramas[0], e.histogramas[0]) == pytest.approx(0.0, abs=1e-12)
+    assert ks(e.histogramas[0], e.histogramas[0]) == pytest.approx(0.0, abs=1e-12)
+
+    # misma distribución, otra muestra: PSI chico
+    misma = Estadisticos.vacio(N_CLASES).agregar(*_datos(20000, 5))
+    assert psi(misma.histogramas[0], e.histogramas[0]) < 0.05
+
+    # corrida un 30 % del rango: PSI alto
+    corrida = Estadisticos.vacio(N_CLASES).agregar(*_datos(20000, 6, corrimiento=0.3))
+    assert psi(corrida.histogramas[0], e.histogramas[0]) > 0.25
+    assert ks(corrida.histogramas[0], e.histogramas[0]) > 0.2
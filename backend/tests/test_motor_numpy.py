@@ -0,0 +1,59 @@
+# tests/test_motor_numpy.py
+# Paridad del motor NumPy contra predict_proba de sklearn.
+import warnings
+
+import numpy as np
+import pytest
+
+from app.ml.datos_sinteticos import ESPECIALIDADES, generar_dataset
+from app.ml.modelo import entrenar
+from app.ml.motor_numpy import MotorNumpy, filas_de_prueba, verificar_paridad
+
+TOLERANCIA = 1e-4
+
+
+def _entrenar(X, y, clases):
+    # pocas iteraciones: alcanza con que los pesos no sean los iniciales
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return entrenar(X, y, clases, max_iter=200, prueba=0)
+
+
+@pytest.fixture(scope="module")
+def dataset():
+    return generar_dataset(n_por_clase=100, semilla=0)
+
+
+@pytest.fixture(scope="module")
+def multiclase(dataset):
+    X, y = dataset
+    return _entrenar(X, y, ESPECIALIDADES)
+
+
+@pytest.fixture(scope="module")
+def binario(dataset):
+    X, y = dataset
+    dos = y < 2
+    return _entrenar(X[dos], y[dos], ESPECIALIDADES[:2])
+
+
+@pytest.mark.parametrize("nombre", ["multiclase", "binario"])
+def test_paridad(nombre, request):
+    artefacto = request.getfixturevalue(nombre)
+    assert verificar_paridad(artefacto, n=2000, tolerancia=TOLERANCIA) <= TOLERANCIA
+
+
+def test_paridad_binario_dos_columnas(binario):
+    P = MotorNumpy(binario).predecir_proba(filas_de_prueba(binario, 10))
+    assert P.shape == (10, 2)
+    np.testing.assert_allclose(P.sum(axis=1), 1, atol=1e-5)
+
+
+def test_paridad_con_faltantes(multiclase):
+    X = filas_de_prueba(multiclase, 2000)
+    rng = np.random.default_rng(1)
+    X[rng.random(X.shape) < 0.3] = np.nan
+    X[0] = np.nan  # una fila sin ningún dato: todo sale de `relleno`
+
+    P = MotorNumpy(multiclase).predecir_proba(X)
+    assert np.abs(P - multiclase.predecir_proba(X)).max() <= TOLERANCIA
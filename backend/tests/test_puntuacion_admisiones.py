@@ -0,0 +1,45 @@
+# tests/test_puntuacion_admisiones.py
+# Huella de las filas de características: decide qué admisiones se vuelven a puntuar.
+import numpy as np
+
+from app.ml.caracteristicas import CARACTERISTICAS, VALORES_REFERENCIA, imputar
+from app.servicios.puntuacion_admisiones import huella
+
+
+def _filas(n: int = 50, semilla: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(semilla)
+    X = VALORES_REFERENCIA * rng.uniform(0.8, 1.2, size=(n, len(CARACTERISTICAS)))
+    X[rng.random(X.shape) < 0.2] = np.nan
+    return imputar(X)
+
+
+def test_filas_iguales_misma_huella():
+    X, observado = _filas()
+    h = huella(X, observado)
+
+    assert h.dtype == np.int64 and h.shape == (len(X),)
+    np.testing.assert_array_equal(h, huella(X.copy(), observado.copy()))
+    # la huella de una fila no depende de las demás
+    np.testing.assert_array_equal(h[10:20], huella(X[10:20], observado[10:20]))
+    assert len(np.unique(h)) == len(h)
+
+
+def test_cambia_un_valor():
+    X, observado = _filas()
+    otro = X.copy()
+    otro[3, 5] = np.nextafter(otro[3, 5], np.float32(np.inf))
+
+    h, h_otro = huella(X, observado), huella(otro, observado)
+    assert h[3] != h_otro[3]
+    np.testing.assert_array_equal(np.delete(h, 3), np.delete(h_otro, 3))
+
+
+def test_cambia_solo_la_mascara():
+    # un valor medido igual al relleno: X no cambia, `observado` sí
+    X, observado = _filas()
+    otra = observado.copy()
+    otra[7, 2] = not otra[7, 2]
+
+    h, h_otra = huella(X, observado), huella(X, otra)
+    assert h[7] != h_otra[7]
+    np.testing.assert_array_equal(np.delete(h, 7), np.delete(h_otra, 7))